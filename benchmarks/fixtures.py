@@ -0,0 +1,260 @@
+"""
+Provider payload fixtures for the benchmark suite.
+
+Each fixture is a gzipped JSON file in the fixtures directory, in the shape
+the provider API returns it:
+
+    gcp_skus.json.gz               Cloud Billing `services.skus.list` items (Compute Engine)
+    azure_retail_pages.json.gz     Azure Retail Prices API pages ({"Items": [...], "NextPageLink": ...})
+    aws_instance_types.json.gz     EC2 `describe_instance_types` pages
+    azure_resource_skus.json.gz    `ResourceSku.as_dict()` of `resource_skus.list()`
+    aws_price_list.json.gz         Pricing API `get_products` PriceList entries, one per instance type
+
+Drop recorded payloads under these names to benchmark against real data;
+missing files are generated deterministically at catalog scale.
+"""
+
+import gzip
+import json
+import os
+import random
+from types import SimpleNamespace
+
+FIXTURE_NAMES = (
+    "gcp_skus", "azure_retail_pages", "aws_instance_types", "azure_resource_skus", "aws_price_list",
+)
+
+GCP_FAMILIES = ("N1", "N2", "N2D", "E2", "C2", "C2D", "C3", "C3D", "N4", "T2D", "T2A", "M1", "M2", "M3", "A2", "G2")
+GCP_REGIONS = tuple(
+    f"{area}-{direction}{n}"
+    for area in ("us", "europe", "asia", "australia", "southamerica", "northamerica", "me", "africa")
+    for direction in ("central", "east", "west", "north", "south")
+    for n in (1, 2)
+)
+GCP_USAGE = ("OnDemand", "Preemptible", "Commit1Yr", "Commit3Yr")
+GCP_NOISE = (
+    "Sole Tenancy Instance Core", "Custom Instance Ram", "Nvidia Tesla T4 GPU", "Local SSD provisioned space",
+    "Network Internet Egress", "Storage PD Capacity", "Licensing Fee for Windows Server", "Extended Instance Ram",
+)
+
+AZURE_REGIONS = tuple(
+    f"{area}{suffix}"
+    for area in ("eastus", "westus", "westeurope", "northeurope", "germanywestcentral", "uksouth", "japaneast",
+                 "southeastasia", "australiaeast", "canadacentral", "francecentral", "swedencentral")
+    for suffix in ("", "2", "3")
+)
+AZURE_SERIES = ("D{n}s_v5", "D{n}as_v5", "E{n}s_v5", "E{n}as_v5", "F{n}s_v2", "B{n}ms", "D{n}ds_v5", "M{n}ms",
+                "L{n}s_v3", "NC{n}as_T4_v3", "D{n}s_v4", "E{n}ds_v4", "D{n}lds_v5", "E{n}bs_v5")
+SIZES = (1, 2, 4, 8, 16, 32, 48, 64, 96)
+
+AWS_FAMILIES = ("m5", "m5a", "m6i", "m6a", "m7i", "m7g", "c5", "c5a", "c6i", "c6g", "c7i", "r5", "r5a", "r6i",
+                "r6g", "r7i", "t3", "t3a", "t4g", "x2idn", "i4i", "z1d", "m5d", "c5d", "r5d", "m6id", "c6id")
+AWS_SIZES = (("large", 2), ("xlarge", 4), ("2xlarge", 8), ("4xlarge", 16), ("8xlarge", 32), ("12xlarge", 48),
+             ("16xlarge", 64), ("24xlarge", 96))
+AWS_MEMORY_PER_VCPU = {"m": 4, "c": 2, "r": 8, "t": 4, "x": 16, "i": 8, "z": 8}
+
+
+def _price(rng, low, high):
+    return round(rng.uniform(low, high), 6)
+
+
+def _gcp_unit_price(value):
+    units = int(value)
+    return {"currencyCode": "USD", "units": str(units), "nanos": int(round((value - units) * 1e9))}
+
+
+def generate_gcp_skus(rng, scale=1.0):
+    skus = []
+    regions = GCP_REGIONS[:max(1, int(len(GCP_REGIONS) * scale))]
+    for family in GCP_FAMILIES:
+        for component, resource_group, base in (("Core", "CPU", 0.03), ("Ram", "RAM", 0.004)):
+            for usage in GCP_USAGE:
+                prefix = {"OnDemand": "", "Preemptible": "Spot Preemptible ",
+                          "Commit1Yr": "Commitment v1: ", "Commit3Yr": "Commitment v1: "}[usage]
+                for region in regions:
+                    skus.append({
+                        "name": f"services/6F81-5844-456A/skus/{len(skus):04X}-{rng.randrange(16 ** 4):04X}",
+                        "skuId": f"{len(skus):04X}-{rng.randrange(16 ** 4):04X}-{rng.randrange(16 ** 4):04X}",
+                        "description": f"{prefix}{family} Instance {component} running in {region}",
+                        "category": {"serviceDisplayName": "Compute Engine", "resourceFamily": "Compute",
+                                     "resourceGroup": resource_group, "usageType": usage},
+                        "serviceRegions": [region],
+                        "pricingInfo": [{"pricingExpression": {
+                            "usageUnit": "h" if component == "Core" else "GiBy.h",
+                            "tieredRates": [{"startUsageAmount": 0, "unitPrice": _gcp_unit_price(_price(rng, base / 2, base))}],
+                        }}],
+                    })
+    for noise in GCP_NOISE:
+        for usage in GCP_USAGE[:2]:
+            for region in regions:
+                skus.append({
+                    "skuId": f"N{len(skus):05X}",
+                    "description": f"{noise} running in {region}",
+                    "category": {"resourceGroup": "Misc", "usageType": usage},
+                    "serviceRegions": [region],
+                    "pricingInfo": [{"pricingExpression": {"tieredRates": [
+                        {"unitPrice": _gcp_unit_price(_price(rng, 0.001, 1.0))}]}}],
+                })
+    rng.shuffle(skus)
+    return skus
+
+
+def _azure_item(rng, sku, region, meter, product, sku_name, price, reservation_term=None):
+    item = {
+        "currencyCode": "USD", "retailPrice": price, "unitPrice": price, "armRegionName": region,
+        "location": region, "meterName": meter, "productName": product, "skuName": sku_name,
+        "serviceName": "Virtual Machines", "armSkuName": sku, "type": "Reservation" if reservation_term else "Consumption",
+        "unitOfMeasure": "1 Hour", "meterId": f"{rng.getrandbits(64):016x}",
+    }
+    if reservation_term:
+        item["reservationTerm"] = reservation_term
+    return item
+
+
+def generate_azure_retail_pages(rng, scale=1.0, page_size=1000):
+    items = []
+    for region in AZURE_REGIONS[:max(1, int(len(AZURE_REGIONS) * scale))]:
+        for series in AZURE_SERIES:
+            for n in SIZES:
+                size = series.format(n=n)
+                sku = f"Standard_{size}"
+                meter = size.replace("_", " ")
+                product = f"Virtual Machines {series.split('{n}')[-1].strip('_')} Series"
+                hourly = _price(rng, 0.01 * n, 0.08 * n)
+                items.append(_azure_item(rng, sku, region, meter, product, meter, hourly))
+                items.append(_azure_item(rng, sku, region, f"{meter} Spot", product, f"{meter} Spot", round(hourly * 0.2, 6)))
+                items.append(_azure_item(rng, sku, region, f"{meter} Low Priority", product, f"{meter} Low Priority",
+                                         round(hourly * 0.25, 6)))
+                items.append(_azure_item(rng, sku, region, meter, f"{product} Windows", meter, round(hourly * 1.4, 6)))
+                items.append(_azure_item(rng, sku, region, meter, product, meter, round(hourly * 8760 * 0.6, 2), "1 Year"))
+                items.append(_azure_item(rng, sku, region, meter, product, meter, round(hourly * 26280 * 0.4, 2), "3 Years"))
+    pages = []
+    for start in range(0, len(items), page_size):
+        next_link = f"https://prices.azure.com/api/retail/prices?$skip={start + page_size}"
+        pages.append({"BillingCurrency": "USD", "Items": items[start:start + page_size],
+                      "NextPageLink": next_link if start + page_size < len(items) else None,
+                      "Count": len(items[start:start + page_size])})
+    return pages
+
+
+def _aws_instance_types(scale=1.0):
+    for family in AWS_FAMILIES[:max(1, int(len(AWS_FAMILIES) * scale))]:
+        for size, vcpus in AWS_SIZES:
+            yield f"{family}.{size}", vcpus, vcpus * AWS_MEMORY_PER_VCPU[family[0]] * 1024
+
+
+def generate_aws_instance_types(rng, scale=1.0, page_size=100):
+    types = [
+        {"InstanceType": name, "CurrentGeneration": True, "VCpuInfo": {"DefaultVCpus": vcpus},
+         "MemoryInfo": {"SizeInMiB": memory}, "ProcessorInfo": {"SupportedArchitectures": ["x86_64"]}}
+        for name, vcpus, memory in _aws_instance_types(scale)
+    ]
+    return [{"InstanceTypes": types[start:start + page_size]} for start in range(0, len(types), page_size)]
+
+
+def generate_azure_resource_skus(rng, scale=1.0):
+    skus = []
+    regions = AZURE_REGIONS[:max(1, int(len(AZURE_REGIONS) * scale))]
+    for region in regions:
+        for series in AZURE_SERIES:
+            for n in SIZES:
+                memory = n * rng.choice((2, 4, 8))
+                skus.append({
+                    "resource_type": "virtualMachines", "name": f"Standard_{series.format(n=n)}", "tier": "Standard",
+                    "locations": [region],
+                    "capabilities": [
+                        {"name": "vCPUs", "value": str(n)}, {"name": "MemoryGB", "value": str(memory)},
+                        {"name": "MaxDataDiskCount", "value": str(min(64, n * 4))},
+                        {"name": "PremiumIO", "value": "True"}, {"name": "HyperVGenerations", "value": "V1,V2"},
+                        {"name": "vCPUsAvailable", "value": str(n)}, {"name": "ACUs", "value": "195"},
+                    ],
+                })
+        for resource_type in ("disks", "snapshots", "availabilitySets", "hostGroups/hosts"):
+            for i in range(40):
+                skus.append({"resource_type": resource_type, "name": f"{resource_type}_{i}", "locations": [region],
+                             "capabilities": [{"name": "MaxSizeGiB", "value": str(2 ** (i % 16))}]})
+    return skus
+
+
+def generate_aws_price_list(rng, scale=1.0):
+    entries = []
+    for name, vcpus, _ in _aws_instance_types(scale):
+        sku = f"{rng.getrandbits(60):015X}"
+        hourly = _price(rng, 0.02 * vcpus, 0.06 * vcpus)
+        terms = {"OnDemand": {f"{sku}.JRTCKXETXF": {
+            "offerTermCode": "JRTCKXETXF", "sku": sku, "termAttributes": {},
+            "priceDimensions": {f"{sku}.JRTCKXETXF.6YS6EN2CT7": {
+                "unit": "Hrs", "description": f"${hourly} per On Demand Linux {name} Instance Hour",
+                "pricePerUnit": {"USD": f"{hourly:.10f}"}}},
+        }}, "Reserved": {}}
+        for offering, discount in (("standard", 0.6), ("convertible", 0.7)):
+            for lease, years in (("1yr", 1), ("3yr", 3)):
+                for purchase, upfront_share in (("All Upfront", 1.0), ("Partial Upfront", 0.5), ("No Upfront", 0.0)):
+                    code = f"{rng.getrandbits(40):010X}"
+                    total = hourly * 8760 * years * discount * (discount if years == 3 else 1)
+                    dims = {f"{sku}.{code}.6YS6EN2CT7": {
+                        "unit": "Hrs", "description": "Linux/UNIX (Amazon VPC)",
+                        "pricePerUnit": {"USD": f"{total * (1 - upfront_share) / (8760 * years):.10f}"}}}
+                    if upfront_share:
+                        dims[f"{sku}.{code}.2TG2D8R56U"] = {
+                            "unit": "Quantity", "description": "Upfront Fee",
+                            "pricePerUnit": {"USD": f"{total * upfront_share:.0f}"}}
+                    terms["Reserved"][f"{sku}.{code}"] = {
+                        "offerTermCode": code, "sku": sku, "priceDimensions": dims,
+                        "termAttributes": {"LeaseContractLength": lease, "OfferingClass": offering,
+                                           "PurchaseOption": purchase},
+                    }
+        entries.append({
+            "product": {"productFamily": "Compute Instance", "sku": sku, "attributes": {
+                "instanceType": name, "vcpu": str(vcpus), "location": "US East (N. Virginia)",
+                "operatingSystem": "Linux", "tenancy": "Shared", "preInstalledSw": "NA", "capacitystatus": "Used"}},
+            "serviceCode": "AmazonEC2",
+            "terms": terms,
+        })
+    return entries
+
+
+_GENERATORS = {
+    "gcp_skus": generate_gcp_skus,
+    "azure_retail_pages": generate_azure_retail_pages,
+    "aws_instance_types": generate_aws_instance_types,
+    "azure_resource_skus": generate_azure_resource_skus,
+    "aws_price_list": generate_aws_price_list,
+}
+
+
+def fixture_path(fixtures_dir: str, name: str):
+    return os.path.join(fixtures_dir, f"{name}.json.gz")
+
+
+def generate_fixtures(fixtures_dir: str, scale: float = 1.0, seed: int = 20250601, overwrite: bool = False):
+    """Writes every missing fixture (or all of them with `overwrite`); returns the names written."""
+    os.makedirs(fixtures_dir, exist_ok=True)
+    written = []
+    for name, generate in _GENERATORS.items():
+        path = fixture_path(fixtures_dir, name)
+        if os.path.exists(path) and not overwrite:
+            continue
+        payload = generate(random.Random(f"{seed}:{name}"), scale)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        written.append(name)
+    return written
+
+
+def load_fixture(fixtures_dir: str, name: str):
+    with gzip.open(fixture_path(fixtures_dir, name), "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def as_resource_skus(sku_dicts):
+    """Wraps `ResourceSku.as_dict()` payloads in objects with the attributes the matching code reads."""
+    return [
+        SimpleNamespace(
+            name=sku["name"],
+            resource_type=sku["resource_type"],
+            locations=sku.get("locations", []),
+            capabilities=[SimpleNamespace(name=cap["name"], value=cap["value"]) for cap in sku.get("capabilities", [])],
+        )
+        for sku in sku_dicts
+    ]
@@ -0,0 +1,340 @@
+"""
+Benchmarks for the pricing hot paths over provider payload fixtures.
+
+Every benchmark is timed over several runs (median, min, max) and run once
+more under `tracemalloc` for its peak allocation. Results are written as
+JSON and checked against absolute thresholds (`thresholds.json`) and,
+optionally, against a previous results file.
+
+Provider calls are not made: the fetchers are run on fixture payloads
+(see `fixtures.py`) by swapping their catalog/index sources, and their
+caches are bypassed so that every run does the full work.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --output results.json --baseline previous.json --tolerance 0.25
+    python benchmarks/run_benchmarks.py --only azure_parse_items gcp_fetch_pricing
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+sys.path.insert(0, BENCH_DIR)
+
+from fixtures import as_resource_skus, generate_fixtures, load_fixture  # noqa: E402
+
+DEFAULT_FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+DEFAULT_THRESHOLDS = os.path.join(BENCH_DIR, "thresholds.json")
+
+BENCHMARKS = {}
+
+
+def benchmark(fn):
+    """Registers `fn(fixtures)` which prepares a benchmark and returns the callable to time."""
+    BENCHMARKS[fn.__name__.replace("bench_", "", 1)] = fn
+    return fn
+
+
+class Fixtures:
+    """Lazily loaded fixture payloads."""
+
+    def __init__(self, fixtures_dir):
+        self.fixtures_dir = fixtures_dir
+        self._loaded = {}
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name not in self._loaded:
+            self._loaded[name] = load_fixture(self.fixtures_dir, name)
+        return self._loaded[name]
+
+
+def _uncached(fn):
+    """The undecorated function behind `cached`/`single_flight` wrappers."""
+    return getattr(fn, "__wrapped__", fn)
+
+
+# --- GCP ---
+def _gcp_index(fixtures):
+    from gcp_sku_cache import _sku_rows
+    from gcp_sku_index import build_sku_index
+
+    return build_sku_index(
+        (family, component, usage, region, price, desc)
+        for _, desc, family, component, usage, region, price in _sku_rows(fixtures.gcp_skus)
+    )
+
+
+@benchmark
+def bench_gcp_build_sku_index(fixtures):
+    skus = fixtures.gcp_skus
+    return lambda: _gcp_index(fixtures), len(skus)
+
+
+@benchmark
+def bench_gcp_fetch_pricing(fixtures):
+    import gcp_pricing
+
+    index = _gcp_index(fixtures)
+    gcp_pricing.get_gcp_sku_index = lambda: index
+    fetch = _uncached(gcp_pricing.fetch_gcp_pricing)
+    regions = sorted({sku["serviceRegions"][0] for sku in fixtures.gcp_skus})[:10]
+    queries = [(f"{family}-standard-8", region) for family in ("n2", "n2d", "e2", "c3", "n4") for region in regions]
+
+    def run():
+        for machine_type, region in queries:
+            fetch(machine_type, region, 8, 32.0)
+    return run, len(queries)
+
+
+# --- Azure ---
+def _azure_items(fixtures):
+    return [item for page in fixtures.azure_retail_pages for item in page["Items"]]
+
+
+@benchmark
+def bench_azure_parse_items(fixtures):
+    from azure_pricing import parse_items
+
+    items = _azure_items(fixtures)
+    by_sku = {}
+    for item in items:
+        by_sku.setdefault((item["armSkuName"], item["armRegionName"]), []).append(item)
+    responses = list(by_sku.values())
+
+    def run():
+        for response in responses:
+            parse_items(response)
+    return run, len(items)
+
+
+@benchmark
+def bench_azure_region_table(fixtures):
+    from azure_pricing import AzureRegionPriceTable
+
+    items = _azure_items(fixtures)
+    region = items[0]["armRegionName"]
+    region_items = [item for item in items if item["armRegionName"] == region]
+
+    def run():
+        table = AzureRegionPriceTable(region, region_items)
+        for sku in table.skus():
+            table.parse_sku(sku)
+    return run, len(region_items)
+
+
+@benchmark
+def bench_azure_build_sku_catalog(fixtures):
+    from instance_catalog import AzureSkuCatalog
+
+    skus = as_resource_skus(fixtures.azure_resource_skus)
+    return lambda: AzureSkuCatalog(skus), len(skus)
+
+
+@benchmark
+def bench_azure_matching_vm_sizes(fixtures):
+    import instance_catalog
+
+    skus = as_resource_skus(fixtures.azure_resource_skus)
+    catalog = instance_catalog.AzureSkuCatalog(skus)
+    instance_catalog.load_azure_skus = lambda subscription_id: catalog
+    match = _uncached(instance_catalog.get_matching_azure_vm_sizes)
+    regions = sorted({loc for sku in skus for loc in sku.locations})[:5]
+    shapes = [(2, 8.0), (4, 16.0), (8, 32.0), (16, 64.0)]
+
+    def run():
+        for region in regions:
+            for vcpus, memory in shapes:
+                match(region, vcpus, memory, subscription_id="benchmark")
+    return run, len(skus)
+
+
+# --- AWS ---
+def _aws_shapes(fixtures):
+    return [
+        (itype["InstanceType"], itype["VCpuInfo"]["DefaultVCpus"], round(itype["MemoryInfo"]["SizeInMiB"] / 1024, 2))
+        for page in fixtures.aws_instance_types for itype in page["InstanceTypes"]
+    ]
+
+
+@benchmark
+def bench_aws_exact_instance_types(fixtures):
+    import instance_catalog
+
+    shapes = _aws_shapes(fixtures)
+    instance_catalog.aws_catalogs = instance_catalog.CatalogCache(lambda region: instance_catalog.ShapeIndex(shapes))
+    find = _uncached(instance_catalog.get_exact_instance_types)
+    queries = sorted({(vcpus, memory) for _, vcpus, memory in shapes})
+
+    def run():
+        instance_catalog.aws_catalogs.invalidate()
+        for vcpus, memory in queries:
+            find("us-east-1", vcpus, memory)
+    return run, len(shapes)
+
+
+def _aws_pricing_inputs(fixtures):
+    import pandas as pd
+    from aws_pricing import build_term_maps
+
+    spot_df = pd.DataFrame({
+        "Time": pd.date_range("2025-06-01", periods=2000, freq="5min", tz="UTC"),
+        "Price": [0.05 + (i % 17) / 1000 for i in range(2000)],
+        "AvailabilityZone": [f"us-east-1{'abcdef'[i % 6]}" for i in range(2000)],
+    })
+    inputs = []
+    for entry in fixtures.aws_price_list:
+        raw_terms = entry["terms"]
+        _, labels = build_term_maps(raw_terms)
+        labels["Spot"] = {"termType": "Spot"}
+        inputs.append((entry["product"]["attributes"]["instanceType"], labels, raw_terms, spot_df))
+    return inputs
+
+
+@benchmark
+def bench_summarize_selected_pricing(fixtures):
+    from pricing_summary import summarize_selected_pricing
+
+    inputs = _aws_pricing_inputs(fixtures)
+
+    def run():
+        for _, labels, raw_terms, spot_df in inputs:
+            summarize_selected_pricing(list(labels), aws_labels=labels, aws_raw_terms=raw_terms, spot_df=spot_df)
+    return run, len(inputs)
+
+
+@benchmark
+def bench_compare_prices(fixtures):
+    """The dashboard's compare_prices path: monthly prices, comparison rows and comparison store upsert."""
+    from comparison_store import ComparisonStore, comparison_rows
+    from price_normalization import monthly_prices
+
+    inputs = _aws_pricing_inputs(fixtures)
+
+    def run():
+        store = ComparisonStore()
+        for instance, labels, raw_terms, spot_df in inputs:
+            prices = monthly_prices(list(labels), aws_labels=labels, aws_raw_terms=raw_terms, spot_df=spot_df)
+            rows = comparison_rows(prices, "us-east-1")
+            for row in rows:
+                row["Model"] += " " + instance  # one row per instance, as if each were compared in turn
+            store.upsert_many(rows)
+        for pricing_type in ("On-Demand", "Spot", "Reserved"):
+            store.frame(pricing_type)
+    return run, len(inputs)
+
+
+def run_benchmark(name, fixtures, repeat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        run, size = BENCHMARKS[name](fixtures)
+        run()  # warm-up: imports, lazy fixture loading
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "median_s": round(statistics.median(timings), 6),
+        "min_s": round(min(timings), 6),
+        "max_s": round(max(timings), 6),
+        "repeat": repeat,
+        "peak_mb": round(peak / 2 ** 20, 3),
+        "input_size": size,
+    }
+
+
+def check_results(results, thresholds, baseline=None, tolerance=0.25):
+    """Returns human-readable threshold and regression failures."""
+    failures = []
+    for name, result in results.items():
+        limit = thresholds.get(name, {})
+        if "max_median_s" in limit and result["median_s"] > limit["max_median_s"]:
+            failures.append(f"{name}: median {result['median_s']:.4f}s > threshold {limit['max_median_s']}s")
+        if "max_peak_mb" in limit and result["peak_mb"] > limit["max_peak_mb"]:
+            failures.append(f"{name}: peak {result['peak_mb']:.1f} MB > threshold {limit['max_peak_mb']} MB")
+
+        previous = (baseline or {}).get(name)
+        if previous:
+            if result["median_s"] > previous["median_s"] * (1 + tolerance):
+                failures.append(f"{name}: median {result['median_s']:.4f}s vs baseline {previous['median_s']:.4f}s")
+            if result["peak_mb"] > previous["peak_mb"] * (1 + tolerance):
+                failures.append(f"{name}: peak {result['peak_mb']:.1f} MB vs baseline {previous['peak_mb']:.1f} MB")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pricing hot paths over provider payload fixtures.")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="Fixture directory (missing files are generated)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Size of generated fixtures relative to a full catalog")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--output", help="Write results as JSON to this file (default: stdout)")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/growth vs. the baseline")
+    args = parser.parse_args(argv)
+
+    generate_fixtures(args.fixtures, scale=args.scale)
+    fixtures = Fixtures(args.fixtures)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        results[name] = run_benchmark(name, fixtures, args.repeat)
+        print(f" {name}: {results[name]['median_s'] * 1000:.1f} ms median, {results[name]['peak_mb']:.1f} MB peak",
+              file=sys.stderr)
+
+    thresholds = {}
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, encoding="utf-8") as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["benchmarks"]
+    failures = check_results(results, thresholds, baseline, args.tolerance)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixtures": os.path.abspath(args.fixtures),
+            "repeat": args.repeat,
+        },
+        "benchmarks": results,
+        "failures": failures,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for failure in failures:
+        print(f" FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,345 @@
+"""
+Offline AWS EC2 pricing from the published bulk price-list offer file.
+
+The regional EC2 offer file is several gigabytes. It is streamed row by row
+(CSV through the standard library, JSON through the optional `ijson`
+package) and only OnDemand/Reserved rows of compute instances with no
+pre-installed software and used capacity are kept, in a SQLite table keyed by
+(instance type, location, operating system, tenancy). Pricing an instance is
+then a local indexed query that returns the same structure as
+`fetch_aws_pricing`, without calling the Pricing API.
+
+Usage:
+    python aws_offer_file.py us-east-1                # download and ingest the CSV offer file
+    python aws_offer_file.py us-east-1 --file index.csv
+"""
+
+import argparse
+import csv
+import io
+import os
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+import requests
+
+from aws_pricing import add_spot_pricing, build_term_maps
+from shared_cache import PRICING_CACHE_SIZE, PRICING_CACHE_TTL, cached, has_prices
+
+OFFER_URL = "https://pricing.us-east-1.amazonaws.com/offers/v1.0/aws/AmazonEC2/current/{region}/index.{fmt}"
+
+CACHE_DIR = os.environ.get(
+    "MULTI_CLOUD_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "multi-cloud-dashboard")
+)
+AWS_OFFER_DB_PATH = os.environ.get("AWS_OFFER_DB_PATH", os.path.join(CACHE_DIR, "aws_ec2_offers.sqlite"))
+
+BATCH_SIZE = 5000
+TERM_TYPES = ("OnDemand", "Reserved")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS offer_terms (
+    instance_type TEXT NOT NULL,
+    location TEXT NOT NULL,
+    os TEXT NOT NULL,
+    tenancy TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    term_type TEXT NOT NULL,
+    offer_term_code TEXT NOT NULL,
+    rate_code TEXT NOT NULL,
+    unit TEXT,
+    price TEXT,
+    description TEXT,
+    lease TEXT,
+    purchase TEXT,
+    offering_class TEXT,
+    PRIMARY KEY (rate_code)
+);
+CREATE INDEX IF NOT EXISTS idx_offer_terms_key ON offer_terms (instance_type, location, os, tenancy);
+CREATE TABLE IF NOT EXISTS ingested_offers (
+    source TEXT PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    ingested_at REAL NOT NULL
+);
+"""
+
+
+def _connect(path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _keep_product(attrs: dict):
+    return (
+        attrs.get('productFamily') == 'Compute Instance'
+        and attrs.get('preInstalledSw') == 'NA'
+        and attrs.get('capacitystatus') == 'Used'
+        and bool(attrs.get('instanceType'))
+    )
+
+
+def _write_rows(conn, rows, table='offer_terms'):
+    conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def _open_text(source: str):
+    if os.path.exists(source):
+        return open(source, newline='', encoding='utf-8')
+    response = requests.get(source, stream=True, timeout=60)
+    response.raise_for_status()
+    response.raw.decode_content = True
+    return io.TextIOWrapper(response.raw, encoding='utf-8', newline='')
+
+
+def iter_offer_csv_rows(lines):
+    """Yields filtered offer_terms rows from the lines of an EC2 offer CSV."""
+    reader = csv.reader(lines)
+    header = None
+    for record in reader:
+        if record and record[0] == 'SKU':
+            header = {name: i for i, name in enumerate(record)}
+            break
+    if header is None:
+        raise ValueError("Not an AWS offer CSV: no 'SKU' header row found")
+
+    def col(record, name):
+        i = header.get(name)
+        return record[i] if i is not None and i < len(record) else ''
+
+    for record in reader:
+        term_type = col(record, 'TermType')
+        if term_type not in TERM_TYPES or col(record, 'Currency') != 'USD':
+            continue
+        attrs = {
+            'productFamily': col(record, 'Product Family'),
+            'preInstalledSw': col(record, 'Pre Installed S/W'),
+            'capacitystatus': col(record, 'CapacityStatus'),
+            'instanceType': col(record, 'Instance Type'),
+        }
+        if not _keep_product(attrs):
+            continue
+        yield (
+            attrs['instanceType'], col(record, 'Location'), col(record, 'Operating System'), col(record, 'Tenancy'),
+            col(record, 'SKU'), term_type, col(record, 'OfferTermCode'), col(record, 'RateCode'),
+            col(record, 'Unit'), col(record, 'PricePerUnit'), col(record, 'PriceDescription'),
+            col(record, 'LeaseContractLength'), col(record, 'PurchaseOption'), col(record, 'OfferingClass'),
+        )
+
+
+def iter_offer_json_rows(json_path: str):
+    """
+    Yields filtered offer_terms rows from an EC2 offer JSON file.
+
+    The file is read twice with `ijson` (an optional dependency): once for the
+    products, keeping only the attributes of matching SKUs, and once per term type.
+    """
+    try:
+        import ijson
+    except ImportError as e:
+        raise ImportError("Streaming the JSON offer file needs `pip install ijson`; the CSV format needs nothing extra.") from e
+
+    products = {}
+    with open(json_path, 'rb') as f:
+        for sku, product in ijson.kvitems(f, 'products'):
+            attrs = product.get('attributes', {})
+            attrs['productFamily'] = product.get('productFamily', attrs.get('productFamily'))
+            if _keep_product(attrs):
+                products[sku] = (attrs['instanceType'], attrs.get('location', ''),
+                                 attrs.get('operatingSystem', ''), attrs.get('tenancy', ''))
+
+    for term_type in TERM_TYPES:
+        with open(json_path, 'rb') as f:
+            for sku, offers in ijson.kvitems(f, f'terms.{term_type}'):
+                key = products.get(sku)
+                if key is None:
+                    continue
+                for offer in offers.values():
+                    attrs = offer.get('termAttributes', {})
+                    for rate_code, dim in offer.get('priceDimensions', {}).items():
+                        price = dim.get('pricePerUnit', {}).get('USD')
+                        if price is None:
+                            continue
+                        yield key + (
+                            sku, term_type, offer.get('offerTermCode', ''), rate_code,
+                            dim.get('unit', ''), str(price), dim.get('description', ''),
+                            attrs.get('LeaseContractLength', ''), attrs.get('PurchaseOption', ''),
+                            attrs.get('OfferingClass', ''),
+                        )
+
+
+def ingest_offer_file(source: str, fmt: str = 'csv', path: str = AWS_OFFER_DB_PATH):
+    """
+    Streams an EC2 offer file into the local offer table.
+
+    The rows of every location in the file are replaced, so SKUs dropped from the
+    offer file are removed too.
+
+    Parameters:
+    ----------
+    source : str
+        Local file path or URL of the offer file (see `OFFER_URL`).
+    fmt : str, optional
+        'csv' (default) or 'json'. JSON sources given as URLs are downloaded to a
+        temporary file first because they are read twice.
+    path : str, optional
+        SQLite file holding the offer table.
+
+    Returns:
+    -------
+    int
+        Number of price dimension rows stored.
+    """
+    start = time.time()
+    temp_path = None
+    if fmt == 'json':
+        if not os.path.exists(source):
+            fd, temp_path = tempfile.mkstemp(suffix='.json')
+            with os.fdopen(fd, 'wb') as out, requests.get(source, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    out.write(chunk)
+        rows = iter_offer_json_rows(temp_path or source)
+        handle = None
+    else:
+        handle = _open_text(source)
+        rows = iter_offer_csv_rows(handle)
+
+    conn = _connect(path)
+    count = 0
+    try:
+        # Rows are staged first; the locations of the file are then replaced as a whole,
+        # so SKUs missing from the new file do not survive, and readers see the old rows until the commit
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS offer_terms_staging AS SELECT * FROM offer_terms WHERE 0")
+        conn.execute("DELETE FROM offer_terms_staging")
+        batch = []
+        with conn:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= BATCH_SIZE:
+                    _write_rows(conn, batch, 'offer_terms_staging')
+                    count += len(batch)
+                    batch = []
+            _write_rows(conn, batch, 'offer_terms_staging')
+            count += len(batch)
+            conn.execute("DELETE FROM offer_terms WHERE location IN (SELECT DISTINCT location FROM offer_terms_staging)")
+            conn.execute("INSERT OR REPLACE INTO offer_terms SELECT * FROM offer_terms_staging ORDER BY rowid")
+            conn.execute("DELETE FROM offer_terms_staging")
+            conn.execute("INSERT OR REPLACE INTO ingested_offers VALUES (?, ?, ?)", (source, count, time.time()))
+    finally:
+        conn.close()
+        if handle is not None:
+            handle.close()
+        if temp_path is not None:
+            os.remove(temp_path)
+
+    print(f"\n AWS offer file ingested: {count} price rows in {time.time() - start:.2f} seconds")
+    return count
+
+
+def ingest_region_offer(region_code: str, fmt: str = 'csv', path: str = AWS_OFFER_DB_PATH):
+    """Downloads and ingests the published offer file for one region code (e.g. 'eu-central-1')."""
+    return ingest_offer_file(OFFER_URL.format(region=region_code, fmt=fmt), fmt=fmt, path=path)
+
+
+def has_offer_data(location: str, path: str = AWS_OFFER_DB_PATH):
+    """True if the offer table holds any instance for a location such as "EU (Frankfurt)"."""
+    if not os.path.exists(path):
+        return False
+    conn = _connect(path)
+    try:
+        return conn.execute("SELECT 1 FROM offer_terms WHERE location = ? LIMIT 1", (location,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def load_raw_terms(instance_type: str, location: str, os_name: str = 'Linux', tenancy: str = 'Shared',
+                   path: str = AWS_OFFER_DB_PATH):
+    """Rebuilds the Pricing API `terms` structure of the first matching SKU from the offer table."""
+    conn = _connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT sku, term_type, offer_term_code, rate_code, unit, price, description, lease, purchase, offering_class "
+            "FROM offer_terms WHERE instance_type = ? AND location = ? AND os = ? AND tenancy = ? ORDER BY rowid",
+            (instance_type, location, os_name, tenancy)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        return {}
+
+    first_sku = rows[0][0]
+    raw_terms = {}
+    for sku, term_type, offer_term_code, rate_code, unit, price, description, lease, purchase, offering_class in rows:
+        if sku != first_sku:
+            continue
+        term_id = f"{sku}.{offer_term_code}"
+        term = raw_terms.setdefault(term_type, {}).setdefault(term_id, {
+            'offerTermCode': offer_term_code,
+            'sku': sku,
+            'termAttributes': {},
+            'priceDimensions': {},
+        })
+        if term_type == 'Reserved':
+            term['termAttributes'] = {
+                'LeaseContractLength': lease,
+                'OfferingClass': offering_class,
+                'PurchaseOption': purchase,
+            }
+        term['priceDimensions'][rate_code] = {
+            'rateCode': rate_code,
+            'description': description,
+            'unit': unit,
+            'pricePerUnit': {'USD': price},
+        }
+    return raw_terms
+
+
+@cached("pricing", maxsize=PRICING_CACHE_SIZE, ttl=PRICING_CACHE_TTL, should_cache=has_prices)
+def fetch_aws_pricing_offline(instance_type: str, region: str, os='Linux', tenancy='Shared', path: str = AWS_OFFER_DB_PATH):
+    """
+    Prices an EC2 instance from the ingested offer file instead of the Pricing API.
+
+    Parameters:
+    ----------
+    instance_type : str
+        EC2 instance type to query (e.g., "t3a.2xlarge").
+    region : str
+        AWS region name in full text format (e.g., "US East (N. Virginia)").
+    os : str, optional
+        Operating system (default is 'Linux').
+    tenancy : str, optional
+        Tenancy (default is 'Shared').
+
+    Returns:
+    -------
+    Tuple[dict, dict, dict, pd.DataFrame]
+        Same shape as `fetch_aws_pricing`. The offer file carries no Spot prices;
+        they come from the spot price store, as for `fetch_aws_pricing`.
+    """
+    raw_terms = load_raw_terms(instance_type, region, os, tenancy, path)
+    if not raw_terms:
+        return {}, {}, {}, pd.DataFrame()
+
+    pricing_map, labels_map = build_term_maps(raw_terms)
+    spot_df = add_spot_pricing(pricing_map, labels_map, instance_type, region)
+    return pricing_map, labels_map, raw_terms, spot_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest an AWS EC2 offer file into the local offer table.")
+    parser.add_argument("region", help="AWS region code, e.g. us-east-1")
+    parser.add_argument("--file", help="Local offer file instead of downloading the published one")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--db", default=AWS_OFFER_DB_PATH, help="SQLite file for the offer table")
+    args = parser.parse_args()
+
+    if args.file:
+        ingest_offer_file(args.file, fmt=args.format, path=args.db)
+    else:
+        ingest_region_offer(args.region, fmt=args.format, path=args.db)
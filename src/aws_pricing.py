@@ -1,10 +1,69 @@
-import boto3
 import json
 import pandas as pd
-from datetime import datetime, timedelta
+from client_registry import aws_client, aws_default_region
+from rate_limit import call
+from spot_price_store import get_spot_history, summarize_spot
+from metrics import timed
+from shared_cache import PRICING_CACHE_SIZE, PRICING_CACHE_TTL, cached, has_prices
 
 HOURS_PER_MONTH = 730
+
+# AWS Friendly Region Names
+def get_static_aws_region_name_map():
+    return {
+        "us-east-1": "US East (N. Virginia)",
+        "us-east-2": "US East (Ohio)",
+        "us-west-1": "US West (N. California)",
+        "us-west-2": "US West (Oregon)",
+        "af-south-1": "Africa (Cape Town)",
+        "ap-east-1": "Asia Pacific (Hong Kong)",
+        "ap-south-1": "Asia Pacific (Mumbai)",
+        "ap-northeast-3": "Asia Pacific (Osaka)",
+        "ap-northeast-2": "Asia Pacific (Seoul)",
+        "ap-southeast-1": "Asia Pacific (Singapore)",
+        "ap-southeast-2": "Asia Pacific (Sydney)",
+        "ap-northeast-1": "Asia Pacific (Tokyo)",
+        "ca-central-1": "Canada (Central)",
+        "eu-central-1": "EU (Frankfurt)",
+        "eu-west-1": "EU (Ireland)",
+        "eu-west-2": "EU (London)",
+        "eu-south-1": "EU (Milan)",
+        "eu-west-3": "EU (Paris)",
+        "eu-north-1": "EU (Stockholm)",
+        "me-south-1": "Middle East (Bahrain)",
+        "sa-east-1": "South America (São Paulo)",
+        "me-central-1": "Middle East (UAE)",
+        "eu-central-2": "EU (Zurich)",
+        "ap-south-2": "Asia Pacific (Hyderabad)",
+        "ap-southeast-3": "Asia Pacific (Jakarta)",
+    }
+
+
+def get_aws_region_code(location: str):
+    """Region code (e.g. "eu-central-1") for a Pricing API location name, or None if unknown."""
+    for code, name in get_static_aws_region_name_map().items():
+        if name == location:
+            return code
+    return None
+
+
+def build_term_maps(raw_terms: dict):
+    """Builds the pricing/labels maps with one entry per (term type, offering class) in an AWS terms structure."""
+    pricing_map = {}
+    labels_map = {}
+    for term_type in raw_terms:
+        for term_id, term_data in raw_terms[term_type].items():
+            attrs = term_data.get('termAttributes', {})
+            offering = attrs.get('OfferingClass', 'Default')
+            key = f"{term_type.capitalize()} - {offering}"
+            pricing_map[key] = 0
+            labels_map[key] = {"termType": term_type, "offeringClass": offering}
+    return pricing_map, labels_map
+
+
 # def fetch_aws_pricing(instance_type="t3a.2xlarge", region="US East (N. Virginia)", os='Linux'):
+@cached("pricing", maxsize=PRICING_CACHE_SIZE, ttl=PRICING_CACHE_TTL, should_cache=has_prices)
+@timed("aws", "pricing")
 def fetch_aws_pricing(instance_type:str, region:str, os='Linux'):
 
     """
@@ -29,18 +88,20 @@ def fetch_aws_pricing(instance_type:str, region:str, os='Linux'):
         - pricing_map: Dictionary containing pricing for different term types (e.g., OnDemand - Standard, Spot).
         - labels_map: Dictionary describing metadata for each pricing term.
         - raw_terms: Raw term structure as returned from AWS Pricing API.
-        - spot_df: Pandas DataFrame with spot price history for the past 7 days (timestamp, price).
+        - spot_df: Pandas DataFrame with spot price history for the past 7 days (Time, Price, AvailabilityZone).
 
     Notes:
     -----
     - Uses AWS Pricing API (`boto3.client('pricing')`) to query On-Demand and Reserved pricing.
-    - Uses EC2 API (`boto3.client('ec2')`) to fetch Spot pricing history.
-    - Spot prices are averaged over the past 7 days.
+    - Spot history comes from the local spot price store (`spot_price_store.py`), which
+      pulls only the points newer than its last sync from the EC2 API.
+    - Spot prices are averaged over the past 7 days, across availability zones.
     - Prices are returned as monthly estimates (based on 730 hours/month).
     """
 
-    client = boto3.client('pricing', region_name='us-east-1')
-    product_response = client.get_products(
+    client = aws_client('pricing', region_name='us-east-1')
+    product_response = call(
+        "aws", "pricing", client.get_products,
         ServiceCode='AmazonEC2',
         Filters=[
             {'Type': 'TERM_MATCH', 'Field': 'instanceType', 'Value': instance_type},
@@ -62,7 +123,8 @@ def fetch_aws_pricing(instance_type:str, region:str, os='Linux'):
     product = json.loads(product_response['PriceList'][0])
     sku = product['product']['sku']
 
-    pricing_response = client.get_products(
+    pricing_response = call(
+        "aws", "pricing", client.get_products,
         ServiceCode='AmazonEC2',
         Filters=[{'Type': 'TERM_MATCH', 'Field': 'sku', 'Value': sku}],
         MaxResults=100
@@ -70,37 +132,26 @@ def fetch_aws_pricing(instance_type:str, region:str, os='Linux'):
 
     product_data = json.loads(pricing_response['PriceList'][0])
     raw_terms = product_data.get('terms', {})
-    pricing_map = {}
+    pricing_map, labels_map = build_term_maps(raw_terms)
+    spot_df = add_spot_pricing(pricing_map, labels_map, instance_type, region)
 
-    labels_map = {}
-    for term_type in raw_terms:
-        for term_id, term_data in raw_terms[term_type].items():
-            attrs = term_data.get('termAttributes', {})
-            offering = attrs.get('OfferingClass', 'Default')
-            key = f"{term_type.capitalize()} - {offering}"
-            pricing_map[key] = 0
-            labels_map[key] = {"termType": term_type, "offeringClass": offering}
+    return pricing_map, labels_map, raw_terms, spot_df
 
-    ec2 = boto3.client('ec2')
-    end_time = datetime.utcnow()
-    start_time = end_time - timedelta(days=7)
-    spot_response = ec2.describe_spot_price_history(
-        InstanceTypes=[instance_type],
-        ProductDescriptions=['Linux/UNIX'],
-        StartTime=start_time,
-        EndTime=end_time,
-        MaxResults=1000
-    )
-    spot_data = spot_response['SpotPriceHistory']
-    spot_df = pd.DataFrame([{ 'Time': entry['Timestamp'], 'Price': float(entry['SpotPrice']) } for entry in spot_data])
-    spot_df.sort_values(by='Time', inplace=True)
 
-    if not spot_df.empty:
-        avg = spot_df['Price'].mean()
-        pricing_map['Spot'] = round(avg * HOURS_PER_MONTH, 2)
-        labels_map['Spot'] = {"termType": "Spot"}
+def add_spot_pricing(pricing_map: dict, labels_map: dict, instance_type: str, region: str):
+    """
+    Adds the 'Spot' model (7-day average, monthly) from the spot price store and returns the spot history.
 
-    return pricing_map, labels_map, raw_terms, spot_df
+    `region` is a Pricing API location name such as "US East (N. Virginia)".
+    """
+    region_code = get_aws_region_code(region) or aws_default_region()
+    spot_df = get_spot_history(instance_type, region_code) if region_code else pd.DataFrame(columns=['Time', 'Price'])
+    spot_summary = summarize_spot(spot_df)
+
+    if spot_summary is not None:
+        pricing_map['Spot'] = round(spot_summary['avg'] * HOURS_PER_MONTH, 2)
+        labels_map['Spot'] = {"termType": "Spot"}
+    return spot_df
 
 
 
@@ -1,9 +1,17 @@
 # azure_pricing.py (modified to integrate into GUI)
-import requests
-import json
+import threading
+import time
+from array import array
+from azure_retail_client import AzureRetailError, get_default_client
+from request_coalescing import single_flight
+from metrics import timed
+from shared_cache import PRICING_CACHE_SIZE, PRICING_CACHE_TTL, cached, has_prices
 
 HOURS_PER_MONTH = 730
 
+_region_tables = {}  # region -> (fetched_at, AzureRegionPriceTable)
+_region_tables_lock = threading.Lock()
+
 def extract_payment_option(sku_name):
     if not sku_name:
         return '-'
@@ -42,7 +50,8 @@ def is_linux_item(item):
     )
 
 # def fetch_azure_pricing(sku='Standard_D8as_v5', region='GermanyWestCentral'):
-def fetch_azure_pricing(sku:str, region:str):
+@timed("azure", "pricing")
+def fetch_azure_pricing(sku:str, region:str, bulk:bool=False):
 
     """
     Fetches Azure VM pricing information for a given SKU and region using the Azure Retail Prices API.
@@ -57,6 +66,10 @@ def fetch_azure_pricing(sku:str, region:str):
         Azure VM SKU name (e.g., "Standard_D8as_v5").
     region : str
         Azure region name in `armRegionName` format (e.g., "GermanyWestCentral").
+    bulk : bool, optional
+        Download every Virtual Machines price for the region once (see `prefetch_azure_region`)
+        and answer from memory. Regions prefetched less than `PRICING_CACHE_TTL` seconds ago are
+        served from memory either way.
 
     Returns:
     -------
@@ -75,32 +88,35 @@ def fetch_azure_pricing(sku:str, region:str):
     - Pricing is multiplied by 730 to estimate monthly cost.
     - Supports models: On-Demand, Spot, Low Priority, Reserved (1YR, 3YR).
     - Filters out Windows, Cloud Services, and non-VM entries.
+    - `bulk` only changes how prices are downloaded, so both modes share one cache entry
+      per (sku, region) with the scheduled warm-up.
     """
 
-    api_url = "https://prices.azure.com/api/retail/prices"
-    query = f"armRegionName eq '{region}' and armSkuName eq '{sku}'"
-    all_items = []
+    if bulk and fresh_region_table(region) is None:
+        prefetch_azure_region(region)
+    return _fetch_azure_pricing(sku, region)
 
-    response = requests.get(api_url, params={'$filter': query})
-    try:
-        json_data = json.loads(response.text)
-    except json.JSONDecodeError:
-        return {}, {}
 
-    if 'Items' not in json_data:
-        return {}, {}
+@cached("pricing", maxsize=PRICING_CACHE_SIZE, ttl=PRICING_CACHE_TTL, should_cache=has_prices)
+def _fetch_azure_pricing(sku: str, region: str):
+    """`fetch_azure_pricing` from the region's prefetched table if there is one, else from the API."""
+    table = fresh_region_table(region)
+    if table is not None:
+        return table.parse_sku(sku)
 
-    all_items.extend(json_data['Items'])
-    next_page = json_data.get('NextPageLink')
+    all_items = fetch_retail_items(f"armRegionName eq '{region}' and armSkuName eq '{sku}'")
+    if all_items is None:
+        return {}, {}
+    return parse_items(all_items)
 
-    while next_page:
-        response = requests.get(next_page)
-        json_data = json.loads(response.text)
-        if 'Items' in json_data:
-            all_items.extend(json_data['Items'])
-        next_page = json_data.get('NextPageLink')
 
-    return parse_items(all_items)
+def fetch_retail_items(query: str):
+    """Returns every item matching an OData `$filter` through the pooled client; None if the API kept failing."""
+    try:
+        return get_default_client().fetch_items(query)
+    except AzureRetailError as e:
+        print(f" Azure retail prices fetch failed: {e}")
+        return None
 
 def parse_items(items):
     pricing_map = {}
@@ -134,4 +150,119 @@ def parse_items(items):
     return pricing_map, labels_map
 
 
+class _CategoryColumn:
+    """String column stored as integer codes into a list of distinct values."""
+
+    __slots__ = ("values", "codes", "_lookup")
+
+    def __init__(self):
+        self.values = []
+        self.codes = array('I')
+        self._lookup = {}
+
+    def append(self, value):
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+
+class AzureRegionPriceTable:
+    """
+    Columnar, in-memory copy of the Linux Virtual Machines retail prices of one region.
+
+    Rows are grouped by `armSkuName`, so the rows for a SKU are one contiguous slice.
+    Repeated strings (product, meter, term, ...) are stored once per distinct value.
+    """
+
+    _FIELDS = ('armSkuName', 'armRegionName', 'productName', 'meterName', 'skuName', 'reservationTerm')
+
+    def __init__(self, region: str, items):
+        self.region = region
+        self.columns = {field: _CategoryColumn() for field in self._FIELDS}
+        self.retail_price = array('d')
+        self._sku_rows = {}
+        self._parsed = {}
+
+        rows = sorted((item for item in items if is_linux_item(item)), key=lambda item: item.get('armSkuName', ''))
+        for row, item in enumerate(rows):
+            sku = item.get('armSkuName', '')
+            start, _ = self._sku_rows.get(sku, (row, row))
+            self._sku_rows[sku] = (start, row + 1)
+            for field, column in self.columns.items():
+                column.append(item.get(field))
+            self.retail_price.append(float(item.get('retailPrice', 0.0)))
+
+    def __len__(self):
+        return len(self.retail_price)
+
+    def skus(self):
+        return list(self._sku_rows)
+
+    def items_for(self, sku: str):
+        """Rebuilds the retail API items for one SKU from the columns."""
+        start, end = self._sku_rows.get(sku, (0, 0))
+        items = []
+        for row in range(start, end):
+            item = {field: column[row] for field, column in self.columns.items() if column[row] is not None}
+            item['retailPrice'] = self.retail_price[row]
+            items.append(item)
+        return items
+
+    def parse_sku(self, sku: str):
+        """Same result as `parse_items` on the API response for `sku`, memoized per SKU."""
+        if sku not in self._parsed:
+            self._parsed[sku] = parse_items(self.items_for(sku))
+        pricing_map, labels_map = self._parsed[sku]
+        return dict(pricing_map), {label: dict(info) for label, info in labels_map.items()}
+
+
+@single_flight
+def prefetch_azure_region(region: str):
+    """
+    Downloads every Virtual Machines retail price for a region into an `AzureRegionPriceTable`.
+
+    For the next `PRICING_CACHE_TTL` seconds, `fetch_azure_pricing` calls for any SKU in the
+    region are answered from memory instead of one paginated API query per SKU.
+
+    Parameters:
+    ----------
+    region : str
+        Azure region name in `armRegionName` format (e.g., "germanywestcentral").
+
+    Returns:
+    -------
+    AzureRegionPriceTable or None
+        The cached table, or None if the API returned no usable response.
+    """
+    items = fetch_retail_items(f"armRegionName eq '{region}' and serviceName eq 'Virtual Machines'")
+    if items is None:
+        return None
+
+    table = AzureRegionPriceTable(region, items)
+    with _region_tables_lock:
+        _region_tables[region.lower()] = (time.time(), table)
+    print(f"\n Azure bulk prefetch for {region}: {len(items)} items, {len(table)} Linux rows, {len(table.skus())} SKUs")
+    return table
+
+
+def fresh_region_table(region: str):
+    """The prefetched table of `region` if it is younger than `PRICING_CACHE_TTL`; stale tables are dropped."""
+    with _region_tables_lock:
+        entry = _region_tables.get(region.lower())
+        if entry is None:
+            return None
+        fetched_at, table = entry
+        if time.time() - fetched_at > PRICING_CACHE_TTL:
+            del _region_tables[region.lower()]
+            return None
+        return table
+
 
+def clear_azure_region_tables():
+    with _region_tables_lock:
+        _region_tables.clear()
@@ -0,0 +1,184 @@
+"""
+Pooled HTTP client for the Azure Retail Prices API.
+
+One `requests.Session` with a sized connection pool is shared by every call, so
+pages reuse keep-alive connections instead of paying a TLS handshake each.
+Every page goes through the shared ("azure", "retail") rate limiter: 429 and
+5xx answers are retried with jittered exponential backoff (honouring
+Retry-After) and throttling lowers the concurrency, malformed JSON bodies are
+retried instead of crashing the pagination, and once the first page shows the
+`$skip` page size the remaining pages are fetched concurrently with bounded
+parallelism.
+
+The base URL is configurable (`AZURE_RETAIL_PRICES_URL`), so the client can be
+pointed at a local stub HTTP server.
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from metrics import instrument_session
+from rate_limit import call
+from replay_transport import transport_adapter
+
+API_URL = os.environ.get("AZURE_RETAIL_PRICES_URL", "https://prices.azure.com/api/retail/prices")
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+class AzureRetailError(Exception):
+    """Raised when a Retail Prices page cannot be fetched or decoded after all retries."""
+
+
+def _skip_of(url: str):
+    for key, value in parse_qsl(urlsplit(url).query, keep_blank_values=True):
+        if key == '$skip':
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _with_skip(url: str, skip: int):
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != '$skip']
+    query.append(('$skip', str(skip)))
+    return urlunsplit(parts._replace(query=urlencode(query, quote_via=quote, safe="$'")))
+
+
+class AzureRetailClient:
+    """
+    Retail Prices API client with connection pooling, retries and concurrent pagination.
+
+    Parameters:
+    ----------
+    base_url : str, optional
+        Retail Prices endpoint; point it at a stub server for offline testing.
+    max_workers : int, optional
+        Upper bound on concurrent page requests (and on pooled connections).
+    max_retries : int, optional
+        Attempts per page for 429/5xx answers and undecodable bodies.
+    backoff_factor : float, optional
+        Base delay in seconds; retry n waits a random time up to backoff_factor * 2**n.
+    timeout : float, optional
+        Per-request timeout in seconds.
+    """
+
+    def __init__(self, base_url: str = API_URL, max_workers: int = 4, max_retries: int = 5,
+                 backoff_factor: float = 0.5, timeout: float = 30.0):
+        self.base_url = base_url
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+
+        adapter = transport_adapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        instrument_session(self.session, "azure")
+
+    def close(self):
+        self.session.close()
+
+    def _fetch_page(self, url: str, params=None):
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        if response.status_code in RETRY_STATUS_CODES:
+            response.raise_for_status()  # retried by the rate limiter
+        if response.status_code >= 400:
+            raise AzureRetailError(f"HTTP {response.status_code} from {url}: {response.text[:200]}")
+        return response.json()
+
+    def get_page(self, url: str, params=None):
+        """Fetches and decodes one page; retries 429/5xx answers, connection errors and bodies that are not valid JSON."""
+        try:
+            return call("azure", "retail", self._fetch_page, url, params, attempts=self.max_retries + 1,
+                        base_delay=self.backoff_factor, retry_on=(requests.RequestException, ValueError))
+        except (requests.RequestException, ValueError) as e:
+            raise AzureRetailError(f"Giving up on {url} after {self.max_retries + 1} attempts: {e}") from e
+
+    def fetch_items(self, query: str):
+        """
+        Returns every item matching an OData `$filter`.
+
+        The first page is fetched on its own. If its NextPageLink carries a `$skip`
+        offset, that offset is the page size and up to `max_workers` following pages
+        are kept in flight; no page is requested once a short or final page has
+        arrived. Otherwise the NextPageLink chain is followed serially.
+
+        Parameters:
+        ----------
+        query : str
+            OData filter, e.g. "armRegionName eq 'westeurope' and armSkuName eq 'Standard_D8as_v5'".
+
+        Returns:
+        -------
+        List[dict]
+            Retail price items in API order.
+        """
+        first = self.get_page(self.base_url, params={'$filter': query})
+        items = list(first.get('Items', []))
+        next_page = first.get('NextPageLink')
+        if not next_page:
+            return items
+
+        page_size = _skip_of(next_page)
+        if not page_size or self.max_workers == 1:
+            while next_page:
+                page = self.get_page(next_page)
+                items.extend(page.get('Items', []))
+                next_page = page.get('NextPageLink')
+            return items
+
+        def is_last(page):
+            return not page.get('NextPageLink') or len(page.get('Items', [])) < page_size
+
+        last_seen = threading.Event()  # set as soon as any page, even an out-of-order one, is the last
+
+        def on_done(future):
+            if future.cancelled():
+                return
+            if future.exception() is not None or is_last(future.result()):
+                last_seen.set()
+
+        offset = page_size
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="azure-retail") as pool:
+            def schedule():
+                nonlocal offset
+                future = pool.submit(self.get_page, _with_skip(next_page, offset))
+                future.add_done_callback(on_done)
+                pending.append(future)
+                offset += page_size
+
+            try:
+                for _ in range(self.max_workers):
+                    schedule()
+                while pending:
+                    page = pending.popleft().result()
+                    items.extend(page.get('Items', []))
+                    if is_last(page):
+                        break
+                    if not last_seen.is_set():
+                        schedule()
+            finally:
+                for future in pending:
+                    future.cancel()
+        return items
+
+
+def get_default_client():
+    """Returns the process-wide client, creating it on first use."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = AzureRetailClient()
+        return _default_client
@@ -0,0 +1,90 @@
+"""
+Background execution of blocking provider calls for the Panel dashboard.
+
+SDK calls (boto3, Azure, Google API client) block. Running them on the
+Tornado event loop freezes every session served by the process, so the
+dashboard callbacks hand them to a shared thread pool and await the result.
+
+`LatestOnly` guards a kind of request (e.g. "matching instances") so that
+when a newer widget change supersedes a fetch, the older one is cancelled
+if it has not started yet and its result is dropped if it has. It can also
+debounce: typing "16" into a numeric input then fetches once, for 16.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+WIDGET_DEBOUNCE_SECONDS = float(os.environ.get("DASHBOARD_DEBOUNCE_SECONDS", 0.4))
+
+EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("DASHBOARD_FETCH_WORKERS", 8)),
+    thread_name_prefix="provider-fetch"
+)
+
+
+class StaleResult(Exception):
+    """Raised to the caller of a fetch that a newer request of the same kind superseded."""
+
+
+async def run_in_background(fn, *args, **kwargs):
+    """Runs a blocking call on the shared executor and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(EXECUTOR, functools.partial(fn, *args, **kwargs))
+
+
+class LatestOnly:
+    """Lets only the most recent of a series of fetches deliver its result."""
+
+    def __init__(self):
+        self._generation = 0
+        self._pending = None
+
+    def begin(self):
+        """Starts a new request, superseding the previous one; returns its token."""
+        self._generation += 1
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+        self._pending = None
+        return self._generation
+
+    def is_current(self, token: int):
+        return token == self._generation
+
+    async def debounce(self, seconds: float):
+        """
+        Waits for input to settle before fetching.
+
+        Raises:
+        ------
+        StaleResult
+            If another request of this kind started during the wait.
+        """
+        token = self.begin()
+        await asyncio.sleep(seconds)
+        if not self.is_current(token):
+            raise StaleResult()
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Runs `fn` in the background as the newest request of this kind.
+
+        Raises:
+        ------
+        StaleResult
+            If another `run` or `begin` started before this one finished.
+        """
+        token = self.begin()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(EXECUTOR, functools.partial(fn, *args, **kwargs))
+        self._pending = future
+        try:
+            result = await future
+        except asyncio.CancelledError:
+            if self.is_current(token):
+                raise
+            raise StaleResult() from None
+        if not self.is_current(token):
+            raise StaleResult()
+        return result
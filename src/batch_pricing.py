@@ -0,0 +1,227 @@
+"""
+Headless batch pricing for large (cloud, region, vCPU, RAM) matrices.
+
+A job spec (JSON or YAML) lists the shapes and regions to price. Every
+(cloud, region, shape) combination is one task: it matches instances with the
+same helpers as the dashboard and prices each match with `fetch_aws_pricing`,
+`fetch_azure_pricing` or `fetch_gcp_pricing`. Tasks run on a thread pool,
+with a per-provider semaphore bounding how many calls hit each provider at
+once. Finished tasks are appended to a JSON-lines checkpoint, so an
+interrupted run picks up where it stopped, and the rows are written as
+Parquet (needs `pyarrow`) or CSV.
+
+Example spec (YAML):
+
+    output: prices.parquet
+    workers: 16
+    concurrency: {AWS: 4, Azure: 4, GCP: 2}
+    pricing_types: [On-Demand, Spot, Reserved]
+    azure_subscription_id: 00000000-0000-0000-0000-000000000000
+    gcp_project_id: my-project
+    gcp_service_account_file: /path/to/key.json
+    shapes:
+      - {vcpus: 2, ram: 8}
+      - {vcpus: 4, ram: 16}
+    regions:
+      AWS: [us-east-1, eu-central-1]
+      Azure: [germanywestcentral]
+      GCP: [europe-west3]
+
+Usage:
+    python batch_pricing.py job.yaml
+    python batch_pricing.py job.yaml --restart    # ignore the existing checkpoint
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from cross_cloud import CLOUDS, match_shape, price_instance
+from price_normalization import pricing_type
+
+DEFAULT_WORKERS = 8
+DEFAULT_CONCURRENCY = {"AWS": 4, "Azure": 4, "GCP": 2}
+OUTPUT_COLUMNS = [
+    "Cloud", "Region", "vCPUs", "Memory (GB)", "Instance", "Model",
+    "Pricing Type", "Monthly Cost (USD)", "Fetched At",
+]
+
+
+def load_job_spec(path: str):
+    """Reads a job spec from a .json, .yaml or .yml file."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def expand_tasks(spec: dict):
+    """
+    Expands a job spec into (cloud, region, vcpus, ram) tasks.
+
+    Every shape in `shapes` is combined with every region of every cloud in `regions`.
+    Extra one-off combinations may be listed under `tasks` as {cloud, region, vcpus, ram}.
+    """
+    tasks = []
+    for cloud in CLOUDS:
+        for region in (spec.get("regions") or {}).get(cloud, []):
+            for shape in spec.get("shapes", []):
+                tasks.append((cloud, region, int(shape["vcpus"]), float(shape["ram"])))
+    for task in spec.get("tasks", []):
+        tasks.append((task["cloud"], task["region"], int(task["vcpus"]), float(task["ram"])))
+    # Keep the first occurrence of each task, in spec order
+    return list(dict.fromkeys(tasks))
+
+
+def task_key(task):
+    cloud, region, vcpus, ram = task
+    return f"{cloud}|{region}|{vcpus}|{ram:g}"
+
+
+def read_checkpoint(path: str):
+    """Returns {task key: rows} for the tasks a previous run completed."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a partial last line; that task is simply redone
+                continue
+            if entry.get("error") is None:
+                done[entry["key"]] = entry["rows"]
+    return done
+
+
+class BatchPricingRun:
+    """One run of a job spec: executes the tasks not in the checkpoint and collects all rows."""
+
+    def __init__(self, spec: dict, checkpoint_path: str):
+        self.spec = spec
+        self.checkpoint_path = checkpoint_path
+        self.config = {
+            "azure_subscription_id": spec.get("azure_subscription_id"),
+            "gcp_project_id": spec.get("gcp_project_id"),
+            "gcp_service_account_file": spec.get("gcp_service_account_file"),
+        }
+        concurrency = {**DEFAULT_CONCURRENCY, **(spec.get("concurrency") or {})}
+        self.limits = {cloud: threading.BoundedSemaphore(max(1, int(concurrency[cloud]))) for cloud in CLOUDS}
+        self.pricing_types = spec.get("pricing_types")
+        self._checkpoint_lock = threading.Lock()
+
+    def _record(self, key, rows, error=None):
+        with self._checkpoint_lock:
+            with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "rows": rows, "error": error}) + "\n")
+
+    def run_task(self, task):
+        """Matches and prices one (cloud, region, vcpus, ram) task; returns its rows."""
+        cloud, region, vcpus, ram = task
+        with self.limits[cloud]:
+            matches = match_shape(cloud, region, vcpus, ram, self.config)
+
+        rows = []
+        for name in matches:
+            with self.limits[cloud]:
+                prices = price_instance(cloud, name, region, vcpus, ram)
+            fetched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            for label, monthly in prices.items():
+                kind = pricing_type(label)
+                if self.pricing_types and kind not in self.pricing_types:
+                    continue
+                rows.append({
+                    "Cloud": cloud,
+                    "Region": region,
+                    "vCPUs": vcpus,
+                    "Memory (GB)": ram,
+                    "Instance": name,
+                    "Model": label,
+                    "Pricing Type": kind,
+                    "Monthly Cost (USD)": monthly,
+                    "Fetched At": fetched_at,
+                })
+        return rows
+
+    def run(self, workers: int = DEFAULT_WORKERS):
+        """
+        Runs every pending task.
+
+        Returns:
+        -------
+        Tuple[pd.DataFrame, List[str]]
+            - Rows of all completed tasks, including those from the checkpoint.
+            - Errors of tasks that failed; they are retried by the next run.
+        """
+        done = read_checkpoint(self.checkpoint_path)
+        tasks = expand_tasks(self.spec)
+        pending = [task for task in tasks if task_key(task) not in done]
+        print(f"\n Batch pricing: {len(tasks)} tasks, {len(tasks) - len(pending)} already checkpointed")
+
+        errors = []
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch-pricing") as pool:
+            futures = {pool.submit(self.run_task, task): task for task in pending}
+            for i, future in enumerate(as_completed(futures), start=1):
+                key = task_key(futures[future])
+                try:
+                    rows = future.result()
+                except Exception as e:
+                    errors.append(f"{key}: {e}")
+                    self._record(key, [], error=str(e))
+                else:
+                    done[key] = rows
+                    self._record(key, rows)
+                print(f" [{i}/{len(pending)}] {key} ({time.time() - start:.1f}s)")
+
+        rows = [row for task in tasks for row in done.get(task_key(task), [])]
+        return pd.DataFrame(rows, columns=OUTPUT_COLUMNS), errors
+
+
+def write_output(df: pd.DataFrame, path: str):
+    """Writes Parquet for .parquet paths (needs `pyarrow`), CSV otherwise."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Writing Parquet needs `pip install pyarrow`; use a .csv output path otherwise.") from e
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def run_job(spec_path: str, output: str = None, restart: bool = False, workers: int = None):
+    """Runs the job spec at `spec_path` and writes its output; returns (DataFrame, errors)."""
+    spec = load_job_spec(spec_path)
+    output = output or spec.get("output", "prices.parquet")
+    checkpoint = spec.get("checkpoint") or f"{output}.checkpoint.jsonl"
+    if restart and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    df, errors = BatchPricingRun(spec, checkpoint).run(workers or int(spec.get("workers", DEFAULT_WORKERS)))
+    write_output(df, output)
+    print(f"\n Wrote {len(df)} rows to {output}")
+    for error in errors:
+        print(f" Failed: {error}")
+    return df, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price a matrix of (cloud, region, vCPU, RAM) shapes.")
+    parser.add_argument("spec", help="Job spec (.json, .yaml or .yml)")
+    parser.add_argument("--output", help="Output file (.parquet or .csv); overrides the spec")
+    parser.add_argument("--workers", type=int, help="Thread pool size; overrides the spec")
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoint and price everything again")
+    args = parser.parse_args()
+
+    _, failed = run_job(args.spec, output=args.output, restart=args.restart, workers=args.workers)
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,276 @@
+"""
+Background warm-up and scheduled refresh of provider catalogs and prices.
+
+Inside the Panel server, `schedule_warmup` runs one refresh at startup and
+then every `DASHBOARD_WARMUP_INTERVAL` seconds (by default a little under the
+pricing cache TTL, so entries are renewed before they expire). A refresh:
+
+1. reloads the region lists of the configured clouds,
+2. rebuilds the EC2 instance-type catalogs of the configured AWS regions, the
+   Azure resource SKU catalog and the GCP machine-type catalog,
+3. re-matches and re-prices every (cloud, region, shape) of the spec, which
+   refreshes every pricing cache entry involved.
+
+Cached entries are replaced in place (see `shared_cache.refreshing`), so
+sessions keep reading the previous values until the new ones land. The
+resulting prices are diffed against the previous snapshot, kept in SQLite:
+only added, changed or removed rows are written, and their counts are
+reported.
+
+The spec uses the batch pricing format (see `batch_pricing.py`) and is read
+from `DASHBOARD_WARMUP_SPEC`; without it nothing is scheduled.
+
+Usage (one refresh, outside the dashboard):
+    python catalog_warmup.py warmup.yaml
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from metrics import timed
+from providers import load_provider
+from shared_cache import PRICING_CACHE_TTL, refreshing
+
+CACHE_DIR = os.environ.get(
+    "MULTI_CLOUD_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "multi-cloud-dashboard")
+)
+WARMUP_SPEC_PATH = os.environ.get("DASHBOARD_WARMUP_SPEC")
+WARMUP_INTERVAL = float(os.environ.get("DASHBOARD_WARMUP_INTERVAL", 0.9 * PRICING_CACHE_TTL))  # seconds
+SNAPSHOT_PATH = os.environ.get("DASHBOARD_PRICE_SNAPSHOT_PATH", os.path.join(CACHE_DIR, "price_snapshot.sqlite"))
+
+# Cache namespaces renewed by a refresh; catalogs are rebuilt explicitly, once per refresh
+REFRESHED_NAMESPACES = ("regions", "pricing")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    cloud TEXT NOT NULL,
+    region TEXT NOT NULL,
+    vcpus INTEGER NOT NULL,
+    ram REAL NOT NULL,
+    instance TEXT NOT NULL,
+    model TEXT NOT NULL,
+    pricing_type TEXT,
+    monthly REAL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (cloud, region, vcpus, ram, instance, model)
+) WITHOUT ROWID;
+"""
+
+last_report = {}
+_run_lock = threading.Lock()
+
+
+class PriceSnapshot:
+    """The prices of the last refresh, per (cloud, region, vcpus, ram, instance, model)."""
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def apply(self, task, rows):
+        """
+        Replaces the snapshot of one (cloud, region, vcpus, ram) task with `rows`, writing only the differences.
+
+        Returns:
+        -------
+        dict
+            Counts of added, changed, removed and unchanged prices.
+        """
+        cloud, region, vcpus, ram = task
+        fresh = {
+            (row["Instance"], row["Model"]): (row["Pricing Type"], round(float(row["Monthly Cost (USD)"]), 6))
+            for row in rows
+        }
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+        conn = self._connect()
+        try:
+            with conn:
+                previous = {
+                    (instance, model): (kind, monthly)
+                    for instance, model, kind, monthly in conn.execute(
+                        "SELECT instance, model, pricing_type, monthly FROM prices "
+                        "WHERE cloud = ? AND region = ? AND vcpus = ? AND ram = ?",
+                        (cloud, region, vcpus, ram),
+                    )
+                }
+                added = [key for key in fresh if key not in previous]
+                changed = [key for key in fresh if key in previous and previous[key] != fresh[key]]
+                removed = [key for key in previous if key not in fresh]
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(cloud, region, vcpus, ram, *key, *fresh[key], now) for key in added + changed],
+                )
+                conn.executemany(
+                    "DELETE FROM prices WHERE cloud = ? AND region = ? AND vcpus = ? AND ram = ? "
+                    "AND instance = ? AND model = ?",
+                    [(cloud, region, vcpus, ram, *key) for key in removed],
+                )
+        finally:
+            conn.close()
+
+        return {
+            "added": len(added),
+            "changed": len(changed),
+            "removed": len(removed),
+            "unchanged": len(fresh) - len(added) - len(changed),
+        }
+
+
+def _refresh_regions(region_loaders, clouds, report):
+    for cloud, (loader, *args) in region_loaders.items():
+        if cloud not in clouds:
+            continue
+        try:
+            load_provider(cloud)
+            report["regions"][cloud] = len(loader.refresh(*args))
+        except Exception as e:
+            report["errors"].append(f"{cloud} regions: {e}")
+
+
+def _refresh_catalogs(spec, clouds, report):
+    import instance_catalog
+
+    for region in (spec.get("regions") or {}).get("AWS", []):
+        try:
+            report["catalogs"][f"AWS {region}"] = len(instance_catalog.aws_catalogs.refresh(region))
+        except Exception as e:
+            report["errors"].append(f"AWS {region} catalog: {e}")
+    if "Azure" in clouds and spec.get("azure_subscription_id"):
+        try:
+            catalog = instance_catalog.load_azure_skus.refresh(spec["azure_subscription_id"])
+            report["catalogs"]["Azure"] = len(catalog)
+        except Exception as e:
+            report["errors"].append(f"Azure SKU catalog: {e}")
+    if "GCP" in clouds and spec.get("gcp_project_id"):
+        try:
+            key = (spec["gcp_project_id"], spec.get("gcp_service_account_file"))
+            report["catalogs"]["GCP"] = len(instance_catalog.gcp_catalogs.refresh(key))
+        except Exception as e:
+            report["errors"].append(f"GCP machine type catalog: {e}")
+
+
+def _refresh_task(run, task):
+    with refreshing(*REFRESHED_NAMESPACES):
+        return run.run_task(task)
+
+
+@timed("warmup", "refresh")
+def run_warmup(spec: dict, region_loaders: dict = None, snapshot: PriceSnapshot = None, workers: int = None):
+    """
+    Runs one refresh (regions, catalogs, prices) and returns its report.
+
+    Parameters:
+    ----------
+    spec : dict
+        Batch pricing spec: `regions`, `shapes`, `azure_subscription_id`, `gcp_project_id`, ...
+    region_loaders : dict, optional
+        {cloud: (cached region function, *args)} as used by the dashboard.
+    snapshot : PriceSnapshot, optional
+        Where the previous prices are kept; defaults to `SNAPSHOT_PATH`.
+    workers : int, optional
+        Parallel tasks; defaults to the spec's `workers`.
+    """
+    global last_report
+    # Imported here: batch_pricing loads every provider, which the dashboard only does on demand
+    from batch_pricing import DEFAULT_WORKERS, BatchPricingRun, expand_tasks, task_key
+
+    clouds = [cloud for cloud, regions in (spec.get("regions") or {}).items() if regions]
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "regions": {},
+        "catalogs": {},
+        "tasks": 0,
+        "prices": {"added": 0, "changed": 0, "removed": 0, "unchanged": 0},
+        "errors": [],
+    }
+    start = time.time()
+
+    with _run_lock:
+        for cloud in clouds:
+            try:
+                load_provider(cloud)
+            except ImportError as e:
+                report["errors"].append(f"{cloud}: {e}")
+        _refresh_regions(region_loaders or {}, clouds, report)
+        _refresh_catalogs(spec, clouds, report)
+
+        snapshot = snapshot or PriceSnapshot()
+        run = BatchPricingRun(spec, checkpoint_path=None)
+        tasks = expand_tasks(spec)
+        with ThreadPoolExecutor(max_workers=max(1, workers or spec.get("workers", DEFAULT_WORKERS)),
+                                thread_name_prefix="catalog-warmup") as pool:
+            futures = {pool.submit(_refresh_task, run, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    counts = snapshot.apply(task, future.result())
+                except Exception as e:
+                    report["errors"].append(f"{task_key(task)}: {e}")
+                    continue
+                report["tasks"] += 1
+                for name, count in counts.items():
+                    report["prices"][name] += count
+
+    report["seconds"] = round(time.time() - start, 2)
+    prices = report["prices"]
+    print(f"\n Warm-up: {report['tasks']}/{len(tasks)} tasks in {report['seconds']:.1f}s, "
+          f"{prices['changed']} prices changed, {prices['added']} added, {prices['removed']} removed, "
+          f"{len(report['errors'])} errors")
+    last_report = report
+    return report
+
+
+def schedule_warmup(region_loaders: dict, spec_path: str = WARMUP_SPEC_PATH, interval: float = WARMUP_INTERVAL):
+    """
+    Schedules `run_warmup` in the Panel server: now, then every `interval` seconds.
+
+    Panel schedules a task name once per process, so calling this from every
+    session is safe. Refreshes run on the background executor and re-read the
+    spec, so edits apply from the next refresh.
+    """
+    if not spec_path:
+        return
+    import panel as pn
+    from background import run_in_background
+
+    def refresh_now():
+        from batch_pricing import load_job_spec
+        return run_warmup(load_job_spec(spec_path), region_loaders)
+
+    async def refresh():
+        try:
+            await run_in_background(refresh_now)
+        except Exception as e:
+            print(f" Warm-up failed: {e}")
+
+    pn.state.schedule_task("catalog-warmup", refresh, period=f"{int(interval)}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh provider catalogs and prices once and report changed prices.")
+    parser.add_argument("spec", help="Batch pricing spec (.json/.yaml)")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    from batch_pricing import load_job_spec
+    result = run_warmup(load_job_spec(args.spec), workers=args.workers)
+    for error in result["errors"]:
+        print(f" {error}")
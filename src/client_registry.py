@@ -0,0 +1,111 @@
+"""
+Process-wide registry of provider clients and credentials.
+
+Every client, credential and Google API service is built once and reused, so
+its connection pool, cached tokens and parsed service model survive between
+calls instead of being rebuilt on every click:
+
+- boto3 clients, per (service, region): thread-safe once created, so one client
+  is shared by every thread. Creation goes through a lock because boto3's
+  default session is not thread-safe.
+- Azure: one `DefaultAzureCredential` (it caches its tokens) and one
+  `ComputeManagementClient` per subscription, both thread-safe.
+- Google: credentials per service-account file are shared. googleapiclient
+  services wrap an `httplib2.Http`, which is not thread-safe, so every thread
+  gets its own service (and connection) per (API, version, account file),
+  built from the bundled discovery documents.
+
+All clients come from the `replay_transport` factories, so recording,
+replaying and metrics apply unchanged. `clear()` drops everything, e.g. after
+credentials were rotated.
+"""
+
+import threading
+
+import replay_transport
+
+_clients = {}
+_lock = threading.RLock()  # factories may fetch shared credentials
+_local = threading.local()
+_generation = 0  # bumped by clear(); threads drop their Google services when it changes
+
+
+def _get_or_create(key, factory):
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = factory()
+    return client
+
+
+# --- AWS ---
+def aws_client(service_name: str, region_name: str = None, **kwargs):
+    """
+    The shared boto3 client of `service_name` in `region_name`, with the transport hooks installed.
+
+    Unless a `config` is given, botocore does not retry: `rate_limit` retries and paces the calls.
+    """
+    key = ("aws", service_name, region_name, tuple(sorted(kwargs.items())))
+
+    def create():
+        from botocore.config import Config
+        options = {"config": Config(retries={"total_max_attempts": 1}), **kwargs}
+        return replay_transport.aws_client(service_name, region_name=region_name, **options)
+    return _get_or_create(key, create)
+
+
+def aws_default_region():
+    """The region of boto3's default session (environment or config file), read once."""
+    def default_region():
+        import boto3
+        return boto3._get_default_session().region_name or ""
+    return _get_or_create(("aws", "default-region"), default_region) or None
+
+
+# --- Azure ---
+def azure_credential():
+    """The shared Azure token credential."""
+    return _get_or_create(("azure", "credential"), replay_transport.azure_credential)
+
+
+def azure_compute_client(subscription_id: str):
+    """The shared `ComputeManagementClient` of a subscription."""
+    return _get_or_create(
+        ("azure", "compute", subscription_id),
+        lambda: replay_transport.azure_compute_client(subscription_id, credential=azure_credential()),
+    )
+
+
+# --- Google ---
+def google_credentials(service_account_file: str = None, scopes=replay_transport.GOOGLE_SCOPES):
+    """The shared credentials of a service-account file, or application default credentials; None in replay mode."""
+    return _get_or_create(
+        ("gcp", "credentials", service_account_file, tuple(scopes)),
+        lambda: replay_transport.google_credentials(service_account_file, scopes),
+    )
+
+
+def google_service(service: str, version: str, service_account_file: str = None):
+    """This thread's googleapiclient service for (`service`, `version`, account file), built on first use."""
+    services = getattr(_local, "services", None)
+    if services is None or _local.generation != _generation:
+        services = _local.services = {}
+        _local.generation = _generation
+    key = (service, version, service_account_file)
+    client = services.get(key)
+    if client is None:
+        credentials = google_credentials(service_account_file)
+        client = services[key] = replay_transport.build_google_service(
+            service, version, service_account_file, credentials=credentials)
+    return client
+
+
+def clear():
+    """Forgets every client and credential; the next calls build new ones."""
+    global _generation
+    with _lock:
+        _clients.clear()
+        _generation += 1
@@ -0,0 +1,177 @@
+"""
+Keyed store for the accumulated multi-cloud comparison rows.
+
+Every "Compare" click adds rows keyed by (Model, Cloud, Region). Re-pricing a
+key replaces its row in place (upsert), so adding rows costs O(1) per row
+instead of re-concatenating and re-deduplicating the whole frame. Rows are
+also indexed by pricing type, so the "Compare By" view reads only the rows it
+shows.
+
+With a `path`, every upsert is appended to a JSON-lines log that is replayed
+on start, so the comparison survives a restart. The log is compacted when
+superseded rows make up most of it. A log file must have a single writer:
+`open_store(path)` returns one process-wide store per file, shared by every
+dashboard session, while `open_store()` without a path gives each caller its
+own in-memory store.
+"""
+
+import json
+import os
+import threading
+
+import pandas as pd
+
+from price_normalization import cloud_of, pricing_type
+
+KEY_COLUMNS = ("Model", "Cloud", "Region")
+COLUMNS = ["Model", "Monthly Cost (USD)", "Cloud", "Region", "Pricing Type", "Pricing Type Normalized"]
+
+
+def _type_key(value):
+    return str(value).strip().casefold()
+
+
+def comparison_rows(prices: dict, region: str):
+    """
+    Store rows for the prices of one "Compare" click.
+
+    Parameters:
+    ----------
+    prices : dict
+        Display label -> monthly cost, as returned by `price_normalization.monthly_prices`.
+    region : str
+        Region the prices were fetched for.
+
+    Returns:
+    -------
+    List[dict]
+        One row per label with the `COLUMNS`, ready for `ComparisonStore.upsert_many`.
+    """
+    rows = []
+    for label, monthly in prices.items():
+        kind = pricing_type(label)
+        rows.append({
+            "Model": label,
+            "Monthly Cost (USD)": monthly,
+            "Cloud": cloud_of(label),
+            "Region": region,
+            "Pricing Type": kind,
+            "Pricing Type Normalized": kind,
+        })
+    return rows
+
+
+class ComparisonStore:
+    """Comparison rows by (Model, Cloud, Region), with a per-pricing-type index."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._rows = {}
+        self._by_type = {}
+        self._frames = {}
+        self._log_lines = 0
+        self._lock = threading.RLock()
+        if path and os.path.exists(path):
+            self._replay()
+
+    def _replay(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._log_lines += 1
+                self._put(entry)
+
+    def _reset_memory(self):
+        self._rows.clear()
+        self._by_type.clear()
+        self._frames.clear()
+
+    def _put(self, row):
+        key = tuple(row.get(column) for column in KEY_COLUMNS)
+        previous = self._rows.get(key)
+        if previous is not None:
+            self._by_type.get(_type_key(previous.get("Pricing Type Normalized")), {}).pop(key, None)
+        self._rows[key] = row
+        self._by_type.setdefault(_type_key(row.get("Pricing Type Normalized")), {})[key] = None
+
+    def _append_log(self, entries):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+        self._log_lines += len(entries)
+        if self._log_lines > 2 * len(self._rows) + 100:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for row in self._rows.values():
+                f.write(json.dumps(row, default=str) + "\n")
+        os.replace(tmp_path, self.path)
+        self._log_lines = len(self._rows)
+
+    def upsert_many(self, rows):
+        """Inserts rows, replacing any existing row with the same (Model, Cloud, Region)."""
+        rows = [{column: row.get(column) for column in COLUMNS} for row in rows]
+        with self._lock:
+            for row in rows:
+                self._put(row)
+            self._frames.clear()
+            self._append_log(rows)
+
+    def upsert_frame(self, df: pd.DataFrame):
+        self.upsert_many(df.to_dict(orient="records"))
+
+    def clear(self):
+        with self._lock:
+            self._reset_memory()
+            if self.path and os.path.exists(self.path):
+                with open(self.path, "w", encoding="utf-8"):
+                    pass
+            self._log_lines = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def frame(self, pricing_type: str = None):
+        """
+        Rows as a DataFrame (a copy), in insertion order.
+
+        Parameters:
+        ----------
+        pricing_type : str, optional
+            Only rows of this pricing type (matched case-insensitively); all rows when omitted.
+        """
+        cache_key = None if pricing_type is None else _type_key(pricing_type)
+        with self._lock:
+            df = self._frames.get(cache_key)
+            if df is None:
+                if cache_key is None:
+                    rows = list(self._rows.values())
+                else:
+                    rows = [self._rows[key] for key in self._by_type.get(cache_key, {})]
+                df = self._frames[cache_key] = pd.DataFrame(rows, columns=COLUMNS)
+            return df.copy()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(path: str = None):
+    """The process-wide store persisted at `path`, created on first use; a private in-memory store without a path."""
+    if not path:
+        return ComparisonStore()
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ComparisonStore(key)
+        return store
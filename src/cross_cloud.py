@@ -0,0 +1,145 @@
+"""
+Cross-cloud "cheapest match for this shape" query.
+
+One vCPU/RAM shape is matched and priced on AWS, Azure and GCP at the same
+time. Every provider runs in its own thread, and the instances it matches are
+priced concurrently, so the total latency is bounded by the slowest provider
+rather than the sum of all three.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from aws_pricing import fetch_aws_pricing, get_static_aws_region_name_map
+from aws_offer_file import fetch_aws_pricing_offline, has_offer_data
+from azure_pricing import fetch_azure_pricing
+from gcp_pricing import fetch_gcp_pricing
+from instance_catalog import get_exact_instance_types, get_matching_azure_vm_sizes, get_matching_gcp_vm_types
+from price_normalization import monthly_prices, pricing_type
+
+CLOUDS = ("AWS", "Azure", "GCP")
+RESULT_COLUMNS = ["Cloud", "Region", "Instance", "Model", "Pricing Type", "Monthly Cost (USD)"]
+
+
+def fetch_instance_pricing(cloud: str, name: str, region: str, vcpus: int, ram: float):
+    """
+    Provider pricing of one instance, as keyword arguments for `monthly_prices`.
+
+    AWS regions are codes such as "eu-central-1" (the offer file is used when ingested);
+    Azure regions may be display or `armRegionName` values.
+    """
+    if cloud == "AWS":
+        location = get_static_aws_region_name_map().get(region, region)
+        fetch = fetch_aws_pricing_offline if has_offer_data(location) else fetch_aws_pricing
+        _, labels, raw_terms, spot_df = fetch(instance_type=name, region=location)
+        return {"aws_labels": labels, "aws_raw_terms": raw_terms, "spot_df": spot_df}
+    elif cloud == "Azure":
+        _, labels = fetch_azure_pricing(sku=name, region=region.lower().replace(" ", ""))
+        return {"azure_labels": labels}
+    _, labels = fetch_gcp_pricing(instance_type=name, region=region, cpu=vcpus, ram=ram)
+    return {"gcp_labels": labels}
+
+
+def available_models(pricing: dict):
+    """Every pricing model key offered by a `fetch_instance_pricing` result."""
+    return [model for key in ("aws_labels", "azure_labels", "gcp_labels") for model in pricing.get(key) or {}]
+
+
+def match_shape(cloud: str, region: str, vcpus: int, ram: float, config: dict):
+    """Instance names on `cloud` with exactly `vcpus` vCPUs and `ram` GB in `region`."""
+    if cloud == "AWS":
+        return get_exact_instance_types(region, vcpus, ram)
+    elif cloud == "Azure":
+        return get_matching_azure_vm_sizes(region, vcpus, ram, subscription_id=config["azure_subscription_id"])
+    return get_matching_gcp_vm_types(
+        region, vcpus, ram,
+        project_id=config["gcp_project_id"], service_account_file=config["gcp_service_account_file"]
+    )
+
+
+def price_instance(cloud: str, name: str, region: str, vcpus: int, ram: float):
+    """Monthly prices of one matched instance for every model it offers, keyed by display label."""
+    pricing = fetch_instance_pricing(cloud, name, region, vcpus, ram)
+    return monthly_prices(available_models(pricing), **pricing)
+
+
+def _match_and_price(cloud, region, vcpus, ram, config, pricing_pool):
+    matches = match_shape(cloud, region, vcpus, ram, config)
+    price = lambda name: price_instance(cloud, name, region, vcpus, ram)
+
+    rows, errors = [], []
+    futures = {name: pricing_pool.submit(price, name) for name in matches}
+    for name, future in futures.items():
+        try:
+            prices = future.result()
+        except Exception as e:
+            errors.append(f"{cloud} {name}: {e}")
+            continue
+        for label, monthly in prices.items():
+            rows.append({
+                "Cloud": cloud,
+                "Region": region,
+                "Instance": name,
+                "Model": label,
+                "Pricing Type": pricing_type(label),
+                "Monthly Cost (USD)": monthly,
+            })
+    return rows, errors
+
+
+def find_cheapest_matches(vcpus: int, ram: float, regions: dict, pricing_types=("On-Demand",),
+                          azure_subscription_id: str = None, gcp_project_id: str = None,
+                          gcp_service_account_file: str = None, max_pricing_workers: int = 8):
+    """
+    Matches a vCPU/RAM shape on every requested cloud concurrently and ranks the results by monthly cost.
+
+    Parameters:
+    ----------
+    vcpus : int
+        Required vCPUs.
+    ram : float
+        Required memory in GB.
+    regions : dict
+        Cloud -> region to search, e.g. {"AWS": "eu-central-1", "Azure": "germanywestcentral", "GCP": "europe-west3"}.
+        Clouds missing from the dict are skipped.
+    pricing_types : Iterable[str], optional
+        Pricing types to keep ("On-Demand", "Spot", "Reserved"); None keeps every model.
+    azure_subscription_id, gcp_project_id, gcp_service_account_file : str, optional
+        Provider settings needed for Azure and GCP matching.
+    max_pricing_workers : int, optional
+        Upper bound on concurrent pricing calls across all clouds.
+
+    Returns:
+    -------
+    Tuple[pd.DataFrame, List[str]]
+        - Every matching (instance, pricing model) with its monthly cost, cheapest first.
+        - Errors from providers or instances that could not be matched or priced.
+    """
+    config = {
+        "azure_subscription_id": azure_subscription_id,
+        "gcp_project_id": gcp_project_id,
+        "gcp_service_account_file": gcp_service_account_file,
+    }
+    clouds = [cloud for cloud in CLOUDS if regions.get(cloud)]
+    rows, errors = [], []
+
+    with ThreadPoolExecutor(max_workers=max(1, max_pricing_workers), thread_name_prefix="shape-pricing") as pricing_pool, \
+            ThreadPoolExecutor(max_workers=max(1, len(clouds)), thread_name_prefix="shape-match") as cloud_pool:
+        futures = {
+            cloud: cloud_pool.submit(_match_and_price, cloud, regions[cloud], vcpus, ram, config, pricing_pool)
+            for cloud in clouds
+        }
+        for cloud, future in futures.items():
+            try:
+                cloud_rows, cloud_errors = future.result()
+            except Exception as e:
+                errors.append(f"{cloud}: {e}")
+                continue
+            rows.extend(cloud_rows)
+            errors.extend(cloud_errors)
+
+    df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    if pricing_types is not None:
+        df = df[df["Pricing Type"].isin(list(pricing_types))]
+    return df.sort_values("Monthly Cost (USD)", kind="stable").reset_index(drop=True), errors
@@ -1,8 +1,11 @@
 
-from googleapiclient.discovery import build
-from google.auth import default
-from collections import defaultdict
+from gcp_sku_cache import get_gcp_sku_index
+from gcp_sku_index import machine_family
+from metrics import timed
+from shared_cache import PRICING_CACHE_SIZE, PRICING_CACHE_TTL, cached, has_prices
 
+@cached("pricing", maxsize=PRICING_CACHE_SIZE, ttl=PRICING_CACHE_TTL, should_cache=has_prices)
+@timed("gcp", "pricing")
 def fetch_gcp_pricing(instance_type: str, region: str, cpu: int, ram: float):
     """
     Fetches GCP VM pricing data (On-Demand, Spot, and CUD) for a given instance type, region, CPU, and RAM configuration.
@@ -27,9 +30,12 @@ def fetch_gcp_pricing(instance_type: str, region: str, cpu: int, ram: float):
 
     Notes:
     -----
-    - This function requires Google Cloud credentials to be authenticated in the environment.
-    - Uses Google Cloud Billing API to fetch SKU-level pricing information.
-    - Filters SKUs based on instance family, region, and usage type.
+    - This function requires Google Cloud credentials to be authenticated in the environment
+      the first time the SKU catalog is downloaded.
+    - SKU-level pricing comes from the local Cloud Billing catalog cache (see `gcp_sku_cache`),
+      which is refreshed in the background once it is older than its TTL.
+    - Looks up SKUs by instance family, region, and usage type in a precomputed index;
+      every predefined machine family (N1, N2, N2D, E2, C2, C3, N4, ...) is covered.
     - Combines core and RAM pricing to produce total cost per pricing model.
     - Supports:
         - OnDemand
@@ -42,18 +48,8 @@ def fetch_gcp_pricing(instance_type: str, region: str, cpu: int, ram: float):
 
     print(f"🔍 Instance: {instance_type}, Region: {region}, CPU: {cores}, RAM: {ram_gb} GB")
 
-    credentials, _ = default()
-    service = build('cloudbilling', 'v1', credentials=credentials)
-    compute_service_id = 'services/6F81-5844-456A'
-    request = service.services().skus().list(parent=compute_service_id)
-
-    skus = []
-    while request is not None:
-        response = request.execute()
-        skus.extend(response.get('skus', []))
-        request = service.services().skus().list_next(previous_request=request, previous_response=response)
-
-    print(f" Total SKUs fetched: {len(skus)}")
+    family = machine_family(instance_type)  # e.g. "N2", "N2D", "E2", "C3"
+    index = get_gcp_sku_index()
 
     results = {
         "OnDemand": {},
@@ -61,70 +57,17 @@ def fetch_gcp_pricing(instance_type: str, region: str, cpu: int, ram: float):
         "CUD": {"Commit1Yr": {}, "Commit3Yr": {}}
     }
 
-    family_prefix = instance_type.split("-")[0].upper()  # e.g. "N2", "N2D"
-    cud_key_map = {
-        "COMMIT1YR": "Commit1Yr",
-        "COMMIT3YR": "Commit3Yr"
-    }
-
-    def is_exact_family(desc: str, family: str):
-        desc = desc.upper()
-        if family == "N2":
-            return "N2" in desc and "N2D" not in desc
-        elif family == "N2D":
-            return "N2D" in desc
-        return False
-
-    def set_price(target, key, val, label, desc):
-        if key not in target:
-            target[key] = val
-            print(f"{label}: {val} | {desc}")
-
-    for sku in skus:
-        desc = sku.get("description", "").upper()
-        category = sku.get("category", {})
-        pricing_info = sku.get("pricingInfo", [])
-        usage_type = category.get("usageType", "").upper()
-        regions = [r.lower() for r in sku.get("serviceRegions", [])]
-
-        if "SOLE TENANCY" in desc or "CUSTOM" in desc:
-            continue
-        if not any(r in regions for r in [region.lower(), 'global']):
-            continue
-        if not pricing_info:
-            continue
-        if not is_exact_family(desc, family_prefix):
-            continue
-
-        try:
-            tiered = pricing_info[0]['pricingExpression']['tieredRates'][0]['unitPrice']
-            units = int(tiered.get('units', 0))
-            nanos = tiered.get('nanos', 0) / 1e9
-            price = units + nanos
-        except (TypeError, ValueError, IndexError, KeyError):
-            continue
-
-        # OnDemand
-        if usage_type == "ONDEMAND":
-            if any(k in desc for k in ["CORE", "CPU", "VCPU"]):
-                set_price(results["OnDemand"], "core", price, " OnDemand CORE", desc)
-            elif "RAM" in desc:
-                set_price(results["OnDemand"], "ram", price, " OnDemand RAM", desc)
-
-        # Spot (Preemptible)
-        elif usage_type == "PREEMPTIBLE":
-            if any(k in desc for k in ["CORE", "CPU", "VCPU"]):
-                set_price(results["Spot"], "core", price, "⚡ Spot CORE", desc)
-            elif "RAM" in desc:
-                set_price(results["Spot"], "ram", price, "⚡ Spot RAM", desc)
-
-        # CUD
-        elif usage_type in cud_key_map:
-            cud_key = cud_key_map[usage_type]
-            if any(k in desc for k in ["CORE", "CPU", "VCPU"]):
-                set_price(results["CUD"][cud_key], "core", price, f"💳 CUD CORE ({cud_key})", desc)
-            elif "RAM" in desc:
-                set_price(results["CUD"][cud_key], "ram", price, f"💳 CUD RAM ({cud_key})", desc)
+    for target, usage_type, label in [
+        (results["OnDemand"], "OnDemand", " OnDemand"),
+        (results["Spot"], "Preemptible", "⚡ Spot"),
+        (results["CUD"]["Commit1Yr"], "Commit1Yr", "💳 CUD (Commit1Yr)"),
+        (results["CUD"]["Commit3Yr"], "Commit3Yr", "💳 CUD (Commit3Yr)"),
+    ]:
+        for component in ("core", "ram"):
+            found = index.entry(family, component, usage_type, region)
+            if found:
+                target[component] = found[0]
+                print(f"{label} {component.upper()}: {found[0]} | {found[1]}")
 
     def combined_price(core_price, ram_price, cores, ram_gb):
         hourly = cores * core_price + ram_gb * ram_price
@@ -0,0 +1,243 @@
+"""
+Local on-disk cache for the GCP Cloud Billing Compute Engine SKU catalog.
+
+The catalog (`services/6F81-5844-456A`) holds tens of thousands of SKUs and
+paging through it takes several seconds. It is downloaded once into a SQLite
+file, classified once by family, component, region and usage type (see
+`gcp_sku_index`), and refreshed in a background thread once it is older than
+the TTL. Each process keeps an in-memory `GcpSkuIndex` built from the file,
+so while the cache is fresh a lookup needs no network round trip, and the
+file itself is only re-checked every `GCP_SKU_INDEX_CHECK_SECONDS`.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from gcp_sku_index import classify_sku, build_sku_index
+from client_registry import google_service
+from rate_limit import call
+
+COMPUTE_SERVICE_ID = 'services/6F81-5844-456A'
+
+CACHE_DIR = os.environ.get(
+    "MULTI_CLOUD_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "multi-cloud-dashboard")
+)
+GCP_SKU_CACHE_PATH = os.environ.get("GCP_SKU_CACHE_PATH", os.path.join(CACHE_DIR, "gcp_skus.sqlite"))
+GCP_SKU_CACHE_TTL = int(os.environ.get("GCP_SKU_CACHE_TTL", 24 * 3600))  # seconds
+# How long a loaded index is used before the file is checked for a newer snapshot (e.g. from another process)
+GCP_SKU_INDEX_CHECK_SECONDS = float(os.environ.get("GCP_SKU_INDEX_CHECK_SECONDS", 60))
+
+_SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS skus (
+    sku_id TEXT NOT NULL,
+    description TEXT NOT NULL,
+    family TEXT NOT NULL,
+    component TEXT NOT NULL,
+    usage_type TEXT NOT NULL,
+    region TEXT NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (sku_id, family, region)
+);
+CREATE INDEX IF NOT EXISTS idx_skus_family_region_usage ON skus (family, region, usage_type);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_refresh_lock = threading.Lock()
+_write_lock = threading.Lock()
+_index_lock = threading.Lock()
+_refresh_thread = None
+_loaded_index = {}  # path -> (fetched_at, checked_at, GcpSkuIndex)
+
+
+def _connect(path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+        # Older cache layout; drop it and let the next lookup download a fresh copy
+        conn.executescript("DROP TABLE IF EXISTS skus; DROP TABLE IF EXISTS meta;")
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _unit_price(sku: dict):
+    try:
+        tiered = sku['pricingInfo'][0]['pricingExpression']['tieredRates'][0]['unitPrice']
+        return int(tiered.get('units', 0)) + tiered.get('nanos', 0) / 1e9
+    except (TypeError, ValueError, IndexError, KeyError):
+        return None
+
+
+def _sku_rows(skus):
+    for sku in skus:
+        desc = sku.get("description", "")
+        category = sku.get("category", {})
+        classified = classify_sku(desc, category.get("usageType", ""), category.get("resourceGroup", ""))
+        if classified is None:
+            continue
+        price = _unit_price(sku)
+        if price is None:
+            continue
+        families, component, usage_type = classified
+        sku_id = sku.get("skuId", sku.get("name", ""))
+        for family in families:
+            for region in sku.get("serviceRegions", []):
+                yield (sku_id, desc, family, component, usage_type, region.lower(), price)
+
+
+def iter_gcp_sku_pages(service=None):
+    """Yields the Compute Engine SKU catalog one API page at a time."""
+    if service is None:
+        service = google_service('cloudbilling', 'v1')
+    request = service.services().skus().list(parent=COMPUTE_SERVICE_ID)
+    while request is not None:
+        response = call("gcp", "cloudbilling", request.execute)
+        yield response.get('skus', [])
+        request = service.services().skus().list_next(previous_request=request, previous_response=response)
+
+
+def refresh_gcp_sku_cache(path: str = GCP_SKU_CACHE_PATH, pages=None):
+    """
+    Downloads the full Compute Engine SKU catalog and atomically replaces the cached copy.
+
+    Pages are written into a staging table as they arrive, so the whole catalog is never
+    held in memory, and readers keep seeing the previous snapshot until the swap commits.
+
+    Parameters:
+    ----------
+    path : str, optional
+        SQLite file backing the cache.
+    pages : Iterable[list], optional
+        Pre-fetched SKU pages; defaults to paging through the Cloud Billing API.
+
+    Returns:
+    -------
+    int
+        Number of (SKU, region) rows stored.
+    """
+    start = time.time()
+    with _write_lock:
+        count = _write_catalog(path, pages if pages is not None else iter_gcp_sku_pages())
+    with _index_lock:
+        _loaded_index.pop(path, None)
+
+    print(f"\n GCP SKU cache refreshed: {count} rows in {time.time() - start:.2f} seconds")
+    return count
+
+
+def _write_catalog(path: str, pages):
+    conn = _connect(path)
+    try:
+        conn.execute("DROP TABLE IF EXISTS skus_staging")
+        conn.execute("CREATE TABLE skus_staging AS SELECT * FROM skus WHERE 0")
+        count = 0
+        for page in pages:
+            rows = list(_sku_rows(page))
+            conn.executemany("INSERT OR IGNORE INTO skus_staging VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            count += len(rows)
+
+        with conn:
+            conn.execute("DELETE FROM skus")
+            conn.execute("INSERT INTO skus SELECT * FROM skus_staging")
+            conn.execute("DROP TABLE skus_staging")
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('fetched_at', ?)", (str(time.time()),))
+    finally:
+        conn.close()
+    return count
+
+
+def _fetched_at(path: str):
+    if not os.path.exists(path):
+        return None
+    conn = _connect(path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'fetched_at'").fetchone()
+    finally:
+        conn.close()
+    return float(row[0]) if row else None
+
+
+def gcp_sku_cache_age(path: str = GCP_SKU_CACHE_PATH):
+    """Returns the age of the cached catalog in seconds, or None if it was never filled."""
+    fetched_at = _fetched_at(path)
+    return time.time() - fetched_at if fetched_at is not None else None
+
+
+def refresh_gcp_sku_cache_in_background(path: str = GCP_SKU_CACHE_PATH):
+    """Starts a refresh thread unless one is already running; returns immediately."""
+    global _refresh_thread
+
+    def run():
+        try:
+            refresh_gcp_sku_cache(path)
+        except Exception as e:
+            print(f" GCP SKU cache background refresh failed: {e}")
+
+    with _refresh_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return _refresh_thread
+        _refresh_thread = threading.Thread(target=run, name="gcp-sku-cache-refresh", daemon=True)
+        _refresh_thread.start()
+        return _refresh_thread
+
+
+def ensure_gcp_sku_cache(path: str = GCP_SKU_CACHE_PATH, ttl: int = GCP_SKU_CACHE_TTL):
+    """
+    Makes sure the cache is usable before a lookup.
+
+    An empty cache is filled synchronously. A stale cache is still served while a
+    background refresh replaces it, so callers never wait on the network once the
+    catalog has been downloaded.
+    """
+    age = gcp_sku_cache_age(path)
+    if age is None:
+        with _refresh_lock:
+            if gcp_sku_cache_age(path) is None:
+                refresh_gcp_sku_cache(path)
+    elif age > ttl:
+        refresh_gcp_sku_cache_in_background(path)
+
+
+def get_gcp_sku_index(path: str = GCP_SKU_CACHE_PATH, ttl: int = GCP_SKU_CACHE_TTL):
+    """
+    Returns the in-memory SKU index for the cached catalog.
+
+    The index is built in one pass over the cache file and reused until a
+    refresh writes a newer snapshot, so repeated lookups cost a dict access.
+    The file is only opened again once the loaded index was last checked more
+    than `GCP_SKU_INDEX_CHECK_SECONDS` ago.
+
+    Returns:
+    -------
+    GcpSkuIndex
+        Unit prices keyed by (family, component, usage_type, region).
+    """
+    loaded = _loaded_index.get(path)
+    if loaded is not None and time.time() - loaded[1] < GCP_SKU_INDEX_CHECK_SECONDS:
+        return loaded[2]
+
+    ensure_gcp_sku_cache(path, ttl)
+    fetched_at = _fetched_at(path)
+    with _index_lock:
+        loaded = _loaded_index.get(path)
+        if loaded is not None and loaded[0] == fetched_at:
+            _loaded_index[path] = (fetched_at, time.time(), loaded[2])
+            return loaded[2]
+
+        conn = _connect(path)
+        try:
+            index = build_sku_index(conn.execute(
+                "SELECT family, component, usage_type, region, price, description FROM skus ORDER BY rowid"
+            ))
+        finally:
+            conn.close()
+        _loaded_index[path] = (fetched_at, time.time(), index)
+        return index
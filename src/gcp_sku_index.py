@@ -0,0 +1,134 @@
+"""
+One-pass classification of GCP Compute Engine SKUs into an O(1) price lookup.
+
+Each SKU is classified once by machine family (N2, N2D, E2, C3, N4, ...),
+component (core or ram), usage type (OnDemand, Preemptible, Commit1Yr,
+Commit3Yr) and region. Pricing a machine type is then a couple of dict
+lookups instead of a substring scan over the whole catalog.
+"""
+
+import re
+
+USAGE_TYPES = {
+    "ONDEMAND": "OnDemand",
+    "PREEMPTIBLE": "Preemptible",
+    "COMMIT1YR": "Commit1Yr",
+    "COMMIT3YR": "Commit3Yr",
+}
+
+_DESCRIPTION_PREFIXES = ("SPOT PREEMPTIBLE ", "PREEMPTIBLE ", "COMMITMENT V1: ", "COMMITMENT V2: ", "COMMITMENT: ")
+_EXCLUDED_WORDS = ("SOLE TENANCY", "CUSTOM", "EXTENDED", "LICENSING", "GPU", "LOCAL SSD", "DWS", "CALENDAR MODE")
+_FAMILY_TOKEN = re.compile(r"^[A-Z]\d+[A-Z]?$")
+
+# Older SKUs describe the family by name instead of by series
+_NAMED_FAMILIES = (
+    ("COMPUTE OPTIMIZED", ("C2",)),
+    ("MEMORY-OPTIMIZED", ("M1", "M2")),
+    ("PREDEFINED", ("N1",)),
+    ("CPU", ("N1",)),
+    ("RAM", ("N1",)),
+)
+
+
+def machine_family(machine_type: str):
+    """Returns the SKU family of a machine type name, e.g. 'n2d-standard-8' -> 'N2D'."""
+    return machine_type.split("-")[0].upper()
+
+
+def _component(desc: str, resource_group: str):
+    if resource_group == "CPU":
+        return "core"
+    if resource_group == "RAM":
+        return "ram"
+    words = desc.split()
+    if any(k in words for k in ("CORE", "CPU", "VCPU")):
+        return "core"
+    if "RAM" in words:
+        return "ram"
+    return None
+
+
+def _families(desc: str):
+    for prefix in _DESCRIPTION_PREFIXES:
+        if desc.startswith(prefix):
+            desc = desc[len(prefix):]
+            break
+    token = desc.split(" ", 1)[0]
+    if _FAMILY_TOKEN.match(token):
+        return (token,)
+    for name, families in _NAMED_FAMILIES:
+        if desc.startswith(name):
+            return families
+    return ()
+
+
+def classify_sku(description: str, usage_type: str, resource_group: str = ""):
+    """
+    Classifies one Compute Engine SKU.
+
+    Parameters:
+    ----------
+    description : str
+        SKU description, e.g. "Spot Preemptible N2D AMD Instance Core running in Americas".
+    usage_type : str
+        `category.usageType` of the SKU.
+    resource_group : str, optional
+        `category.resourceGroup` of the SKU ("CPU", "RAM", ...).
+
+    Returns:
+    -------
+    Tuple[Tuple[str, ...], str, str] or None
+        (families, component, usage_type), or None for SKUs that do not price a
+        predefined machine core or GB of RAM (sole tenancy, custom, GPUs, licences, ...).
+    """
+    desc = description.upper()
+    usage = USAGE_TYPES.get(usage_type.upper())
+    if usage is None or any(word in desc for word in _EXCLUDED_WORDS):
+        return None
+
+    component = _component(desc, resource_group.upper())
+    families = _families(desc)
+    if component is None or not families:
+        return None
+    return families, component, usage
+
+
+class GcpSkuIndex:
+    """
+    Unit prices keyed by (family, component, usage_type, region).
+
+    The first SKU seen for a key wins, matching the catalog order the API returns.
+    """
+
+    def __init__(self):
+        self._prices = {}
+
+    def __len__(self):
+        return len(self._prices)
+
+    def add(self, family: str, component: str, usage_type: str, region: str, price: float, description: str = ""):
+        self._prices.setdefault((family, component, usage_type, region.lower()), (price, description))
+
+    def entry(self, family: str, component: str, usage_type: str, region: str):
+        """Returns (unit_price, description) for the region, falling back to a global SKU, or None."""
+        key = (family.upper(), component, usage_type)
+        return self._prices.get(key + (region.lower(),)) or self._prices.get(key + ("global",))
+
+    def price(self, family: str, component: str, usage_type: str, region: str):
+        found = self.entry(family, component, usage_type, region)
+        return found[0] if found else None
+
+
+def build_sku_index(rows):
+    """
+    Builds a GcpSkuIndex in one pass over classified catalog rows.
+
+    Parameters:
+    ----------
+    rows : Iterable[Tuple[str, str, str, str, float, str]]
+        (family, component, usage_type, region, unit_price, description) rows.
+    """
+    index = GcpSkuIndex()
+    for family, component, usage_type, region, price, description in rows:
+        index.add(family, component, usage_type, region, price, description)
+    return index
@@ -0,0 +1,323 @@
+"""
+Instance-type catalogs and shape matching for AWS, Azure and GCP.
+
+The EC2 catalog is downloaded once per region and kept for a TTL. Rows are
+sorted by (vCPUs, memory), so exact shape matches and range queries such as
+">= 8 vCPU and 16-64 GiB" are binary searches instead of a linear scan of
+the whole catalog. The Azure resource SKU catalog is reduced once to a
+compact (location, vCPUs, memory) index, and the GCP machine types of all
+zones are ingested once per project into a (region, vCPUs, memory) index.
+Azure and GCP matching live here too so that code outside the dashboard
+(cross-cloud queries, batch jobs) can reuse them.
+"""
+
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from metrics import timed
+from client_registry import aws_client, azure_compute_client, google_service
+from rate_limit import call, iter_pages
+from request_coalescing import single_flight
+from shared_cache import cached
+
+CATALOG_TTL = 6 * 3600  # seconds
+
+
+class ShapeIndex:
+    """
+    Instance names sorted by (vcpus, memory_gib).
+
+    Parameters:
+    ----------
+    shapes : Iterable[Tuple[str, int, float]]
+        (name, vcpus, memory_gib) for every instance type of a region.
+    """
+
+    def __init__(self, shapes):
+        rows = sorted((vcpus, memory, name) for name, vcpus, memory in shapes)
+        self._keys = [(vcpus, memory) for vcpus, memory, _ in rows]
+        self._names = [name for _, _, name in rows]
+        self.created_at = time.time()
+
+    def __len__(self):
+        return len(self._names)
+
+    def exact(self, vcpus: int, memory_gib: float):
+        """Names with exactly this vCPU count and memory size."""
+        key = (vcpus, memory_gib)
+        return self._names[bisect_left(self._keys, key):bisect_right(self._keys, key)]
+
+    def range(self, min_vcpus: int = 0, max_vcpus: int = None, min_memory_gib: float = 0.0, max_memory_gib: float = None):
+        """
+        Returns (name, vcpus, memory_gib) for every shape inside the bounds (inclusive).
+
+        Only the vCPU bounds are binary-searched; memory is filtered within that slice.
+        """
+        lo = bisect_left(self._keys, (min_vcpus, float('-inf')))
+        hi = len(self._keys) if max_vcpus is None else bisect_right(self._keys, (max_vcpus, float('inf')))
+        matches = []
+        for i in range(lo, hi):
+            vcpus, memory = self._keys[i]
+            if memory < min_memory_gib or (max_memory_gib is not None and memory > max_memory_gib):
+                continue
+            matches.append((self._names[i], vcpus, memory))
+        return matches
+
+
+class CatalogCache:
+    """Thread-safe map of key -> catalog index (anything with `created_at`), rebuilt by `loader(key)` once older than `ttl`."""
+
+    def __init__(self, loader, ttl: float = CATALOG_TTL):
+        self._loader = loader
+        self._ttl = ttl
+        self._indexes = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        index = self._indexes.get(key)
+        if index is not None and time.time() - index.created_at < self._ttl:
+            return index
+
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            index = self._indexes.get(key)
+            if index is None or time.time() - index.created_at >= self._ttl:
+                index = self._loader(key)
+                self._indexes[key] = index
+            return index
+
+    def refresh(self, key):
+        """Rebuilds the index for `key` now; readers keep the previous one until it is replaced."""
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            index = self._indexes[key] = self._loader(key)
+            return index
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(key, None)
+
+
+@timed("aws", "instance_types")
+def _load_aws_catalog(region: str):
+    ec2 = aws_client("ec2", region_name=region)
+    shapes = []
+
+    for page in iter_pages("aws", "ec2", ec2.describe_instance_types):
+        for itype in page["InstanceTypes"]:
+            shapes.append((
+                itype["InstanceType"],
+                itype["VCpuInfo"]["DefaultVCpus"],
+                round(itype["MemoryInfo"]["SizeInMiB"] / 1024, 2),
+            ))
+
+    print(f"\n AWS instance types fetched for {region}: {len(shapes)}")
+    return ShapeIndex(shapes)
+
+
+aws_catalogs = CatalogCache(_load_aws_catalog)
+
+
+@single_flight
+def get_exact_instance_types(region, exact_vcpus, exact_memory_gib):
+    """
+    Returns the EC2 instance types of a region with exactly the requested vCPUs and memory.
+
+    The region's catalog is paginated from `describe_instance_types` on first use and
+    answered from the cached index until it is older than `CATALOG_TTL`.
+    """
+    return aws_catalogs.get(region).exact(exact_vcpus, exact_memory_gib)
+
+
+def find_aws_instance_types(region: str, min_vcpus: int = 0, max_vcpus: int = None,
+                            min_memory_gib: float = 0.0, max_memory_gib: float = None):
+    """Range query over the cached EC2 catalog, e.g. >= 8 vCPU and 16-64 GiB."""
+    return aws_catalogs.get(region).range(min_vcpus, max_vcpus, min_memory_gib, max_memory_gib)
+
+
+# --- Azure ---
+def _location_key(location: str):
+    return location.lower().replace(" ", "")
+
+
+class AzureSkuCatalog:
+    """
+    The VM sizes of the Azure resource SKU catalog, reduced to what shape matching needs.
+
+    `resource_skus.list()` returns one heavy SDK object per (size, location) for every
+    resource type. Only virtual machine rows are kept: one row per distinct
+    (name, vCPUs, memory) with its locations as a bitset, plus a
+    (location, vCPUs, memory) -> names index, so matching is a dict lookup.
+
+    Parameters:
+    ----------
+    skus : Iterable[ResourceSku]
+        SDK objects (or anything with `name`, `resource_type`, `locations` and `capabilities`);
+        consumed once and not kept.
+    """
+
+    __slots__ = ("names", "vcpus", "memory_gb", "location_bits", "locations", "_index", "created_at")
+
+    def __init__(self, skus):
+        self.names = []
+        self.vcpus = array("H")
+        self.memory_gb = array("d")
+        self.location_bits = []
+        self.locations = {}  # location key -> name as reported by Azure
+        location_ids = {}
+        rows = {}
+        index = {}
+
+        for sku in skus:
+            if sku.resource_type != "virtualMachines":
+                continue
+            cores = memory = None
+            for cap in sku.capabilities or ():
+                if cap.name == "vCPUs":
+                    cores = cap.value
+                elif cap.name == "MemoryGB":
+                    memory = cap.value
+            try:
+                cores, memory = int(cores), float(memory)
+            except (TypeError, ValueError):
+                continue
+
+            name = sys.intern(sku.name)
+            row = rows.get((name, cores, memory))
+            if row is None:
+                row = rows[(name, cores, memory)] = len(self.names)
+                self.names.append(name)
+                self.vcpus.append(cores)
+                self.memory_gb.append(memory)
+                self.location_bits.append(0)
+
+            for location in sku.locations or ():
+                key = _location_key(location)
+                bit = location_ids.get(key)
+                if bit is None:
+                    bit = location_ids[key] = len(location_ids)
+                    self.locations[key] = location
+                self.location_bits[row] |= 1 << bit
+                index.setdefault((key, cores, memory), {})[name] = None
+
+        self._index = {key: tuple(names) for key, names in index.items()}
+        self.created_at = time.time()
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, region: str, vcpus: int, memory_gb: float):
+        """VM size names offered in `region` with exactly these vCPUs and memory."""
+        return list(self._index.get((_location_key(region), vcpus, float(memory_gb)), ()))
+
+    def regions(self):
+        """{location key: location name} of every location offering at least one VM size, sorted."""
+        return dict(sorted(self.locations.items()))
+
+    def locations_of(self, name: str):
+        """Location keys where a VM size is offered."""
+        keys = list(self.locations)
+        bits = 0
+        for row, row_name in enumerate(self.names):
+            if row_name == name:
+                bits |= self.location_bits[row]
+        return [key for i, key in enumerate(keys) if bits >> i & 1]
+
+
+@cached("sku_catalogs", maxsize=8, ttl=CATALOG_TTL)
+@timed("azure", "resource_skus")
+def load_azure_skus(subscription_id: str):
+    """Downloads the Azure resource SKU catalog of a subscription in its compact form."""
+    client = azure_compute_client(subscription_id)
+    # The SDK retries throttled pages itself; a failure after that re-reads the catalog
+    return call("azure", "management", lambda: AzureSkuCatalog(client.resource_skus.list()))
+
+
+@timed("azure", "match_vm_sizes")
+def get_matching_azure_vm_sizes(region: str, required_cores: int, required_memory_gb: float, subscription_id: str):
+    """
+    Returns the Azure VM sizes of `region` with exactly the requested cores and memory.
+
+    The subscription's catalog is served from the shared cache until it is older than `CATALOG_TTL`.
+    """
+    return load_azure_skus(subscription_id).match(region, required_cores, required_memory_gb)
+
+
+# --- GCP ---
+class GcpMachineTypeCatalog:
+    """
+    Machine types of every zone of a project, indexed by (region, guestCpus, memory GB).
+
+    Memory is `memoryMb / 1024` rounded to one decimal, as shown in the dashboard.
+    A name offered in several zones of a region is listed once.
+
+    Parameters:
+    ----------
+    pages : Iterable[dict]
+        `machineTypes().aggregatedList` responses; `items` maps "zones/<zone>" to {"machineTypes": [...]}.
+    """
+
+    def __init__(self, pages):
+        index = {}
+        self.zones = {}  # region -> zones
+        for page in pages:
+            for scope, scoped in (page.get("items") or {}).items():
+                zone = scope.rsplit("/", 1)[-1]
+                region = zone.rsplit("-", 1)[0]
+                machine_types = scoped.get("machineTypes") or []
+                if machine_types:
+                    self.zones.setdefault(region, set()).add(zone)
+                for mt in machine_types:
+                    key = (region, mt.get("guestCpus"), round(mt.get("memoryMb", 0) / 1024, 1))
+                    index.setdefault(key, {})[sys.intern(mt.get("name", ""))] = None
+        self._index = {key: tuple(names) for key, names in index.items()}
+        self.created_at = time.time()
+
+    def __len__(self):
+        return len(self._index)
+
+    def match(self, region: str, vcpus: int, memory_gb: float):
+        """Machine type names offered in any zone of `region` with exactly these vCPUs and memory."""
+        return list(self._index.get((region, vcpus, round(float(memory_gb), 1)), ()))
+
+
+def iter_gcp_machine_type_pages(project_id: str, service_account_file: str = None):
+    """Yields every page of `machineTypes().aggregatedList` for the project."""
+    compute = google_service('compute', 'v1', service_account_file)
+    machine_types = compute.machineTypes()
+    request = machine_types.aggregatedList(project=project_id)
+    while request is not None:
+        response = call("gcp", "compute", request.execute)
+        yield response
+        request = machine_types.aggregatedList_next(previous_request=request, previous_response=response)
+
+
+@timed("gcp", "machine_types")
+def _load_gcp_catalog(key):
+    project_id, service_account_file = key
+    catalog = GcpMachineTypeCatalog(iter_gcp_machine_type_pages(project_id, service_account_file))
+    print(f"\n GCP machine type catalog for {project_id}: {sum(map(len, catalog.zones.values()))} zones")
+    return catalog
+
+
+gcp_catalogs = CatalogCache(_load_gcp_catalog)
+
+
+@timed("gcp", "match_machine_types")
+def get_matching_gcp_vm_types(region, vcpus_required, memory_required_gb, project_id: str, service_account_file: str):
+    """
+    Returns the GCP machine types of `region` (any zone) with exactly the requested vCPUs and memory.
+
+    The project's catalog is ingested once with a paginated `aggregatedList` and answered
+    from memory until it is older than `CATALOG_TTL`.
+    """
+    return gcp_catalogs.get((project_id, service_account_file)).match(region, vcpus_required, memory_required_gb)
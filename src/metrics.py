@@ -0,0 +1,267 @@
+"""
+Latency, payload and error metrics for provider calls, in Prometheus text format.
+
+- `timed(provider, operation)` wraps a function: its latency goes into a
+  histogram and its exceptions into an error counter.
+- Transports report every HTTP exchange with `observe_transfer`: boto3 through
+  session events (`instrument_boto3`, installed by `replay_transport.aws_client`),
+  requests sessions through a response hook (`instrument_session`), the Google
+  API client through `replay_transport.ReplayHttp`. Payload bytes are the
+  response body as received, so nothing is re-serialized to measure it.
+- Cache hit ratios, single-flight counters and rate limiter state are read from
+  `shared_cache`, `request_coalescing` and `rate_limit` when scraped.
+
+The endpoint is served by the Panel server through its plugin mechanism:
+
+    panel serve multi-cloud-analysis-dashboard.py --plugins metrics
+
+and at `/metrics` of the JSON API. With `DASHBOARD_METRICS=0` nothing is
+registered and `timed` returns the function unchanged.
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+import tornado.web
+
+METRICS_ENABLED = os.environ.get("DASHBOARD_METRICS", "1").lower() not in ("0", "false", "no", "off")
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket histogram, Prometheus style."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    """Metric series keyed by (provider, operation)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.transfer_latency = {}
+        self.bytes = {}
+        self.requests = {}
+        self.errors = {}
+
+    def _histogram(self, table, key):
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram()
+        return histogram
+
+    def observe_call(self, provider: str, operation: str, seconds: float, error: bool = False):
+        key = (provider, operation)
+        with self._lock:
+            self._histogram(self.latency, key).observe(seconds)
+            if error:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def observe_transfer(self, provider: str, operation: str, seconds: float, nbytes: int, status: int = 200):
+        key = (provider, operation)
+        with self._lock:
+            self._histogram(self.transfer_latency, key).observe(seconds)
+            self.bytes[key] = self.bytes.get(key, 0) + nbytes
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if status >= 400:
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            for table in (self.latency, self.transfer_latency, self.bytes, self.requests, self.errors):
+                table.clear()
+
+    def snapshot(self):
+        with self._lock:
+            def copy(table):
+                return {key: (list(h.counts), h.total, h.count) for key, h in table.items()}
+            return {
+                "latency": copy(self.latency),
+                "transfer_latency": copy(self.transfer_latency),
+                "bytes": dict(self.bytes),
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+            }
+
+
+registry = Registry()
+
+
+def observe_transfer(provider: str, operation: str, seconds: float, nbytes: int, status: int = 200):
+    if METRICS_ENABLED:
+        registry.observe_transfer(provider, operation, seconds, nbytes, status)
+
+
+def timed(provider: str, operation: str):
+    """Decorator: records the latency of every call, and an error when it raises."""
+    def decorator(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = True
+            try:
+                result = fn(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                registry.observe_call(provider, operation, time.perf_counter() - start, error)
+        return wrapper
+    return decorator
+
+
+# --- Transport hooks ---
+def _aws_start(context, **kwargs):
+    context["metrics_start"] = time.perf_counter()
+
+
+def _aws_operation(model):
+    return f"{model.service_model.service_id.hyphenize()}.{model.name}"
+
+
+def _aws_done(http_response, model, context, **kwargs):
+    start = context.get("metrics_start")
+    if start is None:
+        return
+    content = getattr(http_response, "_content", None) or b""
+    registry.observe_transfer("aws", _aws_operation(model), time.perf_counter() - start,
+                              len(content), http_response.status_code)
+
+
+def _aws_failed(model, context, **kwargs):
+    start = context.get("metrics_start")
+    if start is None:
+        return
+    registry.observe_transfer("aws", _aws_operation(model), time.perf_counter() - start, 0, 599)
+
+
+def instrument_boto3(session):
+    """Registers the latency/bytes/error hooks on a boto3 session."""
+    if not METRICS_ENABLED:
+        return
+    session.events.register("before-parameter-build", _aws_start, unique_id="metrics-start")
+    session.events.register("after-call", _aws_done, unique_id="metrics-done")
+    session.events.register("after-call-error", _aws_failed, unique_id="metrics-failed")
+
+
+def _response_bytes(response):
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length)
+    # Only count bodies that were already read; never consume a stream here
+    return len(response._content) if response._content_consumed and response._content else 0
+
+
+def instrument_session(session, provider: str):
+    """Adds a response hook to a `requests.Session` reporting latency, bytes and status per host."""
+    if not METRICS_ENABLED:
+        return session
+
+    def hook(response, *args, **kwargs):
+        registry.observe_transfer(provider, urlsplit(response.url).netloc, response.elapsed.total_seconds(),
+                                  _response_bytes(response), response.status_code)
+    session.hooks["response"].append(hook)
+    return session
+
+
+# --- Exposition ---
+def _labels(provider, operation, **extra):
+    pairs = {"provider": provider, "operation": operation, **extra}
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for v in pairs.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(pairs, escaped)) + "}"
+
+
+def _histogram_lines(name, table):
+    lines = []
+    for (provider, operation), (counts, total, count) in sorted(table.items()):
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_labels(provider, operation, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(provider, operation)} {total:.6f}")
+        lines.append(f"{name}_count{_labels(provider, operation)} {count}")
+    return lines
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    from rate_limit import limiter_stats
+    from request_coalescing import coalescing_stats
+    from shared_cache import cache_stats
+
+    snapshot = registry.snapshot()
+    lines = [
+        "# HELP dashboard_call_seconds Latency of provider-facing functions.",
+        "# TYPE dashboard_call_seconds histogram",
+        *_histogram_lines("dashboard_call_seconds", snapshot["latency"]),
+        "# HELP dashboard_http_seconds Latency of individual provider HTTP requests.",
+        "# TYPE dashboard_http_seconds histogram",
+        *_histogram_lines("dashboard_http_seconds", snapshot["transfer_latency"]),
+    ]
+    for name, kind, help_text, table in (
+        ("dashboard_http_requests_total", "counter", "Provider HTTP requests.", snapshot["requests"]),
+        ("dashboard_http_response_bytes_total", "counter", "Response payload bytes received.", snapshot["bytes"]),
+        ("dashboard_errors_total", "counter", "Failed calls and HTTP error responses.", snapshot["errors"]),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f"{name}{_labels(*key)} {value}" for key, value in sorted(table.items())]
+
+    caches = cache_stats()
+    for name, field, kind, help_text in (
+        ("dashboard_cache_hits_total", "hits", "counter", "Shared cache hits."),
+        ("dashboard_cache_misses_total", "misses", "counter", "Shared cache misses."),
+        ("dashboard_cache_hit_ratio", "hit_ratio", "gauge", "Shared cache hit ratio."),
+        ("dashboard_cache_evictions_total", "evictions", "counter", "Shared cache evictions."),
+        ("dashboard_cache_entries", "size", "gauge", "Shared cache entries."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{namespace="{ns}"}} {stats[field]}' for ns, stats in sorted(caches.items())]
+
+    coalescing = coalescing_stats()
+    lines += ["# HELP dashboard_single_flight_total Provider fetches executed or shared by single-flight.",
+              "# TYPE dashboard_single_flight_total counter"]
+    lines += [f'dashboard_single_flight_total{{outcome="{k}"}} {v}' for k, v in sorted(coalescing.items())
+              if isinstance(v, (int, float))]
+
+    limiters = limiter_stats()
+    for name, field, kind, help_text in (
+        ("dashboard_rate_limit_concurrency", "concurrency_limit", "gauge", "Adaptive concurrency limit."),
+        ("dashboard_rate_limit_calls_total", "calls", "counter", "Calls made under the rate limiter."),
+        ("dashboard_throttled_total", "throttled", "counter", "Calls the provider throttled."),
+        ("dashboard_retries_total", "retries", "counter", "Retries after throttled or transient failures."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f"{name}{_labels(provider, endpoint or '')} {stats[field]}"
+                  for (provider, endpoint), stats in sorted(limiters.items(), key=lambda item: (item[0][0], item[0][1] or ""))]
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", CONTENT_TYPE)
+        self.finish(render())
+
+
+# Picked up by `panel serve --plugins metrics`
+ROUTES = [(r"/metrics", MetricsHandler, {})]
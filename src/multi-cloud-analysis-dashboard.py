@@ -11,22 +11,27 @@ Author: [Shiva kumar Biru / Frankfurt University of Applied Sciences]
 Date: [2025-06]
 """
 
+import asyncio
 import panel as pn
-import boto3
-import json
+import os
 import pandas as pd
 from datetime import datetime
 from bokeh.models import ColumnDataSource
 from bokeh.plotting import figure
-from azure.identity import DefaultAzureCredential
-from azure.mgmt.compute import ComputeManagementClient
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from aws_pricing import fetch_aws_pricing
-from azure_pricing import fetch_azure_pricing
-from gcp_pricing import fetch_gcp_pricing
-import time
-import sys
+from instance_catalog import (
+    get_exact_instance_types, get_matching_azure_vm_sizes, load_azure_skus,
+    get_matching_gcp_vm_types as match_gcp_vm_types,
+)
+from background import LatestOnly, StaleResult, WIDGET_DEBOUNCE_SECONDS, run_in_background
+from shared_cache import REGION_CACHE_TTL, cached
+from price_normalization import monthly_prices
+from pricing_summary import summarize_selected_pricing
+from comparison_store import comparison_rows, open_store
+from client_registry import aws_client, google_service
+from rate_limit import call
+from metrics import timed
+from providers import load_provider
+from catalog_warmup import schedule_warmup
 
 
 pn.extension()
@@ -46,9 +51,17 @@ spot_price_df = None
 cached_region_name_map = {}
 cached_azure_region_name_map = {}
 cached_gcp_region_list = []
-pricing_df = pd.DataFrame()  # Stores last comparison result
+# Accumulated comparison rows: per session, or shared by all sessions when persisted to a file
+comparison_store = open_store(os.environ.get("DASHBOARD_COMPARISON_STORE"))
 multi_cloud_plot = pn.pane.Bokeh()
 
+# Per-session guards so a superseded fetch never overwrites fresher results
+region_fetches = LatestOnly()
+instance_fetches = LatestOnly()
+pricing_fetches = LatestOnly()
+shape_fetches = LatestOnly()
+sweep_fetches = LatestOnly()
+
 
 # Widgets
 cloud_services = pn.widgets.MultiSelect(name='Select Cloud Services', options=['AWS', 'Azure', 'GCP'], size=3)
@@ -62,6 +75,20 @@ plot_pane = pn.pane.Bokeh()
 compare_button = pn.widgets.Button(name="Compare", button_type="primary")
 clear_button = pn.widgets.Button(name="Clear Chart", button_type="danger", visible=False)
 reset_df_button = pn.widgets.Button(name="Reset Multi-Cloud Data", button_type="danger")
+azure_bulk_toggle = pn.widgets.Checkbox(name="Azure: prefetch all VM prices for the region", value=False)
+
+# Cross-cloud shape query (uses the vCPU/RAM inputs and the "Compare By" pricing type)
+shape_aws_region = pn.widgets.TextInput(name="AWS region", value="us-east-1", width=160)
+shape_azure_region = pn.widgets.TextInput(name="Azure region", value="germanywestcentral", width=160)
+shape_gcp_region = pn.widgets.TextInput(name="GCP region", value="us-central1", width=160)
+shape_button = pn.widgets.Button(name="Find Cheapest Match Across Clouds", button_type="primary")
+shape_results = pn.pane.DataFrame(None, index=False, sizing_mode="stretch_width")
+
+# Cheapest-region sweep (selected cloud, all its regions; instance type or the vCPU/RAM inputs)
+sweep_instance_input = pn.widgets.TextInput(name="Instance type (empty: match vCPU/RAM)", placeholder="e.g. m5.xlarge", width=250)
+sweep_button = pn.widgets.Button(name="Sweep All Regions", button_type="primary")
+sweep_results = pn.pane.DataFrame(None, index=False, sizing_mode="stretch_width")
+sweep_plot = pn.pane.Bokeh()
 
 view_selector = pn.widgets.RadioButtonGroup(
     name="Compare By",
@@ -71,363 +98,109 @@ view_selector = pn.widgets.RadioButtonGroup(
 
 # --- AWS Region & Instance Helpers ---
 # AWS Regions
+@cached("regions", maxsize=32, ttl=REGION_CACHE_TTL)
+@timed("aws", "regions")
 def get_aws_regions():
-    start = time.time()
-    ec2 = boto3.client("ec2", region_name="us-east-1")
-    regions = ec2.describe_regions(AllRegions=True)['Regions']
-    elapsed = time.time() - start
-
-    regions_json = json.dumps(regions)
-    size_kb = sys.getsizeof(regions_json) / 1024
-    size_mb = size_kb / 1024
-
-    print(f"\n AWS region fetch")
-    print(f" Regions fetched: {len(regions)}")
-    print(f" Data size: {size_kb:.2f} KB (~{size_mb:.2f} MB)")
-    print(f" Time taken: {elapsed:.2f} seconds")
+    ec2 = aws_client("ec2", region_name="us-east-1")
+    regions = call("aws", "ec2", ec2.describe_regions, AllRegions=True)['Regions']
+    print(f"\n AWS regions fetched: {len(regions)}")
 
     return sorted([r['RegionName'] for r in regions if r['OptInStatus'] in ('opt-in-not-required', 'opted-in')])
 
 # Azure Regions
+@cached("regions", maxsize=32, ttl=REGION_CACHE_TTL)
+@timed("azure", "regions")
 def get_azure_regions(subscription_id):
-    global cached_azure_skus
-    start = time.time()
-
-    client = ComputeManagementClient(
-        credential=DefaultAzureCredential(),
-        subscription_id=subscription_id,
-    )
-
-    # Fetch and cache SKUs
-    cached_azure_skus = list(client.resource_skus.list())
-    elapsed = time.time() - start
-
-    skus_json = json.dumps([sku.as_dict() for sku in cached_azure_skus])
-    size_kb = sys.getsizeof(skus_json) / 1024
-    size_mb = size_kb / 1024
-
-    print(f"\n Azure region fetch")
-    print(f"SKUs fetched: {len(cached_azure_skus)}")
-    print(f" Data size: {size_kb:.2f} KB (~{size_mb:.2f} MB)")
-    print(f" Time taken: {elapsed:.2f} seconds")
-
-    region_display_map = {}
-    for sku in cached_azure_skus:
-        if sku.resource_type == "virtualMachines":
-            for loc in sku.locations:
-                formatted = loc.lower().replace(" ", "")
-                region_display_map[formatted] = loc
-
-    return dict(sorted(region_display_map.items()))
+    # Fetch and cache the SKU catalog (also used for VM size matching)
+    catalog = load_azure_skus(subscription_id)
+    print(f"\n Azure VM sizes fetched: {len(catalog)}")
+    return catalog.regions()
 
 
 # GCP Regions
+@cached("regions", maxsize=32, ttl=REGION_CACHE_TTL)
+@timed("gcp", "regions")
 def get_gcp_regions(project_id: str, service_account_file: str):
-    start = time.time()
-    credentials = service_account.Credentials.from_service_account_file(
-        service_account_file,
-        scopes=["https://www.googleapis.com/auth/cloud-platform"]
-    )
-    compute = build('compute', 'v1', credentials=credentials)
+    compute = google_service('compute', 'v1', service_account_file)
     request = compute.regions().list(project=project_id)
-    response = request.execute()
-    elapsed = time.time() - start
+    response = call("gcp", "compute", request.execute)
 
     regions = response.get('items', [])
-    regions_json = json.dumps(regions)
-    size_kb = sys.getsizeof(regions_json) / 1024
-    size_mb = size_kb / 1024
-
-    print(f"\n GCP region fetch")
-    print(f" Regions fetched: {len(regions)}")
-    print(f" Data size: {size_kb:.2f} KB (~{size_mb:.2f} MB)")
-    print(f" Time taken: {elapsed:.2f} seconds")
+    print(f"\n GCP regions fetched: {len(regions)}")
 
     return [r['name'] for r in regions]
 
-# AWS Friendly Region Names
-def get_static_aws_region_name_map():
-    return {
-        "us-east-1": "US East (N. Virginia)",
-        "us-east-2": "US East (Ohio)",
-        "us-west-1": "US West (N. California)",
-        "us-west-2": "US West (Oregon)",
-        "af-south-1": "Africa (Cape Town)",
-        "ap-east-1": "Asia Pacific (Hong Kong)",
-        "ap-south-1": "Asia Pacific (Mumbai)",
-        "ap-northeast-3": "Asia Pacific (Osaka)",
-        "ap-northeast-2": "Asia Pacific (Seoul)",
-        "ap-southeast-1": "Asia Pacific (Singapore)",
-        "ap-southeast-2": "Asia Pacific (Sydney)",
-        "ap-northeast-1": "Asia Pacific (Tokyo)",
-        "ca-central-1": "Canada (Central)",
-        "eu-central-1": "EU (Frankfurt)",
-        "eu-west-1": "EU (Ireland)",
-        "eu-west-2": "EU (London)",
-        "eu-south-1": "EU (Milan)",
-        "eu-west-3": "EU (Paris)",
-        "eu-north-1": "EU (Stockholm)",
-        "me-south-1": "Middle East (Bahrain)",
-        "sa-east-1": "South America (São Paulo)",
-        "me-central-1": "Middle East (UAE)",
-        "eu-central-2": "EU (Zurich)",
-        "ap-south-2": "Asia Pacific (Hyderabad)",
-        "ap-southeast-3": "Asia Pacific (Jakarta)",
-    }
-
-def get_exact_instance_types(region, exact_vcpus, exact_memory_gib):
-    start = time.time()
-    ec2 = boto3.client("ec2", region_name=region)
-    paginator = ec2.get_paginator("describe_instance_types")
-    all_data = []
-
-    for page in paginator.paginate():
-        all_data.extend(page["InstanceTypes"])
-
-    elapsed = time.time() - start
-    json_blob = json.dumps(all_data)
-    size_kb = sys.getsizeof(json_blob) / 1024
-    size_mb = size_kb / 1024
-
-    print(f"\n AWS instance type fetch")
-    print(f" Instance types fetched: {len(all_data)}")
-    print(f" Data size: {size_kb:.2f} KB (~{size_mb:.2f} MB)")
-    print(f" Time taken: {elapsed:.2f} seconds")
-
-    matching_types = []
-    for itype in all_data:
-        instance_type = itype["InstanceType"]
-        vcpus = itype["VCpuInfo"]["DefaultVCpus"]
-        memory_gib = round(itype["MemoryInfo"]["SizeInMiB"] / 1024, 2)
-        if vcpus == exact_vcpus and memory_gib == exact_memory_gib:
-            matching_types.append(instance_type)
-
-    return matching_types
-
-
-def get_matching_azure_vm_sizes(region: str, required_cores: int, required_memory_gb: float, subscription_id: str):
-    global cached_azure_skus
-
-    if not cached_azure_skus:
-        print(" Azure SKUs not cached. Fetching now...")
-        client = ComputeManagementClient(
-            credential=DefaultAzureCredential(),
-            subscription_id=subscription_id,
-        )
-        cached_azure_skus = list(client.resource_skus.list())
-
-    skus = cached_azure_skus
-
-    #  Start timer AFTER cache load
-    start = time.time()
-
-    matching_vms = []
-    for sku in skus:
-        if sku.resource_type != "virtualMachines":
-            continue
-        if region not in sku.locations:
-            continue
-
-        capabilities = {cap.name: cap.value for cap in sku.capabilities}
-        try:
-            cores = int(capabilities.get("vCPUs", 0))
-            memory = float(capabilities.get("MemoryGB", 0.0))
-        except ValueError:
-            continue
-
-        if cores == required_cores and memory == required_memory_gb:
-            matching_vms.append(sku.name)
-
-    elapsed = time.time() - start
-    print(f"\n Azure VM size match complete")
-    print(f" Matched VM sizes: {len(matching_vms)}")
-    print(f" Matching time: {elapsed:.2f} seconds")
-
-    return matching_vms
+# Region list loaders per cloud: (cached function, *args)
+REGION_LOADERS = {
+    'AWS': (get_aws_regions,),
+    'Azure': (get_azure_regions, "57f76510-1b03-4666-a9df-9fada6e1d00e"),
+    'GCP': (get_gcp_regions, gcp_project_id, gcp_service_account_file),
+}
 
 def get_matching_gcp_vm_types(region, vcpus_required, memory_required_gb):
-    start = time.time()
-    credentials = service_account.Credentials.from_service_account_file(
-        gcp_service_account_file,
-        scopes=["https://www.googleapis.com/auth/cloud-platform"]
-    )
-    compute = build('compute', 'v1', credentials=credentials)
-    zone = f"{region}-a"
-
-    request = compute.machineTypes().list(project=gcp_project_id, zone=zone)
-    response = request.execute()
-    elapsed = time.time() - start
-
-    machine_types = response.get("items", [])
-    json_blob = json.dumps(machine_types)
-    size_kb = sys.getsizeof(json_blob) / 1024
-    size_mb = size_kb / 1024
-
-    print(f"\n GCP machine type fetch")
-    print(f" Machine types fetched: {len(machine_types)}")
-    print(f" Data size: {size_kb:.2f} KB (~{size_mb:.2f} MB)")
-    print(f" Time taken: {elapsed:.2f} seconds")
-
-    matching = []
-    for mt in machine_types:
-        name = mt.get("name", "")
-        cpus = mt.get("guestCpus")
-        mem = round(mt.get("memoryMb", 0) / 1024, 1)
-        if cpus == vcpus_required and mem == memory_required_gb:
-            matching.append(name)
-
-    return matching
-
-# --- Pricing Summary Logic ---
-def summarize_selected_pricing(selected_models):
-    summary = "### Detailed Pricing Info\n"
-    for model in selected_models:
-        info = pricing_labels_map.get(model, {})
-        term_type = info.get('termType', '')
-        offering_filter = info.get('offeringClass', '')
-
-        if term_type == 'Spot':
-            if spot_price_df is not None and not spot_price_df.empty:
-                avg = spot_price_df['Price'].mean()
-                latest = spot_price_df.iloc[-1]
-                summary += f"\n#### Spot\n- Current Price: ${latest['Price']:.4f} (as of {latest['Time']})\n- 7-day Avg: ${avg:.4f}\n"
-
-        elif term_type.lower() == 'ondemand':
-            summary += "\n#### OnDemand\n"
-            for term_id, term in fetched_raw_terms.get(term_type, {}).items():
-                for dim in term.get('priceDimensions', {}).values():
-                    price = float(dim['pricePerUnit'].get('USD', 0.0))
-                    desc = dim.get('description', '')
-                    unit = dim.get('unit', '')
-                    summary += f"- ${price:.4f} per {unit} | {desc}\n"
-
-        elif term_type.lower() == 'reserved':
-            summary += f"\n#### Reserved - {offering_filter}\n"
-            grouped = {'1yr': {}, '3yr': {}}
-
-            for term_id, term in fetched_raw_terms.get(term_type, {}).items():
-                attrs = term.get('termAttributes', {})
-                if attrs.get('OfferingClass', '') != offering_filter:
-                    continue
-
-                lease = attrs.get('LeaseContractLength', '')
-                purchase = attrs.get('PurchaseOption', '')
-
-                upfront = None
-                hourly = None
-
-                for dim in term.get('priceDimensions', {}).values():
-                    price = float(dim['pricePerUnit'].get('USD', 0.0))
-                    unit = dim.get('unit', '').lower()
-
-                    if unit == 'quantity':
-                        upfront = price
-                    elif 'hr' in unit or 'hour' in unit:
-                        hourly = price
-
-                upfront = upfront if upfront is not None else 0.0
-                hourly = hourly if hourly is not None else 0.0
-
-                if lease in grouped:
-                    grouped[lease][purchase] = {
-                        'upfront': upfront,
-                        'hourly': hourly
-                    }
-
-            for lease_term, options in grouped.items():
-                summary += f"\n**Term: {lease_term.replace('yr', ' Year')}**\n"
-                for purchase_type in ['All Upfront', 'No Upfront', 'Partial Upfront']:
-                    if purchase_type in options:
-                        plan = options[purchase_type]
-                        summary += f"\n*{purchase_type}*\n"
-                        summary += f"-  Upfront: ${plan['upfront']:.2f}\n"
-                        summary += f"- Listed Hourly: ${plan['hourly']:.4f} / hour\n"
-
-                        if plan['hourly'] == 0.0 and plan['upfront'] > 0.0:
-                            months = 12 if '1yr' in lease_term else 36
-                            total_hours = months * 720
-                            effective = plan['upfront'] / total_hours
-                            summary += f"-  Effective Hourly (from upfront only): ${effective:.4f} / hour\n"
-
-        elif model in azure_pricing_labels:
-            info = azure_pricing_labels[model]
-            raw_price = info['raw_price']
-            term = info['term']
-            payment = info['payment']
-            sku = info.get('sku', 'Unknown SKU')
-            region = info.get('region', 'Unknown Region')
-
-            months = 12 if '1 year' in term.lower() else 36 if '3 year' in term.lower() else 1
-            hourly = raw_price / (months * 730) if months > 1 else raw_price
-            monthly = hourly * 730
-
-            summary += f"\n#### Azure - {model}\n"
-            summary += f"- ${hourly:.4f} per Hour | {model} for {sku} in {region}\n"
-            summary += f"- Monthly (730 hrs): ${monthly:.2f}"
-            if term != '-' or payment != '-':
-                summary += f" | Term: {term}"
-                if payment != '-':
-                    summary += f", Payment: {payment}"
-            summary += "\n"
-            
-        elif model in gcp_pricing_labels:
-            try:
-                entry = gcp_pricing_labels[model]
-                hourly = entry['raw_price']
-                monthly = hourly * 730
-                summary += f"\n#### GCP - {model}\n"
-                summary += f"- Instance Type: `{entry['instance_type']}`\n"
-                summary += f"- Region: `{entry['region']}`\n"
-                summary += f"- Hourly Price: ${hourly:.4f}\n"
-                summary += f"- Monthly (730 hrs): ${monthly:.2f}\n"
-            except KeyError as e:
-                summary += f"\n Error: Missing data for `{model}` - {e}\n"
-
+    return match_gcp_vm_types(region, vcpus_required, memory_required_gb, gcp_project_id, gcp_service_account_file)
+
+# --- Background Fetch Helpers ---
+# These block on provider SDKs, so callbacks run them on the background executor.
+# Provider modules are imported here, on first use, so the dashboard starts without the SDKs.
+def load_regions(cloud, loader, *args):
+    load_provider(cloud)
+    return loader(*args)
+
+def match_instances(cloud, selected_region, vcpus, ram):
+    if 'AWS' in cloud:
+        return get_exact_instance_types(selected_region, vcpus, ram)
+    elif 'Azure' in cloud:
+        return get_matching_azure_vm_sizes(
+            selected_region, vcpus, ram,
+            subscription_id="3678f0d5-8b1b-42cf-a148-b0d220f01c55"
+        )
+    elif 'GCP' in cloud:
+        return get_matching_gcp_vm_types(
+            selected_region, vcpus, ram
+        )
+    return []
 
+def fetch_aws_pricing_preferring_offline(instance_type, region):
+    from aws_pricing import fetch_aws_pricing
+    from aws_offer_file import fetch_aws_pricing_offline, has_offer_data
 
-    return summary.strip()
+    # Prefer the locally ingested offer file (see aws_offer_file.py) over the Pricing API
+    fetch = fetch_aws_pricing_offline if has_offer_data(region) else fetch_aws_pricing
+    return fetch(instance_type=instance_type, region=region)
 
 # --- Callback Handlers ---
-def update_instance_selector(event=None):
+async def update_instance_selector(event=None):
     selected_region = region_selector.value
     vcpus = vcpu_input.value
     ram = ram_input.value
     cloud = cloud_services.value
 
     if not selected_region or not vcpus or not ram:
+        instance_fetches.begin()  # drop any lookup still in flight
         instance_selector.options = []
         return
 
     try:
-        if 'AWS' in cloud:
-            matching = get_exact_instance_types(selected_region, vcpus, ram)
-        elif 'Azure' in cloud:
-            matching = get_matching_azure_vm_sizes(
-                selected_region, vcpus, ram,
-                subscription_id="3678f0d5-8b1b-42cf-a148-b0d220f01c55"
-            )
-        elif 'GCP' in cloud:
-            matching = get_matching_gcp_vm_types(
-                selected_region, vcpus, ram
-            )
-
-        else:
-            matching = []
-
+        await instance_fetches.debounce(WIDGET_DEBOUNCE_SECONDS)
+        matching = await instance_fetches.run(match_instances, cloud, selected_region, vcpus, ram)
         instance_selector.options = matching
+    except StaleResult:
+        return
     except Exception as e:
         instance_selector.options = []
         result_display.object = f"### Error fetching instance types: {str(e)}"
 
 
-def update_pricing_models_for_instance(event):
+async def update_pricing_models_for_instance(event):
     global aws_data, pricing_labels_map, fetched_raw_terms, spot_price_df
     global azure_data, azure_pricing_labels
     global gcp_data, gcp_pricing_labels
-    global cached_azure_region_name_map  
+    global cached_azure_region_name_map
 
     selected_instances = event.new
     if not selected_instances or not region_selector.value:
+        pricing_fetches.begin()  # drop any fetch still in flight
         pricing_model_selector.options = []
         return
 
@@ -441,8 +214,8 @@ def update_pricing_models_for_instance(event):
         if 'AWS' in cloud:
             aws_region_name = cached_region_name_map.get(region_ui, region_ui)
             result_display.object = f"### Fetching AWS pricing for {selected_instance} in {aws_region_name}..."
-            aws_data, pricing_labels_map, fetched_raw_terms, spot_price_df = fetch_aws_pricing(
-                instance_type=selected_instance, region=aws_region_name
+            aws_data, pricing_labels_map, fetched_raw_terms, spot_price_df = await pricing_fetches.run(
+                fetch_aws_pricing_preferring_offline, selected_instance, aws_region_name
             )
             pricing_model_selector.options = list(aws_data.keys())
             result_display.object = f"### Found {len(aws_data)} pricing models for {selected_instance} in {aws_region_name}"
@@ -460,17 +233,25 @@ def update_pricing_models_for_instance(event):
                 return
 
             result_display.object = f"### Fetching Azure pricing for {selected_instance} in {region_internal}..."
-            azure_data, azure_pricing_labels = fetch_azure_pricing(sku=selected_instance, region=region_internal)
+            from azure_pricing import fetch_azure_pricing
+            azure_data, azure_pricing_labels = await pricing_fetches.run(
+                fetch_azure_pricing, sku=selected_instance, region=region_internal, bulk=azure_bulk_toggle.value
+            )
             print(f" Azure pricing labels: {azure_pricing_labels}")  # DEBUG LINE
             pricing_model_selector.options = list(azure_data.keys())
             result_display.object = f"### Found {len(azure_data)} pricing models for {selected_instance} in {region_internal}"
 
         elif 'GCP' in cloud:
             result_display.object = f"### Fetching GCP pricing for {selected_instance}..."
-            gcp_data, gcp_pricing_labels = fetch_gcp_pricing(instance_type=selected_instance, region=region_ui,cpu=vcpu_input.value,ram=ram_input.value)
+            from gcp_pricing import fetch_gcp_pricing
+            gcp_data, gcp_pricing_labels = await pricing_fetches.run(
+                fetch_gcp_pricing, instance_type=selected_instance, region=region_ui, cpu=vcpu_input.value, ram=ram_input.value
+            )
             pricing_model_selector.options = list(gcp_data.keys())
             result_display.object = f"### Found {len(gcp_data)} pricing models for {selected_instance} in {region_ui}"    
 
+    except StaleResult:
+        return
     except Exception as e:
         pricing_model_selector.options = []
         result_display.object = f"### Pricing fetch failed: {str(e)}"
@@ -492,12 +273,14 @@ def update_pricing_models(cloud_selection):
     vcpu_input.disabled = True
     ram_input.disabled = True
 
-def update_pricing_models(cloud_selection):
+async def update_pricing_models(cloud_selection):
     global azure_data, azure_pricing_labels
     global gcp_data, gcp_pricing_labels
     global cached_region_name_map
     global cached_azure_region_name_map 
 
+    token = region_fetches.begin()
+
     # 🔁 FULL RESET on cloud switch
     region_selector.options = []
     region_selector.value = None
@@ -508,50 +291,72 @@ def update_pricing_models(cloud_selection):
     vcpu_input.disabled = True
     ram_input.disabled = True
 
-    if 'AWS' in cloud_selection:
-        result_display.object = "### Initializing AWS region list..."
-        try:
-            region_selector.value = None  # Clear value first
-            region_selector.options = ['-- Select a Region --'] + get_aws_regions()
-
-            cached_region_name_map = get_static_aws_region_name_map()
-
-            result_display.object = "### ✅ AWS regions loaded. Please select a region."
-            print(" Cached AWS Region Name Map:")
-            for code, name in cached_region_name_map.items():
-                print(f"{code} → {name}")
-
-        except Exception as e:
-            result_display.object = f"### AWS error: {str(e)}"
-
-
-    if 'Azure' in cloud_selection:
-        result_display.object = "### Fetching Azure regions..."
-        try:
-            region_map = get_azure_regions(subscription_id="57f76510-1b03-4666-a9df-9fada6e1d00e")
-            cached_azure_region_name_map = region_map
-            region_selector.value = None
-            region_selector.options = ['-- Select a Region --'] + list(region_map.values())
-            vcpu_input.disabled = True
-            ram_input.disabled = True
-            result_display.object = "### ✅ Azure regions loaded. Please select a region."
+    # Start every selected provider at once; each region list is applied as soon as it arrives
+    pending = {
+        cloud: asyncio.ensure_future(run_in_background(load_regions, cloud, *loader))
+        for cloud, loader in REGION_LOADERS.items() if cloud in cloud_selection
+    }
 
-        except Exception as e:
-            result_display.object = f"### Azure error: {str(e)}"
+    def superseded():
+        # A newer cloud selection owns the widgets now; drop whatever is still loading
+        if region_fetches.is_current(token):
+            return False
+        for task in pending.values():
+            task.cancel()
+        return True
+
+    def show_aws_regions(aws_regions):
+        global cached_region_name_map
+        region_selector.value = None  # Clear value first
+        region_selector.options = ['-- Select a Region --'] + aws_regions
+
+        from aws_pricing import get_static_aws_region_name_map
+        cached_region_name_map = get_static_aws_region_name_map()
+
+        result_display.object = "### ✅ AWS regions loaded. Please select a region."
+        print(" Cached AWS Region Name Map:")
+        for code, name in cached_region_name_map.items():
+            print(f"{code} → {name}")
+
+    def show_azure_regions(region_map):
+        global cached_azure_region_name_map
+        cached_azure_region_name_map = region_map
+        region_selector.value = None
+        region_selector.options = ['-- Select a Region --'] + list(region_map.values())
+        vcpu_input.disabled = True
+        ram_input.disabled = True
+        result_display.object = "### ✅ Azure regions loaded. Please select a region."
 
+    def show_gcp_regions(gcp_regions):
+        global cached_gcp_region_list
+        cached_gcp_region_list = gcp_regions
+        region_selector.value = None
+        region_selector.options = ['-- Select a Region --'] + cached_gcp_region_list
 
-    if 'GCP' in cloud_selection:
-        result_display.object = "### Fetching GCP regions..."
-        try:
-            cached_gcp_region_list = get_gcp_regions(gcp_project_id, gcp_service_account_file)
-            region_selector.value = None
-            region_selector.options = ['-- Select a Region --'] + cached_gcp_region_list
+        vcpu_input.disabled = True
+        ram_input.disabled = True
+        result_display.object = "### ✅ GCP regions loaded. Please select a region."
+
+    show_regions = {'AWS': show_aws_regions, 'Azure': show_azure_regions, 'GCP': show_gcp_regions}
+    cloud_of_task = {task: cloud for cloud, task in pending.items()}
+    if pending:
+        result_display.object = f"### Fetching {', '.join(pending)} regions..."
+
+    # Apply the lists in completion order, so a slow provider does not hold back a fast one
+    waiting = set(pending.values())
+    while waiting:
+        done, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+        if superseded():
+            return
+        for task in done:
+            cloud = cloud_of_task[task]
+            try:
+                show_regions[cloud](task.result())
+            except Exception as e:
+                result_display.object = f"### {cloud} error: {str(e)}"
 
-            vcpu_input.disabled = True
-            ram_input.disabled = True
-            result_display.object = "### ✅ GCP regions loaded. Please select a region."
-        except Exception as e:
-            result_display.object = f"### GCP error: {str(e)}"
+    if superseded():
+        return
 
     # Reset inputs and dropdowns regardless of cloud
     instance_selector.options = []
@@ -564,17 +369,18 @@ def update_pricing_models(cloud_selection):
 
 
 
-def on_cloud_selection_change(event):
-    update_pricing_models(event.new)
+async def on_cloud_selection_change(event):
+    await update_pricing_models(event.new)
 
-def on_region_selected(event):
+async def on_region_selected(event):
     if region_selector.value and "-- Select" not in region_selector.value:
         vcpu_input.disabled = False
         ram_input.disabled = False
-        update_instance_selector()
+        await update_instance_selector()
     else:
         vcpu_input.disabled = True
         ram_input.disabled = True
+        instance_fetches.begin()
         instance_selector.options = []
         pricing_model_selector.options = []
 
@@ -585,7 +391,11 @@ def on_pricing_model_selected(event):
     if not selected:
         result_display.object = "### No pricing model selected."
     else:
-        result_display.object = summarize_selected_pricing(selected)
+        result_display.object = summarize_selected_pricing(
+            selected,
+            aws_labels=pricing_labels_map, aws_raw_terms=fetched_raw_terms, spot_df=spot_price_df,
+            azure_labels=azure_pricing_labels, gcp_labels=gcp_pricing_labels,
+        )
 
 
 
@@ -598,98 +408,20 @@ def compare_prices(event=None):
 
     result_display.object = "### Pricing models selected. Showing monthly cost comparison."
 
-    prices = {}
-    rows = []
-
-    for model in selected:
-        # --- AWS ---
-        if model in pricing_labels_map:
-            info = pricing_labels_map[model]
-            term_type = info.get('termType', '')
-            offering_filter = info.get('offeringClass', '')
-
-            if term_type == 'Spot' and spot_price_df is not None and not spot_price_df.empty:
-                avg_spot = spot_price_df['Price'].mean()
-                prices['AWS Spot'] = round(avg_spot * 730, 2)
-
-            elif term_type.lower() == 'ondemand':
-                for term in fetched_raw_terms[term_type].values():
-                    for dim in term.get('priceDimensions', {}).values():
-                        price = float(dim['pricePerUnit'].get('USD', 0.0))
-                        prices['AWS OnDemand'] = round(price * 730, 2)
-
-            elif term_type.lower() == 'reserved':
-                reserved_label = 'Convertible' if 'convertible' in model.lower() else 'Standard'
-                for term in fetched_raw_terms[term_type].values():
-                    attrs = term.get('termAttributes', {})
-                    if attrs.get('OfferingClass', '') != offering_filter:
-                        continue
-                    lease = attrs.get('LeaseContractLength', '')
-                    purchase = attrs.get('PurchaseOption', '')
-                    upfront = 0.0
-                    hourly = 0.0
-                    for dim in term.get('priceDimensions', {}).values():
-                        unit = dim.get('unit', '').lower()
-                        price = float(dim['pricePerUnit'].get('USD', 0.0))
-                        if unit == 'quantity':
-                            upfront = price
-                        elif 'hr' in unit or 'hour' in unit:
-                            hourly = price
-                    months = 12 if '1yr' in lease else 36
-                    monthly_cost = (upfront / months) + (hourly * 730)
-                    label = f"AWS RI {reserved_label} {lease} {purchase}"
-                    prices[label] = round(monthly_cost, 2)
-
-        # --- Azure ---
-        elif model in azure_pricing_labels:
-            info = azure_pricing_labels[model]
-            raw_price = info['raw_price']
-            term = info['term'].lower()
-            months = 12 if '1 year' in term else 36 if '3 year' in term else 1
-            hourly = raw_price / (months * 730) if months > 1 else raw_price
-            monthly = hourly * 730
-            prices[f"Azure {model}"] = round(monthly, 2)
-
-        # --- GCP ---
-        elif model in gcp_pricing_labels:
-            entry = gcp_pricing_labels[model]
-            hourly = entry['raw_price']
-            monthly = hourly * 730
-            prices[f"GCP {model}"] = round(monthly, 2)
+    prices = monthly_prices(
+        selected,
+        aws_labels=pricing_labels_map, aws_raw_terms=fetched_raw_terms, spot_df=spot_price_df,
+        azure_labels=azure_pricing_labels, gcp_labels=gcp_pricing_labels,
+    )
 
     if not prices:
         result_display.object = "### No pricing data available for selected models."
         plot_pane.object = None
         return
 
-    for label, monthly_cost in prices.items():
-        cloud = "AWS" if "AWS" in label else "Azure" if "Azure" in label else "GCP" if "GCP" in label else "Unknown"
-        label_lower = label.lower()
-
-        if "spot" in label_lower:
-            ptype = "Spot"
-        elif "reserved" in label_lower or "ri" in label_lower or "commit" in label_lower:
-            ptype = "Reserved"
-        elif "on-demand" in label_lower or "ondemand" in label_lower or "pay-as-you-go" in label_lower:
-            ptype = "On-Demand"
-        else:
-            ptype = "Other"
-
-        rows.append({
-            "Model": label,
-            "Monthly Cost (USD)": monthly_cost,
-            "Cloud": cloud,
-            "Region": region_selector.value,
-            "Pricing Type": ptype,
-            "Pricing Type Normalized": ptype  # 🔧 for accurate filtering
-        })
-
-    global pricing_df
-    new_df = pd.DataFrame(rows)
-    pricing_df = pd.concat([pricing_df, new_df], ignore_index=True).drop_duplicates(subset=["Model", "Cloud", "Region"])
+    comparison_store.upsert_many(comparison_rows(prices, region_selector.value))
 
-    print(" Multi-Cloud Pricing DataFrame:")
-    print(pricing_df)
+    print(f" Multi-Cloud Pricing rows: {len(comparison_store)}")
 
     # Create Bokeh bar chart
     source = ColumnDataSource(data={'models': list(prices.keys()), 'prices': list(prices.values())})
@@ -709,21 +441,14 @@ def compare_prices(event=None):
 
 
 def update_cloud_comparison(event=None):
-    global pricing_df
     selection = view_selector.value
-    if pricing_df.empty:
+    if not len(comparison_store):
         result_display.object = "ℹ️ Please run a pricing comparison first."
         multi_cloud_plot.object = None
         return
 
     # 🛠️ Improved filtering with normalization and case-insensitive match
-    df = pricing_df[
-        pricing_df["Pricing Type Normalized"]
-        .astype(str)
-        .str.strip()
-        .str.casefold()
-        == selection.strip().casefold()
-    ]
+    df = comparison_store.frame(pricing_type=selection)
 
     # 🧪 Optional debug print
     print(f" Selection: {selection}")
@@ -767,6 +492,121 @@ def update_cloud_comparison(event=None):
 
 
 
+async def find_cheapest_shape(event=None):
+    vcpus = vcpu_input.value
+    ram = ram_input.value
+    clouds = cloud_services.value or ['AWS', 'Azure', 'GCP']
+    if not vcpus or not ram:
+        result_display.object = "### Enter vCPUs and memory to search across clouds."
+        return
+
+    regions = {
+        'AWS': shape_aws_region.value.strip(),
+        'Azure': shape_azure_region.value.strip(),
+        'GCP': shape_gcp_region.value.strip(),
+    }
+    regions = {cloud: region for cloud, region in regions.items() if cloud in clouds and region}
+    result_display.object = f"### Searching {', '.join(regions)} for {vcpus} vCPU / {ram} GB..."
+
+    from cross_cloud import find_cheapest_matches
+
+    try:
+        df, errors = await shape_fetches.run(
+            find_cheapest_matches, vcpus, ram, regions,
+            pricing_types=(view_selector.value,),
+            azure_subscription_id="3678f0d5-8b1b-42cf-a148-b0d220f01c55",
+            gcp_project_id=gcp_project_id,
+            gcp_service_account_file=gcp_service_account_file,
+        )
+    except StaleResult:
+        return
+    except Exception as e:
+        result_display.object = f"### Cross-cloud search failed: {str(e)}"
+        return
+
+    shape_results.object = df
+    summary = f"### {len(df)} {view_selector.value} prices for {vcpus} vCPU / {ram} GB"
+    if not df.empty:
+        best = df.iloc[0]
+        summary += f"\nCheapest: **{best['Instance']}** on {best['Cloud']} ({best['Region']}) at ${best['Monthly Cost (USD)']:.2f}/month"
+    if errors:
+        summary += "\n" + "\n".join(f"- {err}" for err in errors)
+    result_display.object = summary
+
+
+async def sweep_all_regions(event=None):
+    clouds = cloud_services.value
+    if len(clouds) != 1:
+        result_display.object = "### Select exactly one cloud to sweep its regions."
+        return
+    cloud = clouds[0]
+    regions = [region for region in region_selector.options if "-- Select" not in region]
+    instance_type = sweep_instance_input.value.strip() or None
+    vcpus, ram = vcpu_input.value, ram_input.value
+    if not regions:
+        result_display.object = f"### Load the {cloud} regions first."
+        return
+    if instance_type is None and not (vcpus and ram):
+        result_display.object = "### Enter an instance type, or vCPUs and memory, to sweep."
+        return
+
+    target = instance_type or f"{vcpus} vCPU / {ram} GB"
+    result_display.object = f"### Sweeping {len(regions)} {cloud} regions for {target}..."
+
+    from region_sweep import cheapest_per_region, sweep_regions
+
+    try:
+        df, errors = await sweep_fetches.run(
+            sweep_regions, cloud, regions, instance_type=instance_type, vcpus=vcpus, ram=ram,
+            pricing_types=(view_selector.value,),
+            azure_subscription_id="3678f0d5-8b1b-42cf-a148-b0d220f01c55",
+            gcp_project_id=gcp_project_id,
+            gcp_service_account_file=gcp_service_account_file,
+        )
+    except StaleResult:
+        return
+    except Exception as e:
+        result_display.object = f"### Region sweep failed: {str(e)}"
+        return
+
+    best = cheapest_per_region(df)
+    sweep_results.object = best
+    if best.empty:
+        sweep_plot.object = None
+    else:
+        source = ColumnDataSource(data={
+            "regions": best["Region"],
+            "prices": best["Monthly Cost (USD)"],
+            "instances": best["Instance"],
+            "models": best["Model"],
+        })
+        p = figure(
+            x_range=list(best["Region"]),
+            height=350,
+            title=f"{view_selector.value} {target} by {cloud} Region (Monthly)",
+            tools="hover",
+            tooltips=[
+                ("Region", "@regions"),
+                ("Instance", "@instances"),
+                ("Model", "@models"),
+                ("Monthly", "@prices{$0.00}")
+            ]
+        )
+        p.vbar(x="regions", top="prices", width=0.9, source=source)
+        p.xaxis.major_label_orientation = 1
+        p.xaxis.axis_label = "Region"
+        p.yaxis.axis_label = "Monthly Cost (USD)"
+        sweep_plot.object = p
+
+    summary = f"### {view_selector.value} {target} priced in {len(best)} of {len(regions)} {cloud} regions"
+    if not best.empty:
+        cheapest = best.iloc[0]
+        summary += f"\nCheapest: **{cheapest['Region']}** ({cheapest['Instance']}) at ${cheapest['Monthly Cost (USD)']:.2f}/month"
+    if errors:
+        summary += f"\n{len(errors)} regions or instances could not be priced:\n" + "\n".join(f"- {err}" for err in errors[:10])
+    result_display.object = summary
+
+
 def clear_chart(event=None):
     plot_pane.object = None
     result_display.object = "### Select pricing models to compare."
@@ -777,9 +617,9 @@ def clear_plot_on_deselect(event):
         clear_chart()
 
 def reset_pricing_df(event):
-    global pricing_df
-    pricing_df = pd.DataFrame()
-    result_display.object = "✅ Cleared multi-cloud pricing data."
+    comparison_store.clear()
+    shared = " (shared by all sessions)" if comparison_store.path else ""
+    result_display.object = f"✅ Cleared multi-cloud pricing data{shared}."
 
 
 view_selector.param.watch(update_cloud_comparison, 'value')
@@ -793,6 +633,8 @@ ram_input.param.watch(update_instance_selector, 'value')
 instance_selector.param.watch(update_pricing_models_for_instance, 'value')
 pricing_model_selector.param.watch(on_pricing_model_selected, 'value')
 reset_df_button.on_click(reset_pricing_df)
+shape_button.on_click(find_cheapest_shape)
+sweep_button.on_click(sweep_all_regions)
 
 
 template = pn.template.BootstrapTemplate(
@@ -808,6 +650,7 @@ template = pn.template.BootstrapTemplate(
         region_selector,
 
         pn.Row(vcpu_input, ram_input, sizing_mode="stretch_width"),
+        azure_bulk_toggle,
 
         pn.pane.Markdown("### Matching Instances"),
         instance_selector,
@@ -832,6 +675,14 @@ template = pn.template.BootstrapTemplate(
                 view_selector,
                 multi_cloud_plot,
                 reset_df_button,
+                pn.pane.Markdown("## 🔎 Cheapest Match For This Shape"),
+                pn.Row(shape_aws_region, shape_azure_region, shape_gcp_region),
+                shape_button,
+                shape_results,
+                pn.pane.Markdown("## 🗺️ Cheapest Region Sweep"),
+                pn.Row(sweep_instance_input, sweep_button),
+                sweep_plot,
+                sweep_results,
                 sizing_mode="stretch_width",
                 width_policy="max"
             ),
@@ -842,5 +693,8 @@ template = pn.template.BootstrapTemplate(
 
 template.servable()
 
+# Pre-warm catalogs and prices in the server process (only with DASHBOARD_WARMUP_SPEC set)
+schedule_warmup(REGION_LOADERS)
+
 
 
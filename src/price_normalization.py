@@ -0,0 +1,309 @@
+"""
+Normalization of provider pricing results to monthly costs.
+
+The three fetchers return differently shaped results: AWS raw terms plus a
+spot price history, Azure per-label retail prices, and GCP per-term
+hourly/monthly figures. These helpers turn a selection of pricing models
+into comparable monthly USD figures (730 hours per month, upfront amortized
+over the term) and classify labels as On-Demand, Spot or Reserved.
+`monthly_prices` handles one instance with a plain loop; `build_price_table`
+normalizes many fetches into one table and computes it column-wise.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_MONTH = 730
+CLOUD_PRIORITY = ("AWS", "Azure", "GCP")
+PRICE_TABLE_COLUMNS = [
+    "cloud", "region", "sku", "model", "label", "pricing_type", "lease", "purchase_option",
+    "term_months", "upfront", "hourly", "monthly_effective",
+]
+
+
+def _aws_dimension_rows(aws_labels, aws_raw_terms, spot_df, region, sku):
+    """One raw row per AWS price dimension (or spot average); prices are left as strings."""
+    rows = []
+    for model, info in aws_labels.items():
+        term_type = info.get('termType', '')
+        offering_filter = info.get('offeringClass', '')
+
+        if term_type == 'Spot':
+            if spot_df is not None and not spot_df.empty:
+                rows.append((model, 'AWS Spot', len(rows), '', '', 'hourly', spot_df['Price'].mean()))
+
+        elif term_type.lower() == 'ondemand':
+            for term in aws_raw_terms.get(term_type, {}).values():
+                for dim in term.get('priceDimensions', {}).values():
+                    # Every OnDemand dimension is its own hourly row; the last one wins per label
+                    rows.append((model, 'AWS OnDemand', len(rows), '', '', 'hourly',
+                                 dim['pricePerUnit'].get('USD', 0.0)))
+
+        elif term_type.lower() == 'reserved':
+            reserved_label = 'Convertible' if 'convertible' in model.lower() else 'Standard'
+            for term in aws_raw_terms.get(term_type, {}).values():
+                attrs = term.get('termAttributes', {})
+                if attrs.get('OfferingClass', '') != offering_filter:
+                    continue
+                lease = attrs.get('LeaseContractLength', '')
+                purchase = attrs.get('PurchaseOption', '')
+                label = f"AWS RI {reserved_label} {lease} {purchase}"
+                group = len(rows)
+                for dim in term.get('priceDimensions', {}).values():
+                    rows.append((model, label, group, lease, purchase, dim.get('unit', '').lower(),
+                                 dim['pricePerUnit'].get('USD', 0.0)))
+
+    if not rows:
+        return pd.DataFrame()
+
+    dims = pd.DataFrame(rows, columns=["model", "label", "group", "lease", "purchase_option", "unit", "price"])
+    dims["price"] = pd.to_numeric(dims["price"], errors="coerce").fillna(0.0)
+    is_reserved = dims["label"].str.startswith("AWS RI")
+    is_upfront = is_reserved & (dims["unit"] == "quantity")
+    is_hourly = ~is_reserved | dims["unit"].str.contains("hr|hour", regex=True)
+    dims["upfront"] = np.where(is_upfront, dims["price"], 0.0)
+    dims["hourly"] = np.where(is_hourly & ~is_upfront, dims["price"], 0.0)
+
+    terms = dims.groupby("group", sort=True).agg(
+        model=("model", "first"), label=("label", "first"), lease=("lease", "first"),
+        purchase_option=("purchase_option", "first"), upfront=("upfront", "sum"), hourly=("hourly", "sum"),
+    ).reset_index(drop=True)
+    terms["term_months"] = np.where(
+        terms["label"].str.startswith("AWS RI"), np.where(terms["lease"].str.contains("1yr"), 12, 36), 1
+    )
+    terms["cloud"] = "AWS"
+    terms["region"] = region
+    terms["sku"] = sku
+    return terms
+
+
+def _azure_rows(azure_labels, region, sku):
+    if not azure_labels:
+        return pd.DataFrame()
+    df = pd.DataFrame.from_dict(azure_labels, orient="index").rename_axis("model").reset_index()
+    term = df["term"].astype(str).str.lower()
+    months = np.select([term.str.contains("1 year"), term.str.contains("3 year")], [12, 36], default=1)
+    raw_price = df["raw_price"].astype(float)
+    # Reservation prices are the total for the term; everything else is hourly
+    return pd.DataFrame({
+        "cloud": "Azure",
+        "region": df["region"] if "region" in df else region,
+        "sku": df["sku"] if "sku" in df else sku,
+        "model": df["model"],
+        "label": "Azure " + df["model"],
+        "lease": df["term"],
+        "purchase_option": df["payment"],
+        "term_months": months,
+        "upfront": np.where(months > 1, raw_price, 0.0),
+        "hourly": np.where(months > 1, 0.0, raw_price),
+    })
+
+
+def _gcp_rows(gcp_labels, region, sku):
+    if not gcp_labels:
+        return pd.DataFrame()
+    df = pd.DataFrame.from_dict(gcp_labels, orient="index").rename_axis("model").reset_index()
+    return pd.DataFrame({
+        "cloud": "GCP",
+        "region": df["region"] if "region" in df else region,
+        "sku": df["instance_type"] if "instance_type" in df else sku,
+        "model": df["model"],
+        "label": "GCP " + df["model"],
+        "lease": df["term"],
+        "purchase_option": df["payment"],
+        "term_months": 1,
+        "upfront": 0.0,
+        "hourly": df["raw_price"].astype(float),
+    })
+
+
+def build_price_table(aws_labels=None, aws_raw_terms=None, spot_df=None, azure_labels=None, gcp_labels=None,
+                      region=None, sku=None):
+    """
+    Normalizes fetcher results into one price table covering all three clouds.
+
+    Meant for normalizing many instances at once: concatenate the tables and
+    comparisons are a filter and a sort over their rows (see `select_prices`).
+    Building a table costs milliseconds, so a single instance is priced with
+    `monthly_prices` instead.
+
+    Parameters:
+    ----------
+    aws_labels, aws_raw_terms, spot_df, azure_labels, gcp_labels :
+        Fetcher results, as for `monthly_prices`.
+    region, sku : str, optional
+        Filled in for rows whose fetcher result does not name them (AWS).
+
+    Returns:
+    -------
+    pd.DataFrame
+        One row per priced term with the `PRICE_TABLE_COLUMNS`. `model` is the key offered
+        by the fetcher, `label` the display label, and `monthly_effective` is
+        upfront / term_months + hourly * 730, rounded to cents.
+    """
+    parts = [
+        _aws_dimension_rows(aws_labels or {}, aws_raw_terms or {}, spot_df, region, sku),
+        _azure_rows(azure_labels or {}, region, sku),
+        _gcp_rows(gcp_labels or {}, region, sku),
+    ]
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=PRICE_TABLE_COLUMNS)
+
+    table = pd.concat(parts, ignore_index=True)
+    table["upfront"] = table["upfront"].astype(float)
+    table["hourly"] = table["hourly"].astype(float)
+    table["monthly_effective"] = (
+        table["upfront"] / table["term_months"] + table["hourly"] * HOURS_PER_MONTH
+    ).round(2)
+    table["pricing_type"] = classify_pricing_types(table["label"])
+    return table[PRICE_TABLE_COLUMNS]
+
+
+def select_prices(table: pd.DataFrame, selected):
+    """
+    Rows of a price table for the selected models, in selection order.
+
+    A model key offered by several clouds (e.g. "Spot") belongs to the first of
+    AWS, Azure, GCP that offers it, as in the dashboard's model list.
+    """
+    if table.empty:
+        return table
+    order = {model: i for i, model in enumerate(dict.fromkeys(selected))}
+    owners = table.drop_duplicates("model").assign(
+        rank=lambda df: df["cloud"].map({cloud: i for i, cloud in enumerate(CLOUD_PRIORITY)})
+    )
+    owner = owners.sort_values("rank", kind="stable").drop_duplicates("model").set_index("model")["cloud"]
+    rows = table[table["model"].isin(order.keys()) & (table["cloud"] == table["model"].map(owner))]
+    return rows.assign(_order=rows["model"].map(order)).sort_values("_order", kind="stable").drop(columns="_order")
+
+
+def monthly_prices(selected, aws_labels=None, aws_raw_terms=None, spot_df=None, azure_labels=None, gcp_labels=None):
+    """
+    Converts the selected pricing models to monthly USD costs.
+
+    Parameters:
+    ----------
+    selected : Iterable[str]
+        Pricing model keys as offered by the fetchers (e.g. "Reserved - standard", "Spot", "GCP-OnDemand").
+    aws_labels, aws_raw_terms, spot_df :
+        `labels_map`, `raw_terms` and `spot_df` returned by `fetch_aws_pricing`.
+    azure_labels : dict, optional
+        `labels_map` returned by `fetch_azure_pricing`.
+    gcp_labels : dict, optional
+        `gcp_labels` returned by `fetch_gcp_pricing`.
+
+    Returns:
+    -------
+    dict
+        Display label (e.g. "AWS RI Standard 1yr All Upfront", "Azure Spot") -> monthly cost.
+
+    Notes:
+    -----
+    A plain loop over one instance's terms: building a `build_price_table` for a
+    handful of labels costs far more than it saves. Use the table when normalizing
+    many instances at once.
+    """
+    aws_labels = aws_labels or {}
+    aws_raw_terms = aws_raw_terms or {}
+    azure_labels = azure_labels or {}
+    gcp_labels = gcp_labels or {}
+    prices = {}
+
+    for model in selected:
+        # --- AWS ---
+        if model in aws_labels:
+            info = aws_labels[model]
+            term_type = info.get('termType', '')
+            offering_filter = info.get('offeringClass', '')
+
+            if term_type == 'Spot' and spot_df is not None and not spot_df.empty:
+                avg_spot = spot_df['Price'].mean()
+                prices['AWS Spot'] = round(avg_spot * HOURS_PER_MONTH, 2)
+
+            elif term_type.lower() == 'ondemand':
+                for term in aws_raw_terms.get(term_type, {}).values():
+                    for dim in term.get('priceDimensions', {}).values():
+                        price = float(dim['pricePerUnit'].get('USD', 0.0))
+                        prices['AWS OnDemand'] = round(price * HOURS_PER_MONTH, 2)
+
+            elif term_type.lower() == 'reserved':
+                reserved_label = 'Convertible' if 'convertible' in model.lower() else 'Standard'
+                for term in aws_raw_terms.get(term_type, {}).values():
+                    attrs = term.get('termAttributes', {})
+                    if attrs.get('OfferingClass', '') != offering_filter:
+                        continue
+                    lease = attrs.get('LeaseContractLength', '')
+                    purchase = attrs.get('PurchaseOption', '')
+                    upfront = 0.0
+                    hourly = 0.0
+                    for dim in term.get('priceDimensions', {}).values():
+                        unit = dim.get('unit', '').lower()
+                        price = float(dim['pricePerUnit'].get('USD', 0.0))
+                        if unit == 'quantity':
+                            upfront = price
+                        elif 'hr' in unit or 'hour' in unit:
+                            hourly = price
+                    months = 12 if '1yr' in lease else 36
+                    monthly_cost = (upfront / months) + (hourly * HOURS_PER_MONTH)
+                    label = f"AWS RI {reserved_label} {lease} {purchase}"
+                    prices[label] = round(monthly_cost, 2)
+
+        # --- Azure ---
+        elif model in azure_labels:
+            info = azure_labels[model]
+            raw_price = info['raw_price']
+            term = info['term'].lower()
+            months = 12 if '1 year' in term else 36 if '3 year' in term else 1
+            hourly = raw_price / (months * HOURS_PER_MONTH) if months > 1 else raw_price
+            monthly = hourly * HOURS_PER_MONTH
+            prices[f"Azure {model}"] = round(monthly, 2)
+
+        # --- GCP ---
+        elif model in gcp_labels:
+            entry = gcp_labels[model]
+            hourly = entry['raw_price']
+            monthly = hourly * HOURS_PER_MONTH
+            prices[f"GCP {model}"] = round(monthly, 2)
+
+    return prices
+
+
+def table_monthly_prices(table: pd.DataFrame, selected):
+    """Display label -> monthly cost for the selected models of a price table."""
+    rows = select_prices(table, selected)
+    return dict(zip(rows["label"], rows["monthly_effective"].astype(float)))
+
+
+def cloud_of(label: str):
+    return "AWS" if "AWS" in label else "Azure" if "Azure" in label else "GCP" if "GCP" in label else "Unknown"
+
+
+def classify_pricing_types(labels: pd.Series):
+    """Vectorized `pricing_type` over a Series of labels."""
+    lower = labels.astype(str).str.lower()
+    return pd.Series(np.select(
+        [
+            lower.str.contains("spot", regex=False),
+            lower.str.contains(r"reserved|\bri\b|commit", regex=True),
+            lower.str.contains("on-demand|ondemand|pay-as-you-go", regex=True),
+        ],
+        ["Spot", "Reserved", "On-Demand"],
+        default="Other",
+    ), index=labels.index)
+
+
+def pricing_type(label: str):
+    """Classifies a monthly price label as "Spot", "Reserved", "On-Demand" or "Other"."""
+    label_lower = label.lower()
+
+    if "spot" in label_lower:
+        return "Spot"
+    # "ri" only as a word: "Low Priority" is not a reservation
+    elif "reserved" in label_lower or re.search(r"\bri\b", label_lower) or "commit" in label_lower:
+        return "Reserved"
+    elif "on-demand" in label_lower or "ondemand" in label_lower or "pay-as-you-go" in label_lower:
+        return "On-Demand"
+    return "Other"
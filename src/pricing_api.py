@@ -0,0 +1,203 @@
+"""
+JSON API over the dashboard's matching, pricing and comparison logic.
+
+Other tools can query the same provider code as the Panel UI without opening a
+Bokeh session per client. Handlers are async: provider calls run on the
+shared background executor, so the Tornado loop keeps serving while they
+block. Responses are cached process-wide per normalized query and carry an
+ETag and Last-Modified header, so clients that revalidate get a 304.
+
+Endpoints (all GET):
+    /api/instances?cloud=AWS&region=eu-central-1&vcpus=4&ram=16
+    /api/prices?cloud=Azure&region=germanywestcentral&instance=Standard_D4s_v5&vcpus=4&ram=16[&models=Spot,On-Demand]
+    /api/compare?vcpus=4&ram=16&aws_region=eu-central-1&azure_region=germanywestcentral&gcp_region=europe-west3[&pricing_type=On-Demand]
+    /api/stats
+    /metrics   (Prometheus text format)
+
+Usage:
+    python pricing_api.py --port 8080
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+import tornado.ioloop
+import tornado.web
+
+from background import run_in_background
+from cross_cloud import CLOUDS, available_models, fetch_instance_pricing, find_cheapest_matches, match_shape
+from metrics import MetricsHandler
+from price_normalization import monthly_prices, pricing_type
+from pricing_summary import summarize_selected_pricing
+from request_coalescing import coalescing_stats
+from shared_cache import PRICING_CACHE_TTL, cache_stats, cached
+
+API_CONFIG = {
+    "azure_subscription_id": os.environ.get("AZURE_SUBSCRIPTION_ID"),
+    "gcp_project_id": os.environ.get("GCP_PROJECT_ID"),
+    "gcp_service_account_file": os.environ.get("GCP_SERVICE_ACCOUNT_FILE"),
+}
+PRICING_TYPES = ("On-Demand", "Spot", "Reserved")
+
+
+def _response(payload):
+    """Serializes a payload once and stamps it with its ETag and generation time."""
+    body = json.dumps(payload, default=str).encode("utf-8")
+    return body, f'"{hashlib.sha1(body).hexdigest()}"', time.time()
+
+
+@cached("api_responses", maxsize=1024, ttl=PRICING_CACHE_TTL)
+def instances_response(cloud: str, region: str, vcpus: int, ram: float):
+    instances = match_shape(cloud, region, vcpus, ram, API_CONFIG)
+    return _response({"cloud": cloud, "region": region, "vcpus": vcpus, "ram": ram, "instances": list(instances)})
+
+
+@cached("api_responses", maxsize=1024, ttl=PRICING_CACHE_TTL)
+def prices_response(cloud: str, region: str, instance: str, vcpus: int, ram: float, models: tuple):
+    pricing = fetch_instance_pricing(cloud, instance, region, vcpus, ram)
+    selected = list(models) if models else available_models(pricing)
+    prices = monthly_prices(selected, **pricing)
+    return _response({
+        "cloud": cloud,
+        "region": region,
+        "instance": instance,
+        "models": selected,
+        "prices": [
+            {"model": label, "pricing_type": pricing_type(label), "monthly_cost_usd": monthly}
+            for label, monthly in prices.items()
+        ],
+        "summary": summarize_selected_pricing(selected, **pricing),
+    })
+
+
+@cached("api_responses", maxsize=1024, ttl=PRICING_CACHE_TTL)
+def compare_response(vcpus: int, ram: float, regions: tuple, pricing_types: tuple):
+    df, errors = find_cheapest_matches(vcpus, ram, dict(regions), pricing_types=pricing_types or None, **API_CONFIG)
+    return _response({"vcpus": vcpus, "ram": ram, "results": df.to_dict(orient="records"), "errors": errors})
+
+
+class JsonHandler(tornado.web.RequestHandler):
+    """Serves cached (body, etag, generated_at) responses with conditional GET support."""
+
+    def write_error(self, status_code, **kwargs):
+        exc = kwargs.get("exc_info", (None, None))[1]
+        message = exc.log_message if isinstance(exc, tornado.web.HTTPError) and exc.log_message else self._reason
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps({"error": message}))
+
+    def int_argument(self, name):
+        try:
+            return int(self.get_argument(name))
+        except ValueError:
+            raise tornado.web.HTTPError(400, f"'{name}' must be an integer")
+
+    def float_argument(self, name):
+        try:
+            return float(self.get_argument(name))
+        except ValueError:
+            raise tornado.web.HTTPError(400, f"'{name}' must be a number")
+
+    def cloud_argument(self):
+        cloud = self.get_argument("cloud")
+        if cloud not in CLOUDS:
+            raise tornado.web.HTTPError(400, f"'cloud' must be one of {', '.join(CLOUDS)}")
+        return cloud
+
+    def list_argument(self, name):
+        return tuple(value.strip() for value in self.get_argument(name, "").split(",") if value.strip())
+
+    def _not_modified_since(self, generated_at):
+        header = self.request.headers.get("If-Modified-Since")
+        if not header:
+            return False
+        try:
+            return int(generated_at) <= parsedate_to_datetime(header).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    async def respond(self, fn, *args):
+        body, etag, generated_at = await run_in_background(fn, *args)
+        self.set_header("Content-Type", "application/json")
+        self.set_header("Etag", etag)
+        self.set_header("Last-Modified", formatdate(generated_at, usegmt=True))
+        self.set_header("Cache-Control", f"max-age={int(PRICING_CACHE_TTL)}")
+        if self.request.headers.get("If-None-Match"):
+            not_modified = self.check_etag_header()
+        else:
+            not_modified = self._not_modified_since(generated_at)
+        if not_modified:
+            self.set_status(304)
+            self.finish()
+        else:
+            self.finish(body)
+
+    def compute_etag(self):
+        # The Etag header is set from the cached response; don't hash the body again
+        return None
+
+
+class InstancesHandler(JsonHandler):
+    async def get(self):
+        await self.respond(
+            instances_response,
+            self.cloud_argument(), self.get_argument("region"),
+            self.int_argument("vcpus"), self.float_argument("ram"),
+        )
+
+
+class PricesHandler(JsonHandler):
+    async def get(self):
+        await self.respond(
+            prices_response,
+            self.cloud_argument(), self.get_argument("region"), self.get_argument("instance"),
+            self.int_argument("vcpus"), self.float_argument("ram"), self.list_argument("models"),
+        )
+
+
+class CompareHandler(JsonHandler):
+    async def get(self):
+        regions = tuple(
+            (cloud, self.get_argument(f"{cloud.lower()}_region"))
+            for cloud in CLOUDS if self.get_argument(f"{cloud.lower()}_region", None)
+        )
+        if not regions:
+            raise tornado.web.HTTPError(400, "At least one of aws_region, azure_region, gcp_region is required")
+        pricing_types = self.list_argument("pricing_type")
+        unknown = set(pricing_types) - set(PRICING_TYPES)
+        if unknown:
+            raise tornado.web.HTTPError(400, f"Unknown pricing_type: {', '.join(sorted(unknown))}")
+        await self.respond(
+            compare_response,
+            self.int_argument("vcpus"), self.float_argument("ram"), regions, pricing_types,
+        )
+
+
+class StatsHandler(JsonHandler):
+    def get(self):
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps({"caches": cache_stats(), "coalescing": coalescing_stats()}))
+
+
+def make_app():
+    return tornado.web.Application([
+        (r"/api/instances", InstancesHandler),
+        (r"/api/prices", PricesHandler),
+        (r"/api/compare", CompareHandler),
+        (r"/api/stats", StatsHandler),
+        (r"/metrics", MetricsHandler),
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the multi-cloud pricing logic as a JSON API.")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PRICING_API_PORT", 8080)))
+    parser.add_argument("--address", default="127.0.0.1")
+    args = parser.parse_args()
+
+    make_app().listen(args.port, address=args.address)
+    print(f" Pricing API listening on http://{args.address}:{args.port}/api")
+    tornado.ioloop.IOLoop.current().start()
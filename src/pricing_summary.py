@@ -0,0 +1,142 @@
+"""
+Markdown summary of the selected pricing models.
+
+Shared by the dashboard's "Detailed Pricing Info" panel and the JSON API,
+so both describe a selection in the same words and figures.
+"""
+
+import pandas as pd
+
+from spot_price_store import summarize_spot
+
+
+def summarize_selected_pricing(selected_models, aws_labels=None, aws_raw_terms=None, spot_df=None,
+                               azure_labels=None, gcp_labels=None):
+    """
+    Describes the selected pricing models as Markdown.
+
+    Parameters:
+    ----------
+    selected_models : Iterable[str]
+        Pricing model keys as offered by the fetchers.
+    aws_labels, aws_raw_terms, spot_df, azure_labels, gcp_labels :
+        Fetcher results, as for `price_normalization.monthly_prices`.
+
+    Returns:
+    -------
+    str
+        Markdown with the per-model price details.
+    """
+    aws_labels = aws_labels or {}
+    aws_raw_terms = aws_raw_terms or {}
+    azure_labels = azure_labels or {}
+    gcp_labels = gcp_labels or {}
+
+    summary = "### Detailed Pricing Info\n"
+    for model in selected_models:
+        info = aws_labels.get(model, {})
+        term_type = info.get('termType', '')
+        offering_filter = info.get('offeringClass', '')
+
+        if term_type == 'Spot':
+            spot = summarize_spot(spot_df)
+            if spot is not None:
+                summary += f"\n#### Spot\n- Current Price: ${spot['latest']:.4f} (as of {spot['latest_time']})\n- 7-day Avg: ${spot['avg']:.4f}\n"
+                summary += f"- 7-day Median / P90: ${spot['p50']:.4f} / ${spot['p90']:.4f}\n"
+                for az, row in spot.get('per_az', pd.DataFrame()).iterrows():
+                    summary += f"- {az}: ${row['latest']:.4f} now, ${row['avg']:.4f} avg, ${row['min']:.4f}-${row['max']:.4f}\n"
+
+        elif term_type.lower() == 'ondemand':
+            summary += "\n#### OnDemand\n"
+            for term_id, term in aws_raw_terms.get(term_type, {}).items():
+                for dim in term.get('priceDimensions', {}).values():
+                    price = float(dim['pricePerUnit'].get('USD', 0.0))
+                    desc = dim.get('description', '')
+                    unit = dim.get('unit', '')
+                    summary += f"- ${price:.4f} per {unit} | {desc}\n"
+
+        elif term_type.lower() == 'reserved':
+            summary += f"\n#### Reserved - {offering_filter}\n"
+            grouped = {'1yr': {}, '3yr': {}}
+
+            for term_id, term in aws_raw_terms.get(term_type, {}).items():
+                attrs = term.get('termAttributes', {})
+                if attrs.get('OfferingClass', '') != offering_filter:
+                    continue
+
+                lease = attrs.get('LeaseContractLength', '')
+                purchase = attrs.get('PurchaseOption', '')
+
+                upfront = None
+                hourly = None
+
+                for dim in term.get('priceDimensions', {}).values():
+                    price = float(dim['pricePerUnit'].get('USD', 0.0))
+                    unit = dim.get('unit', '').lower()
+
+                    if unit == 'quantity':
+                        upfront = price
+                    elif 'hr' in unit or 'hour' in unit:
+                        hourly = price
+
+                upfront = upfront if upfront is not None else 0.0
+                hourly = hourly if hourly is not None else 0.0
+
+                if lease in grouped:
+                    grouped[lease][purchase] = {
+                        'upfront': upfront,
+                        'hourly': hourly
+                    }
+
+            for lease_term, options in grouped.items():
+                summary += f"\n**Term: {lease_term.replace('yr', ' Year')}**\n"
+                for purchase_type in ['All Upfront', 'No Upfront', 'Partial Upfront']:
+                    if purchase_type in options:
+                        plan = options[purchase_type]
+                        summary += f"\n*{purchase_type}*\n"
+                        summary += f"-  Upfront: ${plan['upfront']:.2f}\n"
+                        summary += f"- Listed Hourly: ${plan['hourly']:.4f} / hour\n"
+
+                        if plan['hourly'] == 0.0 and plan['upfront'] > 0.0:
+                            months = 12 if '1yr' in lease_term else 36
+                            total_hours = months * 720
+                            effective = plan['upfront'] / total_hours
+                            summary += f"-  Effective Hourly (from upfront only): ${effective:.4f} / hour\n"
+
+        elif model in azure_labels:
+            info = azure_labels[model]
+            raw_price = info['raw_price']
+            term = info['term']
+            payment = info['payment']
+            sku = info.get('sku', 'Unknown SKU')
+            region = info.get('region', 'Unknown Region')
+
+            months = 12 if '1 year' in term.lower() else 36 if '3 year' in term.lower() else 1
+            hourly = raw_price / (months * 730) if months > 1 else raw_price
+            monthly = hourly * 730
+
+            summary += f"\n#### Azure - {model}\n"
+            summary += f"- ${hourly:.4f} per Hour | {model} for {sku} in {region}\n"
+            summary += f"- Monthly (730 hrs): ${monthly:.2f}"
+            if term != '-' or payment != '-':
+                summary += f" | Term: {term}"
+                if payment != '-':
+                    summary += f", Payment: {payment}"
+            summary += "\n"
+            
+        elif model in gcp_labels:
+            try:
+                entry = gcp_labels[model]
+                hourly = entry['raw_price']
+                monthly = hourly * 730
+                summary += f"\n#### GCP - {model}\n"
+                summary += f"- Instance Type: `{entry['instance_type']}`\n"
+                summary += f"- Region: `{entry['region']}`\n"
+                summary += f"- Hourly Price: ${hourly:.4f}\n"
+                summary += f"- Monthly (730 hrs): ${monthly:.2f}\n"
+            except KeyError as e:
+                summary += f"\n Error: Missing data for `{model}` - {e}\n"
+
+
+
+    return summary.strip()
@@ -0,0 +1,158 @@
+"""
+Lazy loading of the per-cloud provider modules and SDKs.
+
+The dashboard starts without boto3, the Azure SDK or the Google API client.
+`load_provider(cloud)` imports a cloud's pricing modules and SDK the first
+time that cloud is selected (on the background executor, next to its region
+fetch); later calls return at once. Load times go to the metrics as the
+"import" operation of the provider.
+
+`python providers.py` reports what each provider costs at startup, measured
+in fresh interpreters: the dashboard core first, then every provider on top
+of it, with the heaviest top-level packages of each.
+
+Usage:
+    python providers.py
+    python providers.py --json --top 10
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from metrics import METRICS_ENABLED, registry
+
+# Modules the dashboard imports at startup
+CORE_MODULES = (
+    "panel", "bokeh.plotting", "pandas", "price_normalization", "pricing_summary",
+    "comparison_store", "instance_catalog", "background", "shared_cache", "client_registry", "rate_limit",
+)
+
+PROVIDER_MODULES = {
+    "AWS": ("boto3", "aws_pricing", "aws_offer_file", "spot_price_store"),
+    "Azure": ("azure.identity", "azure.mgmt.compute", "azure.core.pipeline.transport", "azure_pricing"),
+    "GCP": ("googleapiclient.discovery", "google.oauth2.service_account", "google_auth_httplib2", "gcp_pricing"),
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+_REPORT_MARKER = "--- provider modules ---"
+
+
+def load_provider(cloud: str):
+    """
+    Imports the modules of `cloud` once and returns how long that took (0 when already loaded).
+
+    Raises:
+    ------
+    ImportError
+        When the provider's SDK is not installed.
+    """
+    if cloud in _loaded:
+        return 0.0
+    with _lock:
+        if cloud in _loaded:
+            return 0.0
+        start = time.perf_counter()
+        for name in PROVIDER_MODULES[cloud]:
+            importlib.import_module(name)
+        elapsed = _loaded[cloud] = time.perf_counter() - start
+
+    if METRICS_ENABLED:
+        registry.observe_call(cloud.lower(), "import", elapsed)
+    print(f" {cloud} provider modules loaded in {elapsed:.2f} seconds")
+    return elapsed
+
+
+def loaded_providers():
+    """{cloud: seconds} for every provider loaded in this process."""
+    return dict(_loaded)
+
+
+def _import_modules(names, report_missing=True):
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            if report_missing:
+                print(f"missing: {name} ({e})")
+
+
+def _heaviest(importtime_lines, top):
+    """Sums `-X importtime` self times per top-level package and returns the `top` heaviest (seconds)."""
+    totals = {}
+    for line in importtime_lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us) / 1e6
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def measure(group: str, top: int = 5):
+    """
+    Import cost of `group` ("core" or a cloud) in a fresh interpreter, after the core modules.
+
+    Returns:
+    -------
+    dict
+        seconds, heaviest [(package, seconds)] and missing modules.
+    """
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    modules = CORE_MODULES if group == "core" else PROVIDER_MODULES[group]
+    preload = () if group == "core" else CORE_MODULES
+    script = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {src_dir!r})\n"
+        "from providers import _import_modules\n"
+        f"_import_modules({preload!r}, report_missing=False)\n"
+        f"sys.stderr.write({_REPORT_MARKER!r} + '\\n')\n"
+        "start = time.perf_counter()\n"
+        f"_import_modules({modules!r})\n"
+        "print('seconds', time.perf_counter() - start)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True, text=True, cwd=src_dir,
+        env={**os.environ, "DASHBOARD_METRICS": "0"},
+    )
+    stderr = result.stderr.splitlines()
+    lines = stderr[stderr.index(_REPORT_MARKER) + 1:] if _REPORT_MARKER in stderr else []
+    seconds, missing = None, []
+    for line in result.stdout.splitlines():
+        if line.startswith("seconds "):
+            seconds = float(line.split()[1])
+        elif line.startswith("missing: "):
+            missing.append(line[len("missing: "):])
+    return {"seconds": seconds, "heaviest": _heaviest(lines, top), "missing": missing}
+
+
+def import_report(top: int = 5):
+    """{group: measure(group)} for the core and every provider."""
+    return {group: measure(group, top) for group in ("core", *PROVIDER_MODULES)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the startup import cost of the dashboard core and each provider.")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest packages listed per group")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = import_report(args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print("\n Import cost at startup (fresh interpreter; providers measured on top of the core)")
+        for group, result in report.items():
+            seconds = "failed" if result["seconds"] is None else f"{result['seconds']:.2f} s"
+            heaviest = ", ".join(f"{name} {secs:.2f}s" for name, secs in result["heaviest"])
+            print(f" {group:<6} {seconds:>8}   {heaviest}")
+            for missing in result["missing"]:
+                print(f"        not installed: {missing}")
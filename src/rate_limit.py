@@ -0,0 +1,416 @@
+"""
+Shared rate limiting and retries for provider API calls.
+
+Every (provider, endpoint) pair, e.g. ("aws", "pricing") or ("gcp", "compute"),
+gets one process-wide `Limiter`:
+
+- a token bucket paces requests to the endpoint's rate (with a burst),
+- an AIMD concurrency limit bounds requests in flight: it grows by one after
+  a window of successful calls and halves when the provider throttles,
+- throttled and transient failures (429, 5xx, connection errors) are retried
+  with jittered exponential backoff, honouring Retry-After when given.
+
+Throttling is recognized from botocore error codes (ThrottlingException,
+RequestLimitExceeded, ...) and HTTP 429 from googleapiclient, the Azure SDK
+and `requests`. Provider calls go through `call()` or `iter_pages()`; SDK
+retries are switched off where this layer retries, so throttles are seen here
+and shrink the concurrency limit.
+
+Rates are configured per endpoint with `DASHBOARD_RATE_LIMITS`, a comma-separated
+list of `provider[.endpoint]=rate[:burst]` (requests per second), e.g.
+`aws.pricing=5:10,gcp=20`.
+
+`python rate_limit.py` runs bulk requests against a local stub server that
+answers 429 above a fixed request rate and reports the achieved throughput.
+"""
+
+import argparse
+import functools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# (provider, endpoint) -> (requests per second, burst); (provider, None) is the provider default
+DEFAULT_RATES = {
+    ("aws", None): (10.0, 20),
+    ("aws", "pricing"): (5.0, 10),
+    ("aws", "ec2"): (20.0, 50),
+    ("azure", None): (10.0, 20),
+    ("azure", "retail"): (20.0, 40),
+    ("azure", "management"): (3.0, 10),
+    ("gcp", None): (10.0, 20),
+    ("gcp", "cloudbilling"): (5.0, 10),
+    ("gcp", "compute"): (20.0, 40),
+}
+FALLBACK_RATE = (10.0, 20)
+
+INITIAL_CONCURRENCY = int(os.environ.get("DASHBOARD_INITIAL_CONCURRENCY", 4))
+MAX_CONCURRENCY = int(os.environ.get("DASHBOARD_MAX_CONCURRENCY", 32))
+MAX_ATTEMPTS = int(os.environ.get("DASHBOARD_MAX_ATTEMPTS", 6))
+BASE_DELAY = 0.25  # seconds; attempt n waits up to BASE_DELAY * 2**n
+MAX_DELAY = 20.0
+# A burst of throttles from requests already in flight halves the limit only once
+DECREASE_COOLDOWN = 1.0
+
+THROTTLE_CODES = frozenset({
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottled",
+    "RequestThrottledException", "RequestLimitExceeded", "TooManyRequestsException",
+    "SlowDown", "ProvisionedThroughputExceededException", "BandwidthLimitExceeded",
+    "EC2ThrottledException", "PriorRequestNotComplete",
+})
+TRANSIENT_CODES = frozenset({"InternalError", "InternalFailure", "ServiceUnavailable", "RequestTimeout"})
+THROTTLE_STATUS = 429
+TRANSIENT_STATUS = frozenset({500, 502, 503, 504})
+
+
+def _parse_rates(text: str):
+    rates = {}
+    for item in filter(None, (part.strip() for part in (text or "").split(","))):
+        name, _, value = item.partition("=")
+        provider, _, endpoint = name.strip().partition(".")
+        rate, _, burst = value.partition(":")
+        rates[(provider.lower(), endpoint or None)] = (float(rate), int(burst) if burst else max(1, int(float(rate))))
+    return rates
+
+
+RATES = {**DEFAULT_RATES, **_parse_rates(os.environ.get("DASHBOARD_RATE_LIMITS"))}
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, at most `burst` saved up."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        """Hands out no tokens for `seconds` (a provider's Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def try_acquire(self):
+        """Takes a token if one is available; otherwise returns the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if now >= self._paused_until and self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return max(self._paused_until - now, (1 - self._tokens) / self.rate)
+
+    def acquire(self):
+        wait = self.try_acquire()
+        while wait:
+            time.sleep(wait)
+            wait = self.try_acquire()
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on calls in flight: +1 per `limit` successes, halved on throttling."""
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, maximum: int = MAX_CONCURRENCY):
+        self.maximum = max(1, maximum)
+        self.limit = float(min(max(1, initial), self.maximum))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False):
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                if now - self._last_decrease >= DECREASE_COOLDOWN:
+                    self.limit = max(1.0, self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class Limiter:
+    """Token bucket plus adaptive concurrency for one (provider, endpoint)."""
+
+    def __init__(self, provider: str, endpoint: str = None, rate: float = None, burst: int = None,
+                 initial_concurrency: int = INITIAL_CONCURRENCY, max_concurrency: int = MAX_CONCURRENCY):
+        default_rate, default_burst = RATES.get((provider, endpoint)) or RATES.get((provider, None)) or FALLBACK_RATE
+        self.provider = provider
+        self.endpoint = endpoint
+        self.bucket = TokenBucket(rate or default_rate, burst or default_burst)
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, max_concurrency)
+        self.calls = 0
+        self.throttled = 0
+        self.retries = 0
+        self._stats_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        """
+        Waits for a token and a concurrency slot. Report throttling by raising, or by
+        setting `state["throttled"]`; a `state["retry_after"]` pauses the bucket.
+        """
+        self.bucket.acquire()
+        self.concurrency.acquire()
+        state = {"throttled": False, "retry_after": None}
+        try:
+            yield state
+        except BaseException as e:
+            state["throttled"] = state["throttled"] or is_throttle(e)
+            state["retry_after"] = state["retry_after"] or retry_after(e)
+            raise
+        finally:
+            self.concurrency.release(state["throttled"])
+            if state["retry_after"]:
+                self.bucket.pause(state["retry_after"])
+            with self._stats_lock:
+                self.calls += 1
+                self.throttled += state["throttled"]
+
+    def stats(self):
+        return {
+            "rate": self.bucket.rate,
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "retries": self.retries,
+        }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(provider: str, endpoint: str = None):
+    """The process-wide limiter of (provider, endpoint)."""
+    key = (provider, endpoint)
+    found = _limiters.get(key)
+    if found is None:
+        with _limiters_lock:
+            found = _limiters.get(key)
+            if found is None:
+                found = _limiters[key] = Limiter(provider, endpoint)
+    return found
+
+
+def limiter_stats():
+    """{(provider, endpoint): stats} of every limiter used so far."""
+    with _limiters_lock:
+        return {key: found.stats() for key, found in _limiters.items()}
+
+
+# --- Error classification ---
+def _status_of(exc):
+    """HTTP status carried by an SDK exception, if any."""
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict):  # botocore ClientError
+        return response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    for holder in (exc, response, getattr(exc, "resp", None)):
+        for attribute in ("status_code", "status"):
+            status = getattr(holder, attribute, None)
+            if isinstance(status, int):
+                return status
+            if isinstance(status, str) and status.isdigit():
+                return int(status)
+    return None
+
+
+def _error_code(exc):
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict):
+        return response.get("Error", {}).get("Code")
+    return None
+
+
+def is_throttle(exc):
+    """True for provider answers meaning "slow down"."""
+    return _error_code(exc) in THROTTLE_CODES or _status_of(exc) == THROTTLE_STATUS
+
+
+def is_transient(exc):
+    """True for failures worth retrying: throttling, 5xx answers and connection errors."""
+    if is_throttle(exc) or _error_code(exc) in TRANSIENT_CODES or _status_of(exc) in TRANSIENT_STATUS:
+        return True
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    module = type(exc).__module__ or ""
+    # requests/urllib3 connection errors, botocore endpoint errors, Azure ServiceRequestError
+    return type(exc).__name__ in ("ConnectionError", "ConnectTimeout", "ReadTimeout", "EndpointConnectionError",
+                                  "ConnectTimeoutError", "ReadTimeoutError", "ServiceRequestError") \
+        and module.split(".")[0] in ("requests", "urllib3", "botocore", "azure")
+
+
+def retry_after(exc):
+    """Seconds from a Retry-After header on the exception's response, if any."""
+    response = getattr(exc, "response", None)
+    if isinstance(response, dict):
+        headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+    else:
+        holder = response if response is not None else getattr(exc, "resp", None)
+        headers = getattr(holder, "headers", holder) if holder is not None else {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return min(MAX_DELAY, float(value)) if value else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int, base: float = BASE_DELAY, hint: float = None):
+    """Delay before retry `attempt` (0-based): full jitter over base * 2**attempt, at least the Retry-After hint."""
+    return max(hint or 0.0, random.uniform(0, min(MAX_DELAY, base * (2 ** attempt))))
+
+
+# --- Calling providers ---
+def call(provider: str, endpoint: str, fn, *args, attempts: int = MAX_ATTEMPTS, base_delay: float = BASE_DELAY,
+         retry_on=(), **kwargs):
+    """
+    Calls `fn(*args, **kwargs)` under the (provider, endpoint) limiter, retrying transient failures.
+
+    Parameters:
+    ----------
+    attempts : int, optional
+        Tries in total; the last failure is raised as is.
+    base_delay : float, optional
+        Backoff base in seconds.
+    retry_on : tuple, optional
+        Further exception types to retry (e.g. undecodable bodies).
+    """
+    pacer = limiter(provider, endpoint)
+    for attempt in range(max(1, attempts)):
+        try:
+            with pacer.slot():
+                return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt + 1 >= attempts or not (is_transient(e) or isinstance(e, retry_on)):
+                raise
+            delay = backoff(attempt, base_delay, retry_after(e))
+            with pacer._stats_lock:
+                pacer.retries += 1
+        time.sleep(delay)
+
+
+def iter_pages(provider: str, endpoint: str, fn, token_param: str = "NextToken", token_field: str = "NextToken",
+               **params):
+    """
+    Yields every page of a token-paginated call (boto3 style), each page under `call()`.
+
+    A throttled page is retried on its own instead of restarting the pagination.
+    """
+    while True:
+        page = call(provider, endpoint, fn, **params)
+        yield page
+        token = page.get(token_field)
+        if not token:
+            return
+        params = {**params, token_param: token}
+
+
+def rate_limited(provider: str, endpoint: str = None, **call_kwargs):
+    """Decorator form of `call()`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return call(provider, endpoint, fn, *args, **call_kwargs, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Local throttling stub ---
+def _serve_throttling_stub(rate: float):
+    """Starts a local HTTP server answering 429 (Retry-After: 1) above `rate` requests per second."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    allowance = TokenBucket(rate, max(1, int(rate)))
+    served = {"ok": 0, "throttled": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            accepted = not allowance.try_acquire()
+            time.sleep(0.02)
+            served["ok" if accepted else "throttled"] += 1
+            body = b'{"Items": []}' if accepted else b'{"error": "TooManyRequests"}'
+            self.send_response(200 if accepted else THROTTLE_STATUS)
+            if not accepted:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, served
+
+
+def simulate(requests_total: int = 300, server_rate: float = 50.0, client_rate: float = 200.0, workers: int = 32):
+    """
+    Sends `requests_total` GETs from `workers` threads to a throttling stub through `call()`.
+
+    Returns:
+    -------
+    dict
+        Completed and failed requests, 429s seen, requests per second and the final limiter state.
+    """
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    server, served = _serve_throttling_stub(server_rate)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    session = requests.Session()
+    _limiters[("stub", None)] = Limiter("stub", rate=client_rate, burst=int(client_rate),
+                                        max_concurrency=workers)
+
+    def fetch(_):
+        def get():
+            response = session.get(url, timeout=10)
+            response.raise_for_status()
+            return response.json()
+        return call("stub", None, get, attempts=10)
+
+    start = time.time()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(fetch, i) for i in range(requests_total)]:
+            try:
+                future.result()
+            except Exception:
+                failed += 1
+    seconds = time.time() - start
+    server.shutdown()
+    return {
+        "completed": requests_total - failed,
+        "failed": failed,
+        "throttled": served["throttled"],
+        "seconds": round(seconds, 2),
+        "requests_per_second": round((requests_total - failed) / seconds, 1),
+        "limiter": limiter("stub").stats(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exercise the rate limiter against a local stub that answers 429s.")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--server-rate", type=float, default=50.0, help="Requests per second the stub accepts")
+    parser.add_argument("--client-rate", type=float, default=200.0, help="Token bucket rate of the client")
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+
+    result = simulate(args.requests, args.server_rate, args.client_rate, args.workers)
+    print(f"\n {result['completed']} requests in {result['seconds']}s ({result['requests_per_second']}/s, "
+          f"stub limit {args.server_rate}/s), {result['throttled']} throttled, {result['failed']} failed")
+    print(f" Final limiter: {result['limiter']}")
@@ -0,0 +1,169 @@
+"""
+Cheapest-region sweep: one instance type, or one vCPU/RAM shape, priced in
+every region of a cloud.
+
+Regions are swept concurrently on one bounded thread pool. With a shape, the
+matching runs first (from the in-memory instance catalogs) and every match is
+then priced as soon as its region is matched; with an instance type, every
+region is priced directly. Pricing goes through `fetch_aws_pricing`,
+`fetch_azure_pricing` and `fetch_gcp_pricing` (see `cross_cloud.price_instance`),
+so the shared pricing cache and single-flight apply and a repeated sweep is
+answered from memory.
+
+Usage:
+    python region_sweep.py AWS --instance m5.xlarge
+    python region_sweep.py GCP --vcpus 4 --ram 16 --gcp-project-id my-project --gcp-service-account-file key.json
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from cross_cloud import match_shape, price_instance
+from price_normalization import pricing_type
+
+SWEEP_WORKERS = int(os.environ.get("DASHBOARD_SWEEP_WORKERS", 16))
+SWEEP_COLUMNS = ["Region", "Instance", "Model", "Pricing Type", "Monthly Cost (USD)"]
+
+
+def all_regions(cloud: str, config: dict):
+    """
+    Every region of `cloud`: AWS regions from the static name map, Azure locations
+    and GCP regions from their instance catalogs.
+    """
+    if cloud == "AWS":
+        from aws_pricing import get_static_aws_region_name_map
+        return list(get_static_aws_region_name_map())
+
+    from instance_catalog import gcp_catalogs, load_azure_skus
+    if cloud == "Azure":
+        return list(load_azure_skus(config["azure_subscription_id"]).regions())
+    catalog = gcp_catalogs.get((config["gcp_project_id"], config.get("gcp_service_account_file")))
+    return sorted(catalog.zones)
+
+
+def _price_rows(cloud, region, name, vcpus, ram):
+    return [
+        {
+            "Region": region,
+            "Instance": name,
+            "Model": label,
+            "Pricing Type": pricing_type(label),
+            "Monthly Cost (USD)": monthly,
+        }
+        for label, monthly in price_instance(cloud, name, region, vcpus, ram).items()
+    ]
+
+
+def sweep_regions(cloud: str, regions, instance_type: str = None, vcpus: int = None, ram: float = None,
+                  pricing_types=("On-Demand",), azure_subscription_id: str = None, gcp_project_id: str = None,
+                  gcp_service_account_file: str = None, max_workers: int = SWEEP_WORKERS):
+    """
+    Prices an instance type, or every instance matching a vCPU/RAM shape, in each of `regions`.
+
+    Parameters:
+    ----------
+    cloud : str
+        "AWS", "Azure" or "GCP".
+    regions : Iterable[str]
+        Regions to sweep, as accepted by the provider's pricing function.
+    instance_type : str, optional
+        Instance to price everywhere; without it, the vCPU/RAM shape is matched in each region.
+    vcpus, ram : int, float, optional
+        Shape to match; GCP also needs them to price a named instance.
+    pricing_types : Iterable[str], optional
+        Pricing types to keep ("On-Demand", "Spot", "Reserved"); None keeps every model.
+    azure_subscription_id, gcp_project_id, gcp_service_account_file : str, optional
+        Provider settings needed for Azure and GCP matching.
+    max_workers : int, optional
+        Upper bound on concurrent matching and pricing calls.
+
+    Returns:
+    -------
+    Tuple[pd.DataFrame, List[str]]
+        - Every (region, instance, pricing model) with its monthly cost, cheapest first.
+        - Regions or instances that could not be matched or priced.
+    """
+    if instance_type is None and not (vcpus and ram):
+        raise ValueError("Sweeping needs an instance type or a vCPU/RAM shape.")
+    config = {
+        "azure_subscription_id": azure_subscription_id,
+        "gcp_project_id": gcp_project_id,
+        "gcp_service_account_file": gcp_service_account_file,
+    }
+    regions = list(dict.fromkeys(regions))
+    rows, errors = [], []
+    start = time.time()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="region-sweep") as pool:
+        pricing = {}
+        if instance_type is not None:
+            for region in regions:
+                pricing[pool.submit(_price_rows, cloud, region, instance_type, vcpus, ram)] = (region, instance_type)
+        else:
+            matching = {pool.submit(match_shape, cloud, region, vcpus, ram, config): region for region in regions}
+            for future in as_completed(matching):
+                region = matching[future]
+                try:
+                    names = future.result()
+                except Exception as e:
+                    errors.append(f"{region}: {e}")
+                    continue
+                for name in names:
+                    pricing[pool.submit(_price_rows, cloud, region, name, vcpus, ram)] = (region, name)
+
+        for future in as_completed(pricing):
+            region, name = pricing[future]
+            try:
+                rows.extend(future.result())
+            except Exception as e:
+                errors.append(f"{region} {name}: {e}")
+
+    df = pd.DataFrame(rows, columns=SWEEP_COLUMNS)
+    if pricing_types is not None:
+        df = df[df["Pricing Type"].isin(list(pricing_types))]
+    print(f"\n {cloud} region sweep: {len(regions)} regions, {len(df)} prices in {time.time() - start:.1f}s")
+    return df.sort_values(["Monthly Cost (USD)", "Region"], kind="stable").reset_index(drop=True), errors
+
+
+def cheapest_per_region(df: pd.DataFrame):
+    """The cheapest row of every region in a `sweep_regions` result, cheapest region first."""
+    if df.empty:
+        return df
+    best = df.loc[df.groupby("Region", sort=False)["Monthly Cost (USD)"].idxmin()]
+    return best.sort_values(["Monthly Cost (USD)", "Region"], kind="stable").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price an instance type or vCPU/RAM shape in every region of a cloud.")
+    parser.add_argument("cloud", choices=["AWS", "Azure", "GCP"])
+    parser.add_argument("--instance", help="Instance type to price in every region")
+    parser.add_argument("--vcpus", type=int)
+    parser.add_argument("--ram", type=float, help="Memory in GB")
+    parser.add_argument("--regions", nargs="*", help="Regions to sweep (default: every region of the cloud)")
+    parser.add_argument("--pricing-type", action="append", dest="pricing_types",
+                        help="On-Demand (default), Spot or Reserved; repeatable")
+    parser.add_argument("--workers", type=int, default=SWEEP_WORKERS)
+    parser.add_argument("--azure-subscription-id")
+    parser.add_argument("--gcp-project-id")
+    parser.add_argument("--gcp-service-account-file")
+    args = parser.parse_args()
+
+    from providers import load_provider
+    load_provider(args.cloud)
+    settings = {
+        "azure_subscription_id": args.azure_subscription_id,
+        "gcp_project_id": args.gcp_project_id,
+        "gcp_service_account_file": args.gcp_service_account_file,
+    }
+    result, failures = sweep_regions(
+        args.cloud, args.regions or all_regions(args.cloud, settings),
+        instance_type=args.instance, vcpus=args.vcpus, ram=args.ram,
+        pricing_types=args.pricing_types or ("On-Demand",), max_workers=args.workers, **settings,
+    )
+    print(cheapest_per_region(result).to_string(index=False))
+    for failure in failures:
+        print(f" {failure}")
@@ -0,0 +1,400 @@
+"""
+Record/replay transport shared by boto3, `requests` and the Google API client.
+
+Set `MULTI_CLOUD_TRANSPORT`:
+
+    live     (default) talk to the providers.
+    record   talk to the providers and capture every response in the cassette.
+    replay   answer every call from the cassette; nothing leaves the machine.
+
+The cassette (`MULTI_CLOUD_CASSETTE`) is one gzipped JSON-lines file with one
+interaction per line, keyed by the request (service, operation, region and
+parameters for boto3; method, URL and body for HTTP). A request recorded
+several times is replayed in recording order, the last answer repeating.
+`MULTI_CLOUD_REPLAY_LATENCY` adds a fixed delay in seconds to every replayed
+response, for load tests.
+
+Hooks:
+- boto3: `aws_client()` creates clients from boto3's default session after
+  registering `before-parameter-build`/`before-call`/`after-call` handlers on it.
+- requests: `transport_adapter()` returns the `HTTPAdapter` to mount on a session
+  (the Azure Retail Prices client and the Azure management client use it).
+- googleapiclient: `build_google_service()` builds a client whose `http` object
+  records or replays.
+
+These factories build a new client on every call; `client_registry` keeps the
+instances the application reuses.
+"""
+
+import atexit
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import METRICS_ENABLED, instrument_boto3, instrument_session, observe_transfer
+
+LIVE, RECORD, REPLAY = "live", "record", "replay"
+
+CACHE_DIR = os.environ.get(
+    "MULTI_CLOUD_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "multi-cloud-dashboard")
+)
+TRANSPORT_MODE = os.environ.get("MULTI_CLOUD_TRANSPORT", LIVE).lower()
+CASSETTE_PATH = os.environ.get("MULTI_CLOUD_CASSETTE", os.path.join(CACHE_DIR, "cassette.jsonl.gz"))
+REPLAY_LATENCY = float(os.environ.get("MULTI_CLOUD_REPLAY_LATENCY", 0))
+
+# Request parameters that change on every call (time windows) and must not be part of the key
+VOLATILE_PARAMS = frozenset({"StartTime", "EndTime"})
+# Headers describing the wire encoding; the recorded body is already decoded
+_WIRE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection"})
+
+GOOGLE_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode for a request that is not in the cassette."""
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$b64": base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if hasattr(value, "read"):
+        # Streaming bodies are not replayable; keep a marker rather than consuming them
+        return {"$stream": True}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if "$dt" in value and len(value) == 1:
+            return datetime.fromisoformat(value["$dt"])
+        if "$b64" in value and len(value) == 1:
+            return base64.b64decode(value["$b64"])
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+class Cassette:
+    """Recorded interactions by request key, loaded from and saved to one gzipped JSON-lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._interactions = {}
+        self._replay_positions = {}
+        self._recorded = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._interactions.setdefault(entry["key"], []).append(entry["response"])
+
+    def record(self, key: str, response):
+        with self._lock:
+            self._recorded.setdefault(key, []).append(response)
+
+    def play(self, key: str):
+        with self._lock:
+            responses = self._interactions.get(key)
+            if not responses:
+                raise ReplayMissError(f"No recorded response for {key}")
+            position = self._replay_positions.get(key, 0)
+            self._replay_positions[key] = position + 1
+            response = responses[min(position, len(responses) - 1)]
+        if REPLAY_LATENCY:
+            time.sleep(REPLAY_LATENCY)
+        return response
+
+    def save(self):
+        """Writes the cassette: earlier recordings, with keys recorded in this process replaced."""
+        with self._lock:
+            if not self._recorded:
+                return
+            merged = {**self._interactions, **self._recorded}
+            self._interactions = merged
+            self._recorded = {}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for key, responses in merged.items():
+                for response in responses:
+                    f.write(json.dumps({"key": key, "response": response}, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+_cassette = None
+_install_lock = threading.Lock()
+
+
+def get_cassette():
+    global _cassette
+    with _install_lock:
+        if _cassette is None:
+            _cassette = Cassette(CASSETTE_PATH)
+            if TRANSPORT_MODE == RECORD:
+                atexit.register(_cassette.save)
+        return _cassette
+
+
+# --- boto3 ---
+def _remember_params(params, context, **kwargs):
+    context["replay_params"] = {k: v for k, v in params.items() if k not in VOLATILE_PARAMS}
+
+
+def _aws_key(model, context):
+    api_params = json.dumps(_encode(context.get("replay_params", {})), sort_keys=True, separators=(",", ":"))
+    return f"aws {model.service_model.service_id.hyphenize()} {model.name} {context.get('client_region')} {api_params}"
+
+
+def _replay_aws_call(model, params, context, **kwargs):
+    from botocore.awsrequest import AWSResponse
+
+    recorded = get_cassette().play(_aws_key(model, context))
+    parsed = _decode(recorded["parsed"])
+    parsed.setdefault("ResponseMetadata", {})["HTTPStatusCode"] = recorded["status"]
+    return AWSResponse(params.get("url", ""), recorded["status"], {}, None), parsed
+
+
+def _store_aws_response(http_response, parsed, model, context, **kwargs):
+    key = _aws_key(model, context)
+    body = {k: v for k, v in parsed.items() if k != "ResponseMetadata"}
+    get_cassette().record(key, {"status": http_response.status_code, "parsed": _encode(body)})
+
+
+def _install_boto3(session):
+    events = session.events
+    events.register("before-parameter-build", _remember_params, unique_id="replay-transport-params")
+    if TRANSPORT_MODE == REPLAY:
+        events.register_first("before-call", _replay_aws_call, unique_id="replay-transport-replay")
+    else:
+        events.register("after-call", _store_aws_response, unique_id="replay-transport-record")
+
+
+# --- requests ---
+def _http_key(method: str, url: str, body=None):
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"http {method.upper()} {urlunsplit(parts._replace(query=query))}"
+    if body:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        key += f" {hashlib.sha1(body).hexdigest()[:16]}"
+    return key
+
+
+def _encode_body(content: bytes):
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(recorded):
+    if "text" in recorded:
+        return recorded["text"].encode("utf-8")
+    return base64.b64decode(recorded.get("b64", ""))
+
+
+def _http_record(status: int, headers, content: bytes):
+    return {
+        "status": status,
+        "headers": {k: v for k, v in dict(headers).items() if k.lower() not in _WIRE_HEADERS},
+        **_encode_body(content),
+    }
+
+
+class ReplayAdapter(HTTPAdapter):
+    """HTTPAdapter that records responses, or serves them from the cassette without a connection."""
+
+    def send(self, request, **kwargs):
+        key = _http_key(request.method, request.url, request.body)
+        if TRANSPORT_MODE == REPLAY:
+            recorded = get_cassette().play(key)
+            response = requests.Response()
+            response.status_code = recorded["status"]
+            response.headers.update(recorded["headers"])
+            response._content = _decode_body(recorded)
+            response._content_consumed = True
+            response.raw = io.BytesIO(response._content)
+            response.url = request.url
+            response.request = request
+            response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+            return response
+
+        response = super().send(request, **kwargs)
+        if TRANSPORT_MODE == RECORD:
+            get_cassette().record(key, _http_record(response.status_code, response.headers, response.content))
+        return response
+
+
+def transport_adapter(**kwargs):
+    """The adapter to mount on a `requests.Session`: a recording/replaying one unless the mode is live."""
+    return HTTPAdapter(**kwargs) if TRANSPORT_MODE == LIVE else ReplayAdapter(**kwargs)
+
+
+def requests_session(provider: str = None, **adapter_kwargs):
+    """A `requests.Session` with `transport_adapter` mounted, reporting metrics as `provider` when given."""
+    session = requests.Session()
+    adapter = transport_adapter(**adapter_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if provider:
+        instrument_session(session, provider)
+    return session
+
+
+# --- googleapiclient ---
+class _HttpResponse(dict):
+    """Minimal `httplib2.Response`: a header dict with `status` and `reason`."""
+
+    def __init__(self, status: int, headers):
+        super().__init__({k.lower(): v for k, v in headers.items()})
+        self.status = status
+        self.reason = ""
+        self["status"] = str(status)
+
+
+class ReplayHttp:
+    """
+    `httplib2.Http` stand-in for googleapiclient: passes requests to `inner`, recording
+    them in record mode, or answers them from the cassette. Every exchange is reported
+    to `metrics` under `operation` (the API name).
+    """
+
+    def __init__(self, inner=None, operation: str = "googleapis"):
+        self.inner = inner
+        self.operation = operation
+        self.timeout = getattr(inner, "timeout", None)
+        self.redirect_codes = getattr(inner, "redirect_codes", set())
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        key = _http_key(method, uri, body)
+        start = time.perf_counter()
+        if TRANSPORT_MODE == REPLAY:
+            recorded = get_cassette().play(key)
+            response, content = _HttpResponse(recorded["status"], recorded["headers"]), _decode_body(recorded)
+        else:
+            response, content = self.inner.request(uri, method=method, body=body, headers=headers,
+                                                   redirections=redirections, connection_type=connection_type)
+            if TRANSPORT_MODE == RECORD:
+                get_cassette().record(key, _http_record(response.status, response, content))
+        observe_transfer("gcp", self.operation, time.perf_counter() - start, len(content or b""), response.status)
+        return response, content
+
+    def close(self):
+        if self.inner is not None and hasattr(self.inner, "close"):
+            self.inner.close()
+
+
+def google_credentials(service_account_file: str = None, scopes=GOOGLE_SCOPES):
+    """Credentials from a service-account file, or application default credentials; None in replay mode."""
+    if TRANSPORT_MODE == REPLAY:
+        return None
+    if service_account_file:
+        from google.oauth2 import service_account
+        return service_account.Credentials.from_service_account_file(service_account_file, scopes=scopes)
+    from google.auth import default
+    credentials, _ = default(scopes=scopes)
+    return credentials
+
+
+def build_google_service(service: str, version: str, service_account_file: str = None, scopes=GOOGLE_SCOPES,
+                         credentials=None):
+    """
+    Builds a googleapiclient service from the bundled discovery document, with `credentials`
+    or, when not given, `google_credentials(service_account_file)`. In replay mode no
+    credentials are loaded.
+    """
+    from googleapiclient.discovery import build
+
+    if TRANSPORT_MODE == REPLAY:
+        return build(service, version, http=ReplayHttp(operation=service), static_discovery=True)
+
+    if credentials is None:
+        credentials = google_credentials(service_account_file, scopes)
+
+    if TRANSPORT_MODE == LIVE and not METRICS_ENABLED:
+        return build(service, version, credentials=credentials, static_discovery=True)
+
+    import google_auth_httplib2
+    from googleapiclient.http import build_http
+    inner = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+    return build(service, version, http=ReplayHttp(inner, operation=service), static_discovery=True)
+
+
+# --- Azure management SDK ---
+class _ReplayCredential:
+    """Token credential for replay mode; the token never leaves the process."""
+
+    def get_token(self, *scopes, **kwargs):
+        from azure.core.credentials import AccessToken
+        return AccessToken("replay", int(time.time()) + 3600)
+
+
+def azure_credential():
+    """`DefaultAzureCredential`, or a local stand-in in replay mode."""
+    if TRANSPORT_MODE == REPLAY:
+        return _ReplayCredential()
+    from azure.identity import DefaultAzureCredential
+    return DefaultAzureCredential()
+
+
+def azure_compute_client(subscription_id: str, credential=None):
+    """`ComputeManagementClient` whose HTTP traffic goes through `transport_adapter` and is metered."""
+    from azure.core.pipeline.transport import RequestsTransport
+    from azure.mgmt.compute import ComputeManagementClient
+
+    credential = credential or azure_credential()
+    transport = RequestsTransport(session=requests_session("azure"), session_owner=False)
+    return ComputeManagementClient(credential=credential, subscription_id=subscription_id, transport=transport)
+
+
+_boto3_installed = False
+
+
+def install(session=None):
+    """Registers the metrics and, unless the mode is live, record/replay hooks on a boto3 session."""
+    if session is None:
+        import boto3
+        session = boto3._get_default_session()
+    instrument_boto3(session)
+    if TRANSPORT_MODE != LIVE:
+        _install_boto3(session)
+
+
+def aws_client(service_name: str, **kwargs):
+    """`boto3.client(...)` with the hooks installed on the default session; boto3 is imported on first use."""
+    global _boto3_installed
+    import boto3
+
+    if not _boto3_installed:
+        with _install_lock:
+            if not _boto3_installed:
+                install()
+                _boto3_installed = True
+    return boto3.client(service_name, **kwargs)
+
+
+def transport_mode():
+    return TRANSPORT_MODE
@@ -0,0 +1,102 @@
+"""
+Single-flight deduplication for provider fetches.
+
+When several callers (threads, or sessions of the same Panel server) ask for
+the same thing at the same time, only the first one reaches the provider.
+The others wait for that call and receive its result, or its exception.
+Nothing is kept once the call finishes.
+"""
+
+import functools
+import inspect
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                self.executed += 1
+            else:
+                self.shared += 1
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+_group = SingleFlight()
+
+
+def call_key(fn):
+    """
+    Returns `key(args, kwargs)`: the identity of a call of `fn`, shared by every equivalent spelling.
+
+    Arguments are bound to the signature with defaults applied, so `f(1)`, `f(x=1)` and
+    `f(1, flag=False)` (when False is the default) have the same key. Arguments must be
+    hashable. The key uses the defining file rather than the module name because Panel
+    gives every session its own copy of the dashboard module.
+    """
+    name = f"{inspect.unwrap(fn).__code__.co_filename}:{fn.__qualname__}"
+    try:
+        signature = inspect.signature(fn)
+    except (TypeError, ValueError):
+        signature = None
+
+    def key(args, kwargs):
+        if signature is not None:
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                pass  # the call itself will raise
+            else:
+                bound.apply_defaults()
+                return (name, tuple(
+                    (param, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+                    for param, value in bound.arguments.items()
+                ))
+        return (name, args, tuple(sorted(kwargs.items())))
+
+    return key
+
+
+def single_flight(fn):
+    """
+    Decorator: identical concurrent calls of `fn` share one upstream request.
+
+    Calls are identical when their arguments bind to the same values (see `call_key`).
+    """
+    key_of = call_key(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return _group.do(key_of(args, kwargs), fn, *args, **kwargs)
+
+    return wrapper
+
+
+def coalescing_stats():
+    """Returns how many calls went upstream and how many were served by joining one in flight."""
+    return {"executed": _group.executed, "shared": _group.shared}
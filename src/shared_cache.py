@@ -0,0 +1,195 @@
+"""
+Process-wide cache shared by every Panel session.
+
+Panel re-executes the dashboard script for each session, so module globals in
+it are per session. Everything cached here lives in imported modules instead
+and is shared by the whole server process: the first analyst to open a region
+pays for the download, the next fifty read it from memory.
+
+Each namespace (region lists, SKU catalogs, pricing responses, ...) is an
+LRU-bounded `cachetools.TTLCache` with its own size and TTL, and keeps
+hit/miss/eviction counters so it can be sized from real traffic.
+Entries are keyed by the bound call arguments (see `request_coalescing.call_key`),
+so positional, keyword and default-spelled calls share one entry. Callers get
+copies of mutable results (dicts, lists, sets, DataFrames, also inside tuples),
+so one session cannot alter what another reads; other objects, such as the
+instance catalogs, are shared as they are and must not be modified.
+
+Background refreshes run inside `refreshing(namespace, ...)`: cached helpers
+called in that block skip the lookup and replace their entry, so the entry is
+renewed before it expires and readers never see a miss.
+"""
+
+import contextlib
+import copy
+import functools
+import os
+import threading
+
+from cachetools import TTLCache
+
+from request_coalescing import call_key, single_flight
+
+REGION_CACHE_TTL = float(os.environ.get("DASHBOARD_REGION_CACHE_TTL", 24 * 3600))
+PRICING_CACHE_TTL = float(os.environ.get("DASHBOARD_PRICING_CACHE_TTL", 3600))
+PRICING_CACHE_SIZE = int(os.environ.get("DASHBOARD_PRICING_CACHE_SIZE", 2048))
+
+_caches = {}
+_caches_lock = threading.Lock()
+_refresh = threading.local()
+
+
+class _CountingTTLCache(TTLCache):
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize, ttl)
+        self.evictions = 0
+
+    def popitem(self):
+        # Only called when the cache is full: the least recently used entry is evicted
+        self.evictions += 1
+        return super().popitem()
+
+
+class SharedCache:
+    """One cache namespace: LRU eviction at `maxsize` entries, expiry after `ttl` seconds."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self._cache = _CountingTTLCache(maxsize, ttl)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._cache[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            self._cache.expire()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._cache.evictions,
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "ttl": self._cache.ttl,
+            }
+
+
+def get_cache(namespace: str, maxsize: int = 256, ttl: float = 3600):
+    """Returns the namespace's cache, creating it with `maxsize`/`ttl` on first use."""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = SharedCache(namespace, maxsize, ttl)
+        return cache
+
+
+_MISSING = object()
+
+
+def _private_copy(value):
+    """A copy of `value` the caller may modify: containers and DataFrames are copied, other objects shared."""
+    if isinstance(value, tuple):
+        return tuple(_private_copy(item) for item in value)
+    if isinstance(value, (dict, list, set)):
+        return copy.deepcopy(value)
+    if type(value).__name__ in ("DataFrame", "Series") and hasattr(value, "copy"):
+        return value.copy()
+    return value
+
+
+@contextlib.contextmanager
+def refreshing(*namespaces):
+    """Within the block (on this thread), cached helpers of these namespaces recompute and overwrite their entry."""
+    previous = getattr(_refresh, "namespaces", frozenset())
+    _refresh.namespaces = previous | frozenset(namespaces)
+    try:
+        yield
+    finally:
+        _refresh.namespaces = previous
+
+
+def cached(namespace: str, maxsize: int = 256, ttl: float = 3600, should_cache=None):
+    """
+    Decorator: memoize a provider helper in a shared cache namespace.
+
+    Misses go through `single_flight`, so concurrent misses for the same key trigger
+    one upstream call. Exceptions are never cached.
+
+    Parameters:
+    ----------
+    namespace : str
+        Cache namespace, e.g. "regions", "sku_catalogs", "pricing".
+    maxsize : int, optional
+        Entries kept before the least recently used one is evicted.
+    ttl : float, optional
+        Seconds an entry stays valid.
+    should_cache : Callable[[Any], bool], optional
+        Predicate on the result; results it rejects (e.g. empty pricing) are returned but not stored.
+    """
+    def decorator(fn):
+        cache = get_cache(namespace, maxsize, ttl)
+        key_of = call_key(fn)
+        coalesced = single_flight(fn)
+
+        def refresh(*args, **kwargs):
+            """Recomputes the value for these arguments and replaces the cached one."""
+            value = coalesced(*args, **kwargs)
+            if should_cache is None or should_cache(value):
+                cache.set(key_of(args, kwargs), value)
+            return _private_copy(value)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if namespace in getattr(_refresh, "namespaces", ()):
+                return refresh(*args, **kwargs)
+            key = key_of(args, kwargs)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = coalesced(*args, **kwargs)
+                if should_cache is None or should_cache(value):
+                    cache.set(key, value)
+            return _private_copy(value)
+
+        wrapper.cache = cache
+        wrapper.refresh = refresh
+        return wrapper
+
+    return decorator
+
+
+def has_prices(result):
+    """`should_cache` predicate for fetchers returning (pricing_map, ...): skip empty answers."""
+    return bool(result and result[0])
+
+
+def cache_stats():
+    """Returns {namespace: {hits, misses, hit_ratio, evictions, size, maxsize, ttl}} for every namespace."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def clear_caches():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
@@ -0,0 +1,247 @@
+"""
+Local, incrementally updated store of EC2 spot price history.
+
+`describe_spot_price_history` is followed through every page and the points
+are kept in SQLite per (region, instance type, product, availability zone).
+Each sync only asks EC2 for points newer than the last one already stored,
+so reopening an instance re-downloads minutes of history rather than a week.
+Summaries (average, latest, percentiles, per-AZ figures) are computed with
+pandas/numpy over the stored series.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from client_registry import aws_client
+from rate_limit import iter_pages
+from request_coalescing import single_flight
+
+CACHE_DIR = os.environ.get(
+    "MULTI_CLOUD_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "multi-cloud-dashboard")
+)
+SPOT_DB_PATH = os.environ.get("AWS_SPOT_DB_PATH", os.path.join(CACHE_DIR, "aws_spot_prices.sqlite"))
+
+SPOT_WINDOW_DAYS = 7
+SPOT_RETENTION_DAYS = int(os.environ.get("AWS_SPOT_RETENTION_DAYS", 90))
+# A series synced more recently than this is served from the store without calling EC2
+SPOT_REFRESH_SECONDS = int(os.environ.get("AWS_SPOT_REFRESH_SECONDS", 300))
+PAGE_SIZE = 1000
+DEFAULT_PERCENTILES = (50, 90)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS spot_prices (
+    region TEXT NOT NULL,
+    instance_type TEXT NOT NULL,
+    product TEXT NOT NULL,
+    az TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (region, instance_type, product, az, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS spot_sync (
+    region TEXT NOT NULL,
+    instance_type TEXT NOT NULL,
+    product TEXT NOT NULL,
+    synced_until INTEGER NOT NULL,
+    PRIMARY KEY (region, instance_type, product)
+);
+"""
+
+_write_lock = threading.Lock()
+
+
+def _connect(path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _synced_until(conn, region: str, instance_type: str, product: str):
+    row = conn.execute(
+        "SELECT synced_until FROM spot_sync WHERE region = ? AND instance_type = ? AND product = ?",
+        (region, instance_type, product)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def iter_spot_history_pages(ec2, instance_type: str, product: str, start_time: datetime, end_time: datetime):
+    """Yields (az, epoch seconds, price) rows from every page of `describe_spot_price_history`."""
+    pages = iter_pages(
+        "aws", "ec2", ec2.describe_spot_price_history,
+        InstanceTypes=[instance_type],
+        ProductDescriptions=[product],
+        StartTime=start_time,
+        EndTime=end_time,
+        MaxResults=PAGE_SIZE
+    )
+    for page in pages:
+        for entry in page.get('SpotPriceHistory', []):
+            yield entry['AvailabilityZone'], int(entry['Timestamp'].timestamp()), float(entry['SpotPrice'])
+
+
+def sync_spot_history(instance_type: str, region: str, product: str = 'Linux/UNIX', days: int = SPOT_WINDOW_DAYS,
+                      ec2=None, path: str = SPOT_DB_PATH):
+    """
+    Downloads the spot price points not yet in the store.
+
+    The first sync of a series fetches the last `days` days; later syncs start at the
+    previous sync's end time. EC2 also returns the price in effect at the start time,
+    which is already stored and is ignored by the primary key.
+
+    Parameters:
+    ----------
+    instance_type : str
+        EC2 instance type (e.g., "t3a.2xlarge").
+    region : str
+        AWS region code (e.g., "eu-central-1").
+    product : str, optional
+        Spot product description (default is 'Linux/UNIX').
+    days : int, optional
+        History window fetched when the series is new or its last sync is older than that.
+    ec2 : botocore client, optional
+        EC2 client for `region`; created when omitted.
+
+    Returns:
+    -------
+    int
+        Number of points returned by EC2.
+    """
+    end_time = datetime.now(timezone.utc)
+    window_start = end_time - timedelta(days=days)
+
+    conn = _connect(path)
+    try:
+        synced_until = _synced_until(conn, region, instance_type, product)
+    finally:
+        conn.close()
+
+    start_time = window_start
+    if synced_until is not None:
+        start_time = max(window_start, datetime.fromtimestamp(synced_until, timezone.utc))
+
+    ec2 = ec2 or aws_client('ec2', region_name=region)
+    start = time.time()
+    rows = [
+        (region, instance_type, product, az, ts, price)
+        for az, ts, price in iter_spot_history_pages(ec2, instance_type, product, start_time, end_time)
+    ]
+    cutoff = int((end_time - timedelta(days=SPOT_RETENTION_DAYS)).timestamp())
+
+    with _write_lock:
+        conn = _connect(path)
+        try:
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO spot_prices VALUES (?, ?, ?, ?, ?, ?)", rows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO spot_sync VALUES (?, ?, ?, ?)",
+                    (region, instance_type, product, int(end_time.timestamp()))
+                )
+                # Keep each zone's last point before the cutoff: it is the price still in effect
+                conn.execute(
+                    "DELETE FROM spot_prices WHERE region = ? AND instance_type = ? AND product = ? AND ts < ("
+                    "  SELECT MAX(ts) FROM spot_prices AS kept WHERE kept.region = spot_prices.region"
+                    "  AND kept.instance_type = spot_prices.instance_type AND kept.product = spot_prices.product"
+                    "  AND kept.az = spot_prices.az AND kept.ts < ?)",
+                    (region, instance_type, product, cutoff)
+                )
+        finally:
+            conn.close()
+
+    print(f"\n AWS spot history sync ({instance_type}, {region})")
+    print(f" New points: {len(rows)} since {start_time:%Y-%m-%d %H:%M}")
+    print(f" Time taken: {time.time() - start:.2f} seconds")
+    return len(rows)
+
+
+def load_spot_series(instance_type: str, region: str, product: str = 'Linux/UNIX', days: int = SPOT_WINDOW_DAYS,
+                     path: str = SPOT_DB_PATH):
+    """
+    Reads the stored series of the last `days` days.
+
+    The price each zone had when the window starts is included, dated at the window
+    start: EC2 reports an unchanged price with its original, older timestamp, so a
+    stable price has no point inside the window at all.
+
+    Returns:
+    -------
+    pd.DataFrame
+        Columns Time (UTC), Price and AvailabilityZone, sorted by Time.
+    """
+    since = int((datetime.now(timezone.utc) - timedelta(days=days)).timestamp())
+    conn = _connect(path)
+    try:
+        df = pd.read_sql_query(
+            "SELECT MAX(ts, :since) AS ts, price, az FROM spot_prices "
+            "WHERE region = :region AND instance_type = :instance_type AND product = :product AND ("
+            "  ts >= :since OR ts = ("
+            "    SELECT MAX(ts) FROM spot_prices AS earlier WHERE earlier.region = spot_prices.region"
+            "    AND earlier.instance_type = spot_prices.instance_type AND earlier.product = spot_prices.product"
+            "    AND earlier.az = spot_prices.az AND earlier.ts < :since)"
+            ") ORDER BY ts, az",
+            conn, params={"region": region, "instance_type": instance_type, "product": product, "since": since}
+        )
+    finally:
+        conn.close()
+
+    return pd.DataFrame({
+        'Time': pd.to_datetime(df['ts'], unit='s', utc=True),
+        'Price': df['price'].astype(float),
+        'AvailabilityZone': df['az'],
+    })
+
+
+@single_flight
+def get_spot_history(instance_type: str, region: str, product: str = 'Linux/UNIX', days: int = SPOT_WINDOW_DAYS,
+                     path: str = SPOT_DB_PATH):
+    """Syncs the series if its last sync is older than `SPOT_REFRESH_SECONDS`, then returns `load_spot_series`."""
+    conn = _connect(path)
+    try:
+        synced_until = _synced_until(conn, region, instance_type, product)
+    finally:
+        conn.close()
+
+    if synced_until is None or time.time() - synced_until > SPOT_REFRESH_SECONDS:
+        sync_spot_history(instance_type, region, product, days, path=path)
+    return load_spot_series(instance_type, region, product, days, path)
+
+
+def summarize_spot(spot_df: pd.DataFrame, percentiles=DEFAULT_PERCENTILES):
+    """
+    Average, latest and percentile spot prices of a series from `load_spot_series`.
+
+    Returns:
+    -------
+    dict or None
+        - avg, latest, latest_time, p<N> for each requested percentile, over all zones.
+        - per_az: DataFrame indexed by availability zone with latest, avg, min, max and p<N> columns.
+        None when the series is empty.
+    """
+    if spot_df is None or spot_df.empty:
+        return None
+
+    prices = spot_df['Price'].to_numpy(dtype=float)
+    latest_idx = int(np.argmax(spot_df['Time'].to_numpy()))
+    summary = {
+        'avg': float(prices.mean()),
+        'latest': float(prices[latest_idx]),
+        'latest_time': spot_df['Time'].iloc[latest_idx],
+    }
+    for p, value in zip(percentiles, np.percentile(prices, percentiles)):
+        summary[f'p{p}'] = float(value)
+
+    if 'AvailabilityZone' in spot_df:
+        by_az = spot_df.sort_values('Time', kind='stable').groupby('AvailabilityZone')['Price']
+        per_az = by_az.agg(latest='last', avg='mean', min='min', max='max')
+        quantiles = by_az.quantile([p / 100 for p in percentiles]).unstack()
+        quantiles.columns = [f'p{p}' for p in percentiles]
+        summary['per_az'] = per_az.join(quantiles)
+    return summary
@@ -0,0 +1,41 @@
+import pandas as pd
+
+import aws_pricing
+from aws_offer_file import fetch_aws_pricing_offline, ingest_offer_file, load_raw_terms
+
+HEADER = ("SKU,OfferTermCode,RateCode,TermType,PriceDescription,Unit,PricePerUnit,Currency,LeaseContractLength,"
+          "PurchaseOption,OfferingClass,Product Family,Location,Instance Type,Tenancy,Operating System,"
+          "CapacityStatus,Pre Installed S/W")
+
+
+def _offer_csv(tmp_path, name, *rows):
+    path = tmp_path / name
+    lines = ['"FormatVersion","v1.0"', HEADER]
+    for sku, instance_type, price in rows:
+        lines.append(f"{sku},JRTCKXETXF,{sku}.JRTCKXETXF.6YS6EN2CT7,OnDemand,On demand,Hrs,{price},USD,,,,"
+                     f"Compute Instance,EU (Frankfurt),{instance_type},Shared,Linux,Used,NA")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_reingest_removes_skus_missing_from_new_offer_file(tmp_path):
+    db = str(tmp_path / "offers.sqlite")
+    ingest_offer_file(_offer_csv(tmp_path, "old.csv", ("SKU1", "m5.large", "0.1"), ("SKU2", "m5.xlarge", "0.2")), path=db)
+    ingest_offer_file(_offer_csv(tmp_path, "new.csv", ("SKU1", "m5.large", "0.11")), path=db)
+
+    assert load_raw_terms("m5.xlarge", "EU (Frankfurt)", path=db) == {}
+    dims = load_raw_terms("m5.large", "EU (Frankfurt)", path=db)["OnDemand"]["SKU1.JRTCKXETXF"]["priceDimensions"]
+    assert [dim["pricePerUnit"]["USD"] for dim in dims.values()] == ["0.11"]
+
+
+def test_offline_pricing_keeps_spot(tmp_path, monkeypatch):
+    db = str(tmp_path / "offers.sqlite")
+    ingest_offer_file(_offer_csv(tmp_path, "offer.csv", ("SKU1", "m5.large", "0.1")), path=db)
+    history = pd.DataFrame({"Time": pd.to_datetime([0], unit="s", utc=True), "Price": [0.04]})
+    monkeypatch.setattr(aws_pricing, "get_spot_history", lambda instance_type, region_code: history)
+
+    pricing_map, labels_map, _, spot_df = fetch_aws_pricing_offline("m5.large", "EU (Frankfurt)", path=db)
+
+    assert labels_map["Spot"] == {"termType": "Spot"}
+    assert pricing_map["Spot"] == round(0.04 * 730, 2)
+    assert spot_df.equals(history)
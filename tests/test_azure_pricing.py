@@ -0,0 +1,55 @@
+import azure_pricing
+from azure_pricing import fetch_azure_pricing
+from cross_cloud import fetch_instance_pricing
+
+_ITEM = {
+    "armSkuName": "Standard_D2s_v5",
+    "armRegionName": "westeurope",
+    "productName": "Virtual Machines Dsv5 Series",
+    "meterName": "D2s v5",
+    "skuName": "D2s v5",
+    "retailPrice": 0.1,
+}
+
+
+def test_warmup_and_dashboard_share_a_cache_entry(monkeypatch):
+    queries = []
+
+    def fetch_retail_items(query):
+        queries.append(query)
+        return [_ITEM] if "armSkuName" in query else [_ITEM, dict(_ITEM, armSkuName="Standard_D4s_v5")]
+    monkeypatch.setattr(azure_pricing, "fetch_retail_items", fetch_retail_items)
+    azure_pricing.clear_azure_region_tables()
+
+    warmed = fetch_instance_pricing("Azure", "Standard_D2s_v5", "westeurope", 2, 8)
+    pricing_map, labels_map = fetch_azure_pricing(sku="Standard_D2s_v5", region="westeurope", bulk=False)
+    assert len(queries) == 1
+    assert labels_map == warmed["azure_labels"]
+
+    # Bulk mode downloads the region once, then reads the warmed entry
+    fetch_azure_pricing(sku="Standard_D2s_v5", region="westeurope", bulk=True)
+    assert len(queries) == 2
+    assert fetch_azure_pricing(sku="Standard_D4s_v5", region="westeurope", bulk=True)[0] == {"On-Demand": 73.0}
+    assert len(queries) == 2
+    azure_pricing.clear_azure_region_tables()
+
+
+def test_stale_region_tables_are_not_used(monkeypatch):
+    queries = []
+
+    def fetch_retail_items(query):
+        queries.append(query)
+        return [_ITEM]
+    monkeypatch.setattr(azure_pricing, "fetch_retail_items", fetch_retail_items)
+    azure_pricing.clear_azure_region_tables()
+    clock = [1000.0]
+    monkeypatch.setattr(azure_pricing.time, "time", lambda: clock[0])
+
+    azure_pricing.prefetch_azure_region("northeurope")
+    assert azure_pricing.fresh_region_table("northeurope") is not None
+
+    clock[0] += azure_pricing.PRICING_CACHE_TTL + 1
+    assert azure_pricing.fresh_region_table("northeurope") is None
+    fetch_azure_pricing(sku="Standard_D2s_v5", region="northeurope")
+    assert "armSkuName eq 'Standard_D2s_v5'" in queries[-1]
+    azure_pricing.clear_azure_region_tables()
@@ -0,0 +1,74 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from azure_retail_client import AzureRetailClient
+
+PAGE_SIZE = 2
+TOTAL_ITEMS = 19
+
+
+class _RetailStub(BaseHTTPRequestHandler):
+    """Pages of PAGE_SIZE items; the first request for $skip=2 is throttled and for $skip=4 is malformed."""
+
+    requests = []
+    failed = set()
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        skip = int(query.get("$skip", ["0"])[0])
+        self.requests.append(skip)
+
+        if skip in (2, 4) and skip not in self.failed:
+            self.failed.add(skip)
+            if skip == 2:
+                self._send(429, b"Too Many Requests", {"Retry-After": "0"})
+            else:
+                self._send(200, b'{"Items": [', {})
+            return
+
+        items = [{"armSkuName": f"SKU{i}"} for i in range(skip, min(skip + PAGE_SIZE, TOTAL_ITEMS))]
+        body = {"Items": items, "NextPageLink": None}
+        if skip + PAGE_SIZE < TOTAL_ITEMS:
+            body["NextPageLink"] = f"http://127.0.0.1:{self.server.server_port}/prices?$skip={skip + PAGE_SIZE}"
+        self._send(200, json.dumps(body).encode(), {})
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url():
+    _RetailStub.requests = []
+    _RetailStub.failed = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RetailStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/prices"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_pages_are_fetched_in_order_through_throttling_and_bad_bodies(stub_url, max_workers):
+    client = AzureRetailClient(base_url=stub_url, max_workers=max_workers, backoff_factor=0.01)
+    try:
+        items = client.fetch_items("armRegionName eq 'westeurope'")
+    finally:
+        client.close()
+
+    assert [item["armSkuName"] for item in items] == [f"SKU{i}" for i in range(TOTAL_ITEMS)]
+    assert _RetailStub.failed == {2, 4}
+    # Once the short page (18) is seen, only pages already in flight may still be requested
+    assert max(_RetailStub.requests) <= 18 + (max_workers - 1) * PAGE_SIZE
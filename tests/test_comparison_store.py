@@ -0,0 +1,45 @@
+from comparison_store import ComparisonStore, comparison_rows, open_store
+
+
+def _row(model, cost, kind="On-Demand"):
+    return {"Model": model, "Monthly Cost (USD)": cost, "Cloud": "AWS", "Region": "us-east-1",
+            "Pricing Type": kind, "Pricing Type Normalized": kind}
+
+
+def test_sessions_share_one_store_per_file(tmp_path):
+    path = str(tmp_path / "comparison.jsonl")
+    first, second = open_store(path), open_store(path)
+    first.upsert_many([_row("a", 1.0)])
+    second.upsert_many([_row("b", 2.0)])
+
+    assert first is second
+    # Compaction and restarts keep the rows of every session
+    first._compact()
+    assert list(ComparisonStore(path).frame()["Model"]) == ["a", "b"]
+
+
+def test_sessions_without_file_are_private():
+    first, second = open_store(), open_store()
+    first.upsert_many([_row("a", 1.0)])
+
+    assert len(second) == 0
+
+
+def test_frame_is_a_copy():
+    store = ComparisonStore()
+    store.upsert_many([_row("a", 1.0)])
+    df = store.frame()
+    df.loc[0, "Monthly Cost (USD)"] = 99.0
+
+    assert store.frame()["Monthly Cost (USD)"].tolist() == [1.0]
+
+
+def test_comparison_rows_classify_each_label():
+    rows = comparison_rows({"AWS RI Standard 1yr All Upfront": 41.67, "Azure Low Priority": 14.6}, "westeurope")
+
+    assert [(row["Cloud"], row["Pricing Type"], row["Pricing Type Normalized"]) for row in rows] == [
+        ("AWS", "Reserved", "Reserved"), ("Azure", "Other", "Other"),
+    ]
+    store = ComparisonStore()
+    store.upsert_many(rows)
+    assert store.frame("Reserved")["Monthly Cost (USD)"].tolist() == [41.67]
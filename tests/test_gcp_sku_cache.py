@@ -0,0 +1,26 @@
+import gcp_sku_cache
+
+_SKU = {
+    "skuId": "A1",
+    "description": "N2 Instance Core running in Belgium",
+    "category": {"usageType": "OnDemand", "resourceGroup": "CPU"},
+    "serviceRegions": ["europe-west1"],
+    "pricingInfo": [{"pricingExpression": {"tieredRates": [{"unitPrice": {"units": "0", "nanos": 31611000}}]}}],
+}
+
+
+def test_lookups_reuse_the_loaded_index_without_opening_the_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "skus.sqlite")
+    gcp_sku_cache.refresh_gcp_sku_cache(path, pages=[[_SKU]])
+    index = gcp_sku_cache.get_gcp_sku_index(path)
+
+    opened = []
+    connect = gcp_sku_cache._connect
+    monkeypatch.setattr(gcp_sku_cache, "_connect", lambda p: opened.append(p) or connect(p))
+    for _ in range(100):
+        assert gcp_sku_cache.get_gcp_sku_index(path) is index
+    assert opened == []
+
+    # A refresh in this process replaces the index on the next lookup
+    gcp_sku_cache.refresh_gcp_sku_cache(path, pages=[[_SKU]])
+    assert gcp_sku_cache.get_gcp_sku_index(path) is not index
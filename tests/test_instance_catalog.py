@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+
+import instance_catalog
+from instance_catalog import get_matching_azure_vm_sizes
+
+
+def _vm_size(name, cores, memory_gb):
+    return SimpleNamespace(
+        name=name, resource_type="virtualMachines", locations=["westeurope"],
+        capabilities=[SimpleNamespace(name="vCPUs", value=str(cores)),
+                      SimpleNamespace(name="MemoryGB", value=str(memory_gb))],
+    )
+
+
+def test_azure_matching_uses_the_catalog_of_each_subscription(monkeypatch):
+    catalogs = {"sub-a": [_vm_size("Standard_D2s_v5", 2, 8)], "sub-b": [_vm_size("Standard_D2as_v5", 2, 8)]}
+    listed = []
+
+    def compute_client(subscription_id):
+        def list_skus():
+            listed.append(subscription_id)
+            return catalogs[subscription_id]
+        return SimpleNamespace(resource_skus=SimpleNamespace(list=list_skus))
+    monkeypatch.setattr(instance_catalog, "azure_compute_client", compute_client)
+
+    assert get_matching_azure_vm_sizes("westeurope", 2, 8, subscription_id="sub-a") == ["Standard_D2s_v5"]
+    assert get_matching_azure_vm_sizes("westeurope", 2, 8, subscription_id="sub-b") == ["Standard_D2as_v5"]
+    assert get_matching_azure_vm_sizes("westeurope", 2, 8, subscription_id="sub-a") == ["Standard_D2s_v5"]
+    assert listed == ["sub-a", "sub-b"]
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from price_normalization import (
+    build_price_table, classify_pricing_types, monthly_prices, pricing_type, table_monthly_prices,
+)
+
+AWS_LABELS = {
+    "OnDemand": {"termType": "OnDemand"},
+    "Reserved - standard": {"termType": "Reserved", "offeringClass": "standard"},
+    "Spot": {"termType": "Spot"},
+}
+AWS_RAW_TERMS = {
+    "OnDemand": {"T1": {"priceDimensions": {"D1": {"unit": "Hrs", "pricePerUnit": {"USD": "0.0960"}}}}},
+    "Reserved": {
+        "T2": {
+            "termAttributes": {"OfferingClass": "standard", "LeaseContractLength": "1yr", "PurchaseOption": "All Upfront"},
+            "priceDimensions": {
+                "D2": {"unit": "Quantity", "pricePerUnit": {"USD": "500"}},
+                "D3": {"unit": "Hrs", "pricePerUnit": {"USD": "0.0000"}},
+            },
+        },
+        "T3": {
+            "termAttributes": {"OfferingClass": "standard", "LeaseContractLength": "3yr", "PurchaseOption": "No Upfront"},
+            "priceDimensions": {"D4": {"unit": "Hrs", "pricePerUnit": {"USD": "0.0410"}}},
+        },
+    },
+}
+AZURE_LABELS = {
+    "On-Demand": {"raw_price": 0.1, "term": "-", "payment": "-", "sku": "D2s_v5", "region": "westeurope"},
+    "Reserved 1YR - AllUpfront": {"raw_price": 520.0, "term": "1 Year", "payment": "AllUpfront",
+                                  "sku": "D2s_v5", "region": "westeurope"},
+}
+GCP_LABELS = {"GCP-OnDemand": {"raw_price": 0.095, "term": "-", "payment": "-", "instance_type": "n2-standard-2"}}
+
+
+def test_loop_matches_the_price_table():
+    spot_df = pd.DataFrame({"Price": [0.03, 0.05]})
+    pricing = dict(aws_labels=AWS_LABELS, aws_raw_terms=AWS_RAW_TERMS, spot_df=spot_df,
+                   azure_labels={"Low Priority": AZURE_LABELS["On-Demand"], **AZURE_LABELS}, gcp_labels=GCP_LABELS)
+    selected = list(AWS_LABELS) + ["Low Priority", "Reserved 1YR - AllUpfront"] + list(GCP_LABELS)
+
+    prices = monthly_prices(selected, **pricing)
+
+    assert prices == table_monthly_prices(build_price_table(**pricing), selected)
+    assert prices["AWS RI Standard 1yr All Upfront"] == round(500 / 12, 2)
+    assert prices["Azure Reserved 1YR - AllUpfront"] == round(520 / 12, 2)
+    assert prices["AWS Spot"] == round(0.04 * 730, 2)
+
+
+def test_pricing_types_match_ri_as_a_word():
+    labels = ["AWS RI Standard 1yr All Upfront", "Azure Low Priority", "Azure Spot", "GCP Commit 1YR",
+              "AWS OnDemand", "Azure Reserved 1YR - AllUpfront"]
+    expected = ["Reserved", "Other", "Spot", "Reserved", "On-Demand", "Reserved"]
+
+    assert [pricing_type(label) for label in labels] == expected
+    assert classify_pricing_types(pd.Series(labels)).tolist() == expected
@@ -0,0 +1,122 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import rate_limit
+from rate_limit import AdaptiveConcurrency, Limiter, TokenBucket, call
+
+
+class _HttpError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+@pytest.fixture
+def stub_limiter(monkeypatch):
+    found = Limiter("stub", rate=200.0, burst=200, initial_concurrency=16, max_concurrency=16)
+    monkeypatch.setitem(rate_limit._limiters, ("stub", None), found)
+    return found
+
+
+def test_token_bucket_paces_and_pauses():
+    bucket = TokenBucket(rate=10.0, burst=2)
+
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert 0.0 < bucket.try_acquire() <= 0.1
+
+    bucket.pause(1.0)
+    assert bucket.try_acquire() > 0.9
+
+
+def test_concurrency_halves_on_throttling_and_grows_back():
+    concurrency = AdaptiveConcurrency(initial=8, maximum=8)
+    concurrency.acquire()
+    concurrency.release(throttled=True)
+    assert concurrency.limit == 4
+
+    for _ in range(40):
+        concurrency.acquire()
+        concurrency.release()
+    assert concurrency.limit == 8
+
+
+def test_stub_429s_are_retried_and_the_limit_recovers(stub_limiter):
+    server, served = rate_limit._serve_throttling_stub(rate=40.0)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=16))
+
+    def fetch(_=None):
+        def get():
+            response = session.get(url, timeout=10)
+            response.raise_for_status()
+            return response.json()
+        return call("stub", None, get, attempts=10, base_delay=0.05)
+
+    lowest = [stub_limiter.concurrency.limit]
+    sampling = threading.Event()
+
+    def sample():
+        while not sampling.is_set():
+            lowest[0] = min(lowest[0], stub_limiter.concurrency.limit)
+            time.sleep(0.005)
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    try:
+        # A burst well above the stub's rate: every request still succeeds, and the 429s shrink the limit
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(fetch, range(80)))
+        assert results == [{"Items": []}] * 80
+        assert served["throttled"] > 0
+        assert lowest[0] < 10  # halved from 16, then grown by a fraction before it was sampled
+        dropped = stub_limiter.concurrency.limit
+
+        # Paced requests below the stub's rate are not throttled and raise the limit again
+        time.sleep(1.1)
+        throttled = served["throttled"]
+        for _ in range(30):
+            fetch()
+        assert served["throttled"] == throttled
+        assert stub_limiter.concurrency.limit > dropped
+    finally:
+        sampling.set()
+        sampler.join()
+        server.shutdown()
+        server.server_close()
+
+
+def test_call_reraises_other_errors_without_retrying(stub_limiter):
+    for error in (ValueError("bad input"), _HttpError(404)):
+        attempts = []
+
+        def fail():
+            attempts.append(1)
+            raise error
+        with pytest.raises(type(error)):
+            call("stub", None, fail, attempts=5)
+        assert len(attempts) == 1
+    assert stub_limiter.retries == 0
+
+
+def test_call_waits_at_least_retry_after(stub_limiter, monkeypatch):
+    sleeps = []
+    real_sleep = time.sleep
+    monkeypatch.setattr(rate_limit.time, "sleep", lambda seconds: sleeps.append(seconds) or real_sleep(seconds))
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda low, high: low)
+    answers = [_HttpError(429, {"Retry-After": "0.2"}), "ok"]
+
+    def fetch():
+        answer = answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    assert call("stub", None, fetch, attempts=3) == "ok"
+    assert 0.2 in sleeps
+    assert stub_limiter.throttled == 1 and stub_limiter.retries == 1
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from request_coalescing import call_key, single_flight
+
+
+def _fetch(region, bulk=False, *, retries=3):
+    return region
+
+
+def test_equivalent_spellings_share_a_key():
+    key = call_key(_fetch)
+
+    assert key(("eu",), {}) == key((), {"region": "eu"}) == key(("eu", False), {"retries": 3})
+    assert key(("eu",), {}) != key(("eu", True), {})
+
+
+def test_positional_and_keyword_calls_share_one_execution():
+    calls = []
+    release = threading.Event()
+
+    @single_flight
+    def fetch(region, bulk=False):
+        calls.append(region)
+        release.wait(5)
+        return region
+
+    threads = [threading.Thread(target=fetch, args=("eu",)),
+               threading.Thread(target=fetch, kwargs={"region": "eu", "bulk": False})]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["eu"]
@@ -0,0 +1,32 @@
+import pandas as pd
+
+from shared_cache import cached
+
+
+def test_argument_spellings_share_one_entry():
+    calls = []
+
+    @cached("test_spellings", maxsize=8, ttl=60)
+    def fetch(sku, region, bulk=False):
+        calls.append((sku, region, bulk))
+        return {"On-Demand": 1.0}
+
+    fetch("D2s_v5", "westeurope")
+    fetch(sku="D2s_v5", region="westeurope")
+    fetch("D2s_v5", region="westeurope", bulk=False)
+
+    assert calls == [("D2s_v5", "westeurope", False)]
+
+
+def test_callers_get_private_copies():
+    @cached("test_copies", maxsize=8, ttl=60)
+    def fetch(region):
+        return {"On-Demand": 1.0}, pd.DataFrame({"Price": [1.0]})
+
+    pricing, df = fetch("eu")
+    pricing["On-Demand"] = 99.0
+    df.loc[0, "Price"] = 99.0
+
+    pricing, df = fetch("eu")
+    assert pricing == {"On-Demand": 1.0}
+    assert df["Price"].tolist() == [1.0]
@@ -0,0 +1,69 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import spot_price_store
+from spot_price_store import load_spot_series, summarize_spot, sync_spot_history
+
+
+def _insert(path, *points, region="eu-central-1", instance_type="m5.large", product="Linux/UNIX"):
+    spot_price_store._connect(path).close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO spot_prices VALUES (?, ?, ?, ?, ?, ?)",
+            [(region, instance_type, product, az, int(when.timestamp()), price) for az, when, price in points],
+        )
+    conn.close()
+
+
+def test_price_older_than_window_is_carried_to_window_start(tmp_path):
+    path = str(tmp_path / "spot.sqlite")
+    now = datetime.now(timezone.utc)
+    _insert(path, ("eu-central-1a", now - timedelta(days=30), 0.05))
+
+    series = load_spot_series("m5.large", "eu-central-1", path=path)
+
+    assert list(series["Price"]) == [0.05]
+    assert list(series["AvailabilityZone"]) == ["eu-central-1a"]
+    assert series["Time"].iloc[0] >= now - timedelta(days=7, minutes=1)
+    assert summarize_spot(series)["avg"] == 0.05
+
+
+def test_only_latest_point_before_window_is_kept_per_zone(tmp_path):
+    path = str(tmp_path / "spot.sqlite")
+    now = datetime.now(timezone.utc)
+    _insert(
+        path,
+        ("eu-central-1a", now - timedelta(days=20), 0.04),
+        ("eu-central-1a", now - timedelta(days=10), 0.05),
+        ("eu-central-1a", now - timedelta(days=1), 0.06),
+        ("eu-central-1b", now - timedelta(days=2), 0.07),
+    )
+
+    series = load_spot_series("m5.large", "eu-central-1", path=path)
+
+    assert list(zip(series["AvailabilityZone"], series["Price"])) == [
+        ("eu-central-1a", 0.05), ("eu-central-1b", 0.07), ("eu-central-1a", 0.06),
+    ]
+
+
+class _FakeEC2:
+    def __init__(self, history):
+        self.history = history
+
+    def describe_spot_price_history(self, **params):
+        return {"SpotPriceHistory": self.history}
+
+
+def test_retention_keeps_price_still_in_effect(tmp_path, monkeypatch):
+    path = str(tmp_path / "spot.sqlite")
+    now = datetime.now(timezone.utc)
+    monkeypatch.setattr(spot_price_store, "SPOT_RETENTION_DAYS", 90)
+    stale = now - timedelta(days=200)
+    _insert(path, ("eu-central-1a", now - timedelta(days=300), 0.03))
+    ec2 = _FakeEC2([{"AvailabilityZone": "eu-central-1a", "Timestamp": stale, "SpotPrice": "0.05"}])
+
+    sync_spot_history("m5.large", "eu-central-1", ec2=ec2, path=path)
+    series = load_spot_series("m5.large", "eu-central-1", path=path)
+
+    assert list(series["Price"]) == [0.05]